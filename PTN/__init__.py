@@ -1,6 +1,10 @@
 #!/usr/bin/env python
+from typing import List, Optional
 
-from .parse import PTN
+from .metrics import Metrics
+from .parse import PTN, ParseViews
+from .registry import PatternRegistry, default_registry  # noqa: F401
+from .shards import parse_file  # noqa: F401
 
 __author__ = "Giorgio Momigliano"
 __email__ = "gmomigliano@protonmail.com"
@@ -21,3 +25,46 @@ def parse(name: str, standardise: bool = True, coherent_types: bool = False) ->
     :return: A dictionary of parsed components.
     """
     return _ptn_instance.parse(name, standardise, coherent_types)
+
+
+def parse_many(names: List[str], standardise: bool = True, coherent_types: bool = False) -> List[dict]:
+    """
+    Parse a batch of torrent titles, searching for most patterns over chunks of titles at
+    once (see `PTN.parse_many`).
+
+    :param names: The torrent names to parse.
+    :param standardise: Whether to standardise the parsed values.
+    :param coherent_types: Whether to ensure coherent types in the parsed results.
+    :return: A list of dictionaries of parsed components, as `parse` would return them.
+    """
+    return _ptn_instance.parse_many(names, standardise, coherent_types)
+
+
+def parse_views(name: str) -> ParseViews:
+    """
+    Match the torrent title once, and build its raw, standardised and coherent results from
+    that single match when they're first accessed.
+
+    :param name: The torrent name to parse.
+    :return: A ParseViews, with `raw`, `standardised` and `coherent` properties, and
+        `get(standardise, coherent_types)` for any other combination.
+    """
+    return _ptn_instance.parse_views(name)
+
+
+def enable_metrics(metrics: Optional[Metrics] = None) -> Metrics:
+    """
+    Record the latency and results of calls to `parse` (see `metrics.py`).
+
+    :param metrics: The Metrics to record into, by default a new one.
+    :return: The Metrics, whose `snapshot()` and `prometheus()` export what was recorded.
+    """
+    _ptn_instance.metrics = metrics or Metrics()
+    return _ptn_instance.metrics
+
+
+def disable_metrics() -> None:
+    """
+    Stop recording metrics for calls to `parse`.
+    """
+    _ptn_instance.metrics = None
@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+import copy
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+from .catalogue import title_key
+
+# Group a stream of parse results by show, season and episode, keeping just the counts of the
+# most common variants (resolution, quality, ...) in each group. Counts are kept in
+# fixed-size summaries, and aggregates from different workers can be merged.
+
+DEFAULT_FIELDS = ("resolution", "quality", "codec", "encoder")
+
+LEVELS = {
+    "show": ("title", "year"),
+    "season": ("title", "year", "seasons"),
+    "episode": ("title", "year", "seasons", "episodes"),
+}
+
+
+class TopCounter:
+    """
+    Approximate counts of the most common values, in at most `capacity` counters (the
+    Space-Saving algorithm). Values that are counted more often than `total / capacity` times
+    are always kept, and a count is never under-estimated by more than `total / capacity`.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts: Dict[Hashable, int] = {}
+        self.total = 0
+
+    def add(self, value: Hashable, count: int = 1) -> None:
+        self.total += count
+        counts = self.counts
+        if value in counts or len(counts) < self.capacity:
+            counts[value] = counts.get(value, 0) + count
+            return
+        # Replace the least counted value, which the new one could have been all along.
+        smallest = min(counts, key=counts.get)
+        counts[value] = counts.pop(smallest) + count
+
+    def merge(self, other: "TopCounter") -> None:
+        """
+        Add the counts of another summary. Values missing from a full summary could have
+        been counted up to its smallest count there.
+        """
+        own_floor = min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+        other_floor = min(other.counts.values()) if len(other.counts) >= other.capacity else 0
+        merged = {
+            value: self.counts.get(value, own_floor) + other.counts.get(value, other_floor)
+            for value in set(self.counts) | set(other.counts)
+        }
+        self.counts = dict(sorted(merged.items(), key=lambda item: item[1], reverse=True)[:self.capacity])
+        self.total += other.total
+
+    def top(self, n: Optional[int] = None) -> List[Tuple[Hashable, int]]:
+        """
+        The most common values and their (approximate) counts.
+        """
+        return sorted(self.counts.items(), key=lambda item: (-item[1], repr(item[0])))[:n]
+
+
+class Group:
+    """
+    The releases of one show, season or episode.
+    """
+
+    def __init__(self, key: Tuple, title: str, fields: Iterable[str], capacity: int):
+        self.key = key
+        # The title of the first result, as keys are normalised.
+        self.title = title
+        self.count = 0
+        self.variants = {field: TopCounter(capacity) for field in fields}
+        # Combinations of all the fields.
+        self.combinations = TopCounter(capacity)
+
+    def add(self, result: Dict[str, Any]) -> None:
+        self.count += 1
+        combination = []
+        for field, counter in self.variants.items():
+            value = _hashable(result.get(field))
+            combination.append(value)
+            if value is not None:
+                counter.add(value)
+        self.combinations.add(tuple(combination))
+
+    def merge(self, other: "Group") -> None:
+        self.count += other.count
+        for field, counter in self.variants.items():
+            counter.merge(other.variants[field])
+        self.combinations.merge(other.combinations)
+
+    def top(self, field: Optional[str] = None, n: Optional[int] = None) -> List[Tuple[Any, int]]:
+        """
+        The most common values of a field, or of combinations of all fields (as tuples) if
+        no field is given.
+        """
+        return (self.combinations if field is None else self.variants[field]).top(n)
+
+    def __repr__(self) -> str:
+        return f"Group({self.title!r}, {self.key[1:]}, {self.count} releases)"
+
+
+class ReleaseAggregator:
+    """
+    Groups parse results by normalised title (see `catalogue.title_key`) and year, plus
+    seasons and episodes depending on `level` ("show", "season" or "episode").
+    """
+
+    def __init__(self, level: str = "episode", fields: Iterable[str] = DEFAULT_FIELDS, top: int = 5, capacity: Optional[int] = None):
+        """
+        :param fields: The fields whose variants are counted in each group.
+        :param top: How many variants `top` returns by default.
+        :param capacity: Counters kept per field and group; more than `top` makes the counts
+            of the top variants more accurate. Defaults to `4 * top`.
+        """
+        if level not in LEVELS:
+            raise ValueError(f"Unknown level '{level}', expected one of: {', '.join(LEVELS)}")
+        self.level = level
+        self.fields = tuple(fields)
+        self.top = top
+        self.capacity = capacity or 4 * top
+        self.groups: Dict[Tuple, Group] = {}
+        self._keys: Dict[str, str] = {}
+
+    def key(self, result: Dict[str, Any]) -> Tuple:
+        title = result.get("title", "")
+        if title not in self._keys:
+            if len(self._keys) >= 65536:
+                self._keys.clear()
+            self._keys[title] = title_key(title) if title else ""
+        key = [self._keys[title]]
+        for field in LEVELS[self.level][1:]:
+            key.append(_hashable(result.get(field)))
+        return tuple(key)
+
+    def add(self, result: Dict[str, Any]) -> Group:
+        key = self.key(result)
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = Group(key, result.get("title", ""), self.fields, self.capacity)
+        group.add(result)
+        return group
+
+    def update(self, results: Iterable[Dict[str, Any]]) -> "ReleaseAggregator":
+        for result in results:
+            self.add(result)
+        return self
+
+    def merge(self, other: "ReleaseAggregator") -> "ReleaseAggregator":
+        """
+        Add the groups of an aggregator with the same settings, e.g. from another worker.
+        """
+        if (other.level, other.fields, other.capacity) != (self.level, self.fields, self.capacity):
+            raise ValueError("Can only merge aggregators with the same level, fields and capacity")
+        for key, group in other.groups.items():
+            if key in self.groups:
+                self.groups[key].merge(group)
+            else:
+                self.groups[key] = copy.deepcopy(group)
+        return self
+
+    def __len__(self) -> int:
+        return len(self.groups)
+
+    def __iter__(self) -> Iterator[Group]:
+        """
+        The groups, largest first (then by key, so the order doesn't depend on arrival order).
+        """
+        return iter(sorted(self.groups.values(), key=lambda group: (-group.count, repr(group.key))))
+
+    def summary(self, n: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        The groups as plain dicts, largest first, with the top variants of each field.
+        """
+        n = n or self.top
+        summary = []
+        for group in self:
+            entry = {"title": group.title}
+            entry.update(zip(LEVELS[self.level][1:], group.key[1:]))
+            entry["count"] = group.count
+            entry["variants"] = {field: group.top(field, n) for field in self.fields}
+            summary.append(entry)
+        return summary
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The title key memo is only a cache, so don't ship it between workers.
+        return {**self.__dict__, "_keys": {}}
+
+
+def _hashable(value: Any) -> Any:
+    return tuple(value) if isinstance(value, list) else value
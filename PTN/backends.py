@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# Regex backends: every pattern PTN uses is compiled through one of these, so the engine can
+# be swapped per parser, e.g. `PTN(backend="re2")`. A backend that can't handle a pattern
+# compiles it with the stdlib `re` instead, and records which pattern and why in `fallbacks`.
+
+
+class ReBackend:
+    """
+    The default backend, using the stdlib `re` module.
+    """
+
+    name = "re"
+
+    def __init__(self):
+        self._compiled = {}
+        # Patterns this backend couldn't compile itself, with the reason, that use `re` instead.
+        self.fallbacks: Dict[str, str] = {}
+
+    def compile(self, pattern: str, flags: int = 0) -> Any:
+        """
+        Compile a pattern (with `re` flags), reusing it if it was compiled before.
+        """
+        key = (pattern, flags)
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            reason = self.unsupported(pattern)
+            if reason is None:
+                try:
+                    compiled = self._compile(pattern, flags)
+                except Exception as e:
+                    reason = f"failed to compile: {e}"
+            if reason is not None:
+                self.fallbacks[pattern] = reason
+                compiled = re.compile(pattern, flags)
+            self._compiled[key] = compiled
+        return compiled
+
+    def _compile(self, pattern: str, flags: int) -> Any:
+        return re.compile(pattern, flags)
+
+    def unsupported(self, pattern: str) -> Optional[str]:
+        """
+        Return why this backend can't compile `pattern`, or None if it can.
+        """
+        return None
+
+
+class RegexModuleBackend(ReBackend):
+    """
+    Backend using the `regex` module, a superset of `re` with the same flag values.
+    """
+
+    name = "regex"
+
+    def __init__(self):
+        import regex
+
+        super().__init__()
+        self._regex = regex
+
+    def _compile(self, pattern: str, flags: int) -> Any:
+        return self._regex.compile(pattern, flags)
+
+
+# Constructs RE2 doesn't implement, as it guarantees linear-time matching.
+RE2_UNSUPPORTED = [
+    (re.compile(r"\(\?<?[=!]"), "lookaround"),
+    (re.compile(r"(?<!\\)(?:\\\\)*\\[1-9]|\(\?P="), "backreference"),
+]
+
+
+class RE2Backend(ReBackend):
+    """
+    Linear-time backend using RE2 (the `google-re2` package).
+
+    RE2's `\\b`, `\\w`, `\\d` and `\\s` are ASCII-only, so only ASCII strings are matched
+    with RE2 and anything else goes to the `re` version of the pattern. Patterns using
+    lookarounds or backreferences always use `re`.
+    """
+
+    name = "re2"
+
+    def __init__(self):
+        import re2
+
+        super().__init__()
+        self._re2 = re2
+
+    def unsupported(self, pattern: str) -> Optional[str]:
+        for construct, reason in RE2_UNSUPPORTED:
+            if construct.search(pattern):
+                return reason
+        return None
+
+    def _compile(self, pattern: str, flags: int) -> Any:
+        options = self._re2.Options()
+        options.log_errors = False
+        options.case_sensitive = not flags & re.IGNORECASE
+        options.dot_nl = bool(flags & re.DOTALL)
+        if flags & re.MULTILINE:
+            pattern = f"(?m){pattern}"
+        compiled = self._re2.compile(self.translate(pattern), options)
+        return ASCIIRoutedPattern(compiled, re.compile(pattern, flags))
+
+    @staticmethod
+    def translate(pattern: str) -> str:
+        """
+        Rewrite the bits of `re` syntax that RE2 spells differently.
+        """
+        # `\Z` is `\z` in RE2, `\uXXXX` is `\x{XXXX}`, and `{,n}` needs an explicit lower bound.
+        pattern = re.sub(r"(?<!\\)((?:\\\\)*)\\Z", r"\1\\z", pattern)
+        pattern = re.sub(r"(?<!\\)((?:\\\\)*)\\u([0-9a-fA-F]{4})", r"\1\\x{\2}", pattern)
+        return re.sub(r"(?<!\\)((?:\\\\)*)\{,(\d+)\}", r"\1{0,\2}", pattern)
+
+
+class ASCIIRoutedPattern:
+    """
+    A compiled RE2 pattern that hands non-ASCII strings to its `re` equivalent.
+    """
+
+    def __init__(self, fast: Any, fallback: re.Pattern):
+        self._fast = fast
+        self._fallback = fallback
+        self.pattern = fallback.pattern
+        self.flags = fallback.flags
+        self.groups = fallback.groups
+
+    def _for(self, string: str) -> Any:
+        return self._fast if string.isascii() else self._fallback
+
+    def search(self, string: str, *args: Any) -> Any:
+        return self._for(string).search(string, *args)
+
+    def match(self, string: str, *args: Any) -> Any:
+        return self._for(string).match(string, *args)
+
+    def fullmatch(self, string: str, *args: Any) -> Any:
+        return self._for(string).fullmatch(string, *args)
+
+    def finditer(self, string: str, *args: Any) -> Any:
+        return self._for(string).finditer(string, *args)
+
+    def findall(self, string: str, *args: Any) -> List[Any]:
+        return self._for(string).findall(string, *args)
+
+    def split(self, string: str, *args: Any) -> List[str]:
+        return self._for(string).split(string, *args)
+
+    def sub(self, repl: Any, string: str, *args: Any) -> str:
+        return self._for(string).sub(repl, string, *args)
+
+    def subn(self, repl: Any, string: str, *args: Any) -> Tuple[str, int]:
+        return self._for(string).subn(repl, string, *args)
+
+
+backend_classes = {
+    ReBackend.name: ReBackend,
+    RegexModuleBackend.name: RegexModuleBackend,
+    RE2Backend.name: RE2Backend,
+}
+_backends = {}
+
+
+def get_backend(name: str = "re") -> ReBackend:
+    """
+    Get the (shared) backend with the given name. Raises ImportError if the module it needs
+    isn't installed.
+    """
+    if name not in backend_classes:
+        raise ValueError(f"Unknown regex backend '{name}', expected one of: {', '.join(backend_classes)}")
+    if name not in _backends:
+        _backends[name] = backend_classes[name]()
+    return _backends[name]
+
+
+def available_backends() -> List[str]:
+    """
+    Names of the backends whose modules are installed.
+    """
+    available = []
+    for name in backend_classes:
+        try:
+            get_backend(name)
+        except ImportError:
+            continue
+        available.append(name)
+    return available
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+import re
+from bisect import bisect_right
+from typing import Any, Dict, List, Sequence, Tuple
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants
+    import sre_parse
+
+REPEATS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT, getattr(sre_constants, "POSSESSIVE_REPEAT", None)}
+ATOMIC_GROUP = getattr(sre_constants, "ATOMIC_GROUP", None)
+
+# Parsing batches of names, a chunk at a time: the names of a chunk are joined with a
+# separator, each option is searched for once over the whole chunk, and its matches are
+# handed back to the names they're in (see `PTN.parse_many`). That gives each name the
+# matches it would have on its own, as long as the option can't match the separator and
+# doesn't look for where the string starts or ends (`^`, `$`): the separator isn't a word
+# character, so `\b` and lookarounds see it as they'd see the start or end of the name.
+# Options that could are searched in each name on their own, as are names with a separator.
+
+SEPARATOR = "\x00"
+ANCHORS = {
+    sre_constants.AT_BEGINNING, sre_constants.AT_BEGINNING_LINE, sre_constants.AT_BEGINNING_STRING,
+    sre_constants.AT_END, sre_constants.AT_END_LINE, sre_constants.AT_END_STRING,
+}
+CATEGORIES = {
+    sre_constants.CATEGORY_NOT_DIGIT, sre_constants.CATEGORY_NOT_SPACE, sre_constants.CATEGORY_NOT_WORD,
+    sre_constants.CATEGORY_NOT_LINEBREAK,
+}
+
+
+def separator_safe(pattern: str, flags: int = re.IGNORECASE) -> bool:
+    """
+    Whether a pattern matches each name of a chunk as it would on its own: it can't match
+    the separator, or an anchor at the start or end of the string.
+    """
+    try:
+        return _separator_safe(list(sre_parse.parse(pattern, flags)))
+    except (re.error, TypeError, ValueError):
+        return False
+
+
+def _separator_safe(sequence: List[Tuple[Any, Any]]) -> bool:
+    separator = ord(SEPARATOR)
+    for op, av in sequence:
+        if op is sre_constants.AT:
+            if av in ANCHORS:
+                return False
+        elif op is sre_constants.LITERAL:
+            if av == separator:
+                return False
+        elif op is sre_constants.IN:
+            if _in_class(av, separator):
+                return False
+        elif op is sre_constants.SUBPATTERN:
+            if not _separator_safe(list(av[-1])):
+                return False
+        elif op is ATOMIC_GROUP:
+            if not _separator_safe(list(av)):
+                return False
+        elif op is sre_constants.BRANCH:
+            if not all(_separator_safe(list(branch)) for branch in av[1]):
+                return False
+        elif op in REPEATS or op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            if not _separator_safe(list(av[-1])):
+                return False
+        elif op is sre_constants.GROUPREF_EXISTS:
+            if not all(branch is None or _separator_safe(list(branch)) for branch in av[1:]):
+                return False
+        elif op is not sre_constants.GROUPREF:
+            # Anything else (`.`, `[^...]` as a single character, ...) could match it.
+            return False
+    return True
+
+
+def _in_class(items: List[Tuple[Any, Any]], character: int) -> bool:
+    """
+    Whether a character class (of `sre_parse`) matches a character with no case, which
+    isn't a digit, space or word character.
+    """
+    negated = False
+    for op, av in items:
+        if op is sre_constants.NEGATE:
+            negated = True
+        elif op is sre_constants.LITERAL:
+            if av == character:
+                return not negated
+        elif op is sre_constants.RANGE:
+            if av[0] <= character <= av[1]:
+                return not negated
+        elif op is sre_constants.CATEGORY:
+            if av in CATEGORIES:
+                return not negated
+        else:
+            return True
+    return negated
+
+
+def scan_chunk(patterns: Sequence[Any], names: Sequence[str]) -> List[Dict[int, List[Dict[str, Any]]]]:
+    """
+    The matches of each pattern in each name, by `id` of the pattern, as `PTN.get_matches`
+    gives them, from one search of each pattern over the names joined with the separator.
+    The patterns have to be `separator_safe`, and the names can't have the separator in them.
+    """
+    chunk = SEPARATOR.join(names)
+    starts, start = [], 0
+    for name in names:
+        starts.append(start)
+        start += len(name) + 1
+    found: List[Dict[int, List[Dict[str, Any]]]] = [{} for _ in names]
+    for pattern in patterns:
+        key = id(pattern)
+        for match in pattern.finditer(chunk):
+            index = bisect_right(starts, match.start()) - 1
+            offset = starts[index]
+            groups = match.groups()
+            matches = found[index].get(key)
+            if matches is None:
+                matches = found[index][key] = []
+            matches.append({"match": groups if groups else [match.group()], "start": match.start() - offset, "end": match.end() - offset})
+    return found
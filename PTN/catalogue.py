@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+import json
+import re
+import unicodedata
+from array import array
+from collections import Counter
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .parse import PTN
+
+# Match parsed titles against a local catalogue of movies and shows. Titles on both sides are
+# reduced to a key (see `title_key`) so differences in case, punctuation, leading articles,
+# roman numerals and "&"/"and" don't matter. Exact keys are found with a dict lookup, and other
+# titles through an index of the character trigrams of every key.
+#
+# A roman numeral at the end of a title may be a number ("Rocky V") or a word ("Malcolm X"),
+# so it's only read as a number to match a catalogue title ending in a number (see
+# `numbered_key`). Numerals after a word marking a sequel ("Part II") are always numbers.
+
+ARTICLES = {"the", "a", "an"}
+
+ROMAN_NUMERAL = re.compile(r"x{0,3}(?:ix|iv|v?i{0,3})")
+ROMAN_VALUES = {"i": 1, "v": 5, "x": 10}
+SEQUEL_WORDS = {"part", "pt", "chapter", "episode", "ep", "volume", "vol", "book"}
+
+_ptn = None
+
+
+def _roman_value(word: str) -> Optional[int]:
+    if not ROMAN_NUMERAL.fullmatch(word):
+        return None
+    value = 0
+    for i, numeral in enumerate(word):
+        if i + 1 < len(word) and ROMAN_VALUES[numeral] < ROMAN_VALUES[word[i + 1]]:
+            value -= ROMAN_VALUES[numeral]
+        else:
+            value += ROMAN_VALUES[numeral]
+    return value
+
+
+def title_key(title: str, ptn: Optional[PTN] = None) -> str:
+    """
+    Reduce a title to the key it's matched on: cleaned like titles found by `PTN.parse`
+    (`clean_title` and `_clean_string`), case-folded, without accents or punctuation, "&" as
+    "and", a leading (or ", The"-style trailing) article dropped, and roman numerals up to
+    XXXIX after a word marking a sequel ("Part", "Episode", "Vol", ...) as numbers.
+    """
+    global _ptn
+    if ptn is None:
+        ptn = _ptn = _ptn or PTN()
+    # Titles only in non-English scripts are removed entirely by `clean_title`.
+    title = ptn._clean_string(ptn.clean_title(title)) or title
+    trailing_article = re.search(r",\s*(the|a|an)\s*$", title, re.IGNORECASE)
+    if trailing_article:
+        title = title[:trailing_article.start()]
+
+    title = unicodedata.normalize("NFKD", title.casefold())
+    title = "".join(c for c in title if not unicodedata.combining(c))
+    title = re.sub(r"['’`]", "", title).replace("&", " and ")
+    words = [word for word in re.split(r"[\W_]+", title) if word]
+    if len(words) > 1 and words[0] in ARTICLES:
+        words = words[1:]
+    for i in range(1, len(words)):
+        if words[i - 1] in SEQUEL_WORDS:
+            value = _roman_value(words[i])
+            if value:
+                words[i] = str(value)
+    return " ".join(words)
+
+
+def numbered_key(key: str) -> Optional[str]:
+    """
+    The key with the roman numeral ending it (after at least one other word) as a number, or
+    None if it doesn't end with one.
+    """
+    words = key.split(" ")
+    value = _roman_value(words[-1]) if len(words) > 1 else None
+    if not value:
+        return None
+    return " ".join(words[:-1] + [str(value)])
+
+
+def trigrams(key: str) -> List[str]:
+    """
+    The distinct character trigrams of a key, padded with spaces at the ends.
+    """
+    padded = f"  {key} "
+    return list(dict.fromkeys(padded[i:i + 3] for i in range(len(padded) - 2)))
+
+
+class CatalogueMatch(NamedTuple):
+    title: str
+    year: Optional[int]
+    id: Any
+    # 1.0 for the same key and year, lower for similar titles or other years.
+    score: float
+
+
+class TitleIndex:
+    """
+    An in-memory index of catalogue titles (with optional years and ids), to find the best match
+    for parse results.
+    """
+
+    def __init__(self, ptn: Optional[PTN] = None, candidates: int = 50):
+        """
+        :param ptn: The parser whose title cleaning the keys use.
+        :param candidates: How many titles sharing the most rare trigrams with a query are scored
+            when its key isn't in the catalogue.
+        """
+        self.ptn = ptn or PTN()
+        self.candidates = candidates
+        self.titles: List[str] = []
+        self.years: List[Optional[int]] = []
+        self.ids: List[Any] = []
+        self.keys: List[str] = []
+        self.by_key: Dict[str, List[int]] = {}
+        # The entries whose key ends with a roman numeral, by their `numbered_key`.
+        self.by_numbered_key: Dict[str, List[int]] = {}
+        self.postings: Dict[str, array] = {}
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def add(self, title: str, year: Optional[int] = None, id: Any = None) -> None:
+        entry = len(self.titles)
+        key = title_key(title, self.ptn)
+        self.titles.append(title)
+        self.years.append(year)
+        self.ids.append(id)
+        self.keys.append(key)
+        numbered = numbered_key(key)
+        if numbered:
+            self.by_numbered_key.setdefault(numbered, []).append(entry)
+        if key in self.by_key:
+            # Its trigrams are already indexed for the first entry with this key.
+            self.by_key[key].append(entry)
+            return
+        self.by_key[key] = [entry]
+        for gram in trigrams(key):
+            posting = self.postings.get(gram)
+            if posting is None:
+                posting = self.postings[gram] = array("I")
+            posting.append(entry)
+
+    @classmethod
+    def load(cls, path: str, ptn: Optional[PTN] = None, **kwargs: Any) -> "TitleIndex":
+        """
+        Load a catalogue file: JSON lines (`.jsonl`/`.ndjson`) with `title` and optional `year`
+        and `id`, or anything else as tab-separated title, year and id columns (the last two
+        optional).
+        """
+        index = cls(ptn, **kwargs)
+        with open(path, encoding="utf-8") as catalogue_file:
+            if path.endswith((".jsonl", ".ndjson")):
+                for line in catalogue_file:
+                    if line.strip():
+                        entry = json.loads(line)
+                        index.add(entry["title"], _year(entry.get("year")), entry.get("id"))
+            else:
+                for line in catalogue_file:
+                    columns = line.rstrip("\r\n").split("\t")
+                    if columns[0]:
+                        index.add(columns[0], _year(columns[1] if len(columns) > 1 else None), columns[2] if len(columns) > 2 else None)
+        return index
+
+    def lookup(self, title: str, year: Optional[int] = None, min_score: float = 0.6) -> Optional[CatalogueMatch]:
+        """
+        The best match for a title (and year), if it scores at least `min_score`.
+        """
+        return self._lookup(title_key(title, self.ptn), year, min_score)
+
+    def best_match(self, result: Dict[str, Any], min_score: float = 0.6) -> Optional[CatalogueMatch]:
+        """
+        The best match for a result of `PTN.parse`, using its `title` and `year`.
+        """
+        return self.lookup(result.get("title", ""), _year(result.get("year")), min_score)
+
+    def best_matches(self, results: Iterable[Dict[str, Any]], min_score: float = 0.6) -> List[Optional[CatalogueMatch]]:
+        """
+        `best_match` for many results, looking up each distinct title and year once.
+        """
+        keys, found, matches = {}, {}, []
+        for result in results:
+            title = result.get("title", "")
+            if title not in keys:
+                keys[title] = title_key(title, self.ptn)
+            query = (keys[title], _year(result.get("year")))
+            if query not in found:
+                found[query] = self._lookup(*query, min_score)
+            matches.append(found[query])
+        return matches
+
+    def _lookup(self, key: str, year: Optional[int], min_score: float) -> Optional[CatalogueMatch]:
+        if not key:
+            return None
+        # A title ending with a roman numeral also matches the same title ending with its
+        # number, either way round.
+        numbered = numbered_key(key)
+        entries = self.by_key.get(key, []) + self.by_numbered_key.get(key, []) + (self.by_key.get(numbered, []) if numbered else [])
+        best = self._best(entries, 1.0, year)
+        if best and best.score == 1.0:
+            return best
+        for entry, similarity in self._similar(key):
+            if best and similarity <= best.score:
+                break
+            candidate = self._best(self.by_key[self.keys[entry]], similarity, year)
+            if candidate and (not best or candidate.score > best.score):
+                best = candidate
+        return best if best and best.score >= min_score else None
+
+    def _best(self, entries: Iterable[int], similarity: float, year: Optional[int]) -> Optional[CatalogueMatch]:
+        best = None
+        for entry in entries:
+            score = similarity - _year_penalty(year, self.years[entry])
+            if not best or score > best.score:
+                best = CatalogueMatch(self.titles[entry], self.years[entry], self.ids[entry], score)
+        return best
+
+    def _similar(self, key: str) -> List[Tuple[int, float]]:
+        """
+        The entries whose keys share the most rare trigrams with `key`, with their similarity
+        (the Dice coefficient of the trigram sets), most similar first.
+        """
+        grams = trigrams(key)
+        rare = sorted((gram for gram in grams if gram in self.postings), key=lambda gram: len(self.postings[gram]))
+        counts = Counter()
+        for gram in rare[:max(3, len(rare) // 2)]:
+            counts.update(self.postings[gram])
+        similar = []
+        gram_set = set(grams)
+        for entry, _ in counts.most_common(self.candidates):
+            other = trigrams(self.keys[entry])
+            similar.append((entry, 2 * len(gram_set.intersection(other)) / (len(gram_set) + len(other))))
+        return sorted(similar, key=lambda s: s[1], reverse=True)
+
+
+def _year(year: Any) -> Optional[int]:
+    # Years are lists of one year in results parsed with `coherent_types`.
+    if isinstance(year, list):
+        year = year[0] if len(year) == 1 else None
+    try:
+        return int(year)
+    except (TypeError, ValueError):
+        return None
+
+
+def _year_penalty(year: Optional[int], catalogue_year: Optional[int]) -> float:
+    if year is None or catalogue_year is None or year == catalogue_year:
+        return 0.0
+    # Release years often differ by one between regions and databases.
+    return 0.05 if abs(year - catalogue_year) == 1 else 0.3
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+import re
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .episodes import TokenMatch
+from .extras import delimiters
+from .patterns import day_pattern, month_pattern, patterns, year_pattern
+
+# The `year`, `month` and `day` patterns each search the whole name, and `month` and `day`
+# are the same full date (YYYY.MM.DD, as daily shows are named) for different groups. A full
+# date starts with a year, and years can't overlap, so one scan for the years, each followed
+# by the rest of a date if there is one, finds what all three would.
+
+SOURCES = {key: rf"\b(?:{patterns[key]})\b" for key in ("year", "month", "day")}
+
+
+class Dates:
+    """
+    The years and the first full date in the last string, which the `year`, `month` and
+    `day` patterns match in turn.
+    """
+
+    def __init__(self, compile: Callable[[str, int], Any], flags: int = re.IGNORECASE):
+        # The lookahead always matches, with the month and day if the year starts a date.
+        self.scan = compile(
+            rf"\b(?:{year_pattern})\b(?=(?:{delimiters}({month_pattern}){delimiters}({day_pattern})\b)?)", flags
+        )
+        self._string: Optional[str] = None
+        self._matches: Dict[str, List[TokenMatch]] = {}
+
+    def wrap(self, key: str, regex: Any) -> Any:
+        """
+        A DatePattern for a compiled `year`, `month` or `day` pattern, or the pattern itself
+        if it was changed.
+        """
+        if key in SOURCES and regex.pattern == SOURCES[key]:
+            return DatePattern(regex, key, self)
+        return regex
+
+    def matches(self, string: str) -> Dict[str, List[TokenMatch]]:
+        if string != self._string:
+            self._string, self._matches = string, self._scan(string)
+        return self._matches
+
+    def _scan(self, string: str) -> Dict[str, List[TokenMatch]]:
+        found = {"year": [], "month": [], "day": []}
+        for match in self.scan.finditer(string):
+            start = match.start()
+            found["year"].append(TokenMatch(string, start, match.end()))
+            if match.group(1) and not found["month"]:
+                end = match.end(2)
+                found["month"].append(TokenMatch(string, start, end, (match.group(1),)))
+                found["day"].append(TokenMatch(string, start, end, (match.group(2),)))
+        return found
+
+
+class DatePattern:
+    """
+    Matches like the compiled `year`, `month` or `day` pattern, from the years and dates
+    found by Dates.
+    """
+
+    def __init__(self, regex: Any, key: str, dates: Dates):
+        self.regex = regex
+        self.pattern = regex.pattern
+        self.flags = regex.flags
+        self.groups = regex.groups
+        self.key = key
+        self.dates = dates
+
+    def finditer(self, string: str) -> Iterator[Any]:
+        return iter(self.dates.matches(string)[self.key])
+
+    def search(self, string: str) -> Optional[Any]:
+        return next(self.finditer(string), None)
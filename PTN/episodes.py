@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+import re
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from .extras import delimiters
+from .patterns import patterns
+
+# The `seasons` and `episodes` options are searched for one after the other, and several of
+# them embed others (the episodes in a season, the seasons before a part). Most names only
+# have one of a few common forms (S01E02, S01E01-E03, 1x02, S01, S01-S03, Season 1), or no
+# season or episode at all. Those are recognised with one scan, and what each option would
+# match is worked out from the form, without running the options.
+#
+# Every match of an option has one of the `FEATURES` in it (a digit after an "s" or an "e",
+# " - " before a digit, ...). The scan looks for the forms, and for the features outside of
+# them: if there are no features, no option can match, and if there is one form and no other
+# feature, the options can only match where the form is (the lookaheads of the forms rule
+# out what could make an option's match go on after the form). Otherwise, or if the
+# options were changed, each option is matched with its regex.
+
+SEASONS = list(patterns["seasons"])
+EPISODES = list(patterns["episodes"])
+SEASON_RANGE, SEASON_EPISODE, SEASON_X_EPISODE, SEASON_WORD = 2, 4, 5, 8
+EPISODE, X_EPISODE = 0, 2
+
+NOT_FOLLOWED = r"(?![\w)])"
+NO_RANGE = r"(?!\s*(?:-|\s*to\s*)\s*s?\d)"
+FORMS = {
+    # What's after the form is ruled out if an option could go on with it.
+    "season_range": rf"S([0-9]{{1,2}})-S?([0-9]{{1,2}}){NOT_FOLLOWED}(?!{delimiters}*complete)",
+    "episode_range": rf"S([0-9]{{1,2}})(E([0-9]{{1,2}})(?:-E?|E)[0-9]{{1,2}}){NOT_FOLLOWED}",
+    "episode": rf"S([0-9]{{1,2}})(E[0-9]{{1,2}}){NOT_FOLLOWED}(?!-(?:ep?)?\d)",
+    "season": rf"S([0-9]{{1,2}}){NOT_FOLLOWED}{NO_RANGE}",
+    "cross": rf"([0-9]{{1,2}})x([0-9]{{2}}){NOT_FOLLOWED}",
+    "season_word": (
+        rf"Season[. -][0-9]{{1,2}}{NOT_FOLLOWED}{NO_RANGE}"
+        rf"(?!{delimiters}*P(?:ar)?t)(?!(?:{delimiters}|&|and|to){{1,3}}\d)"
+    ),
+}
+FEATURES = [
+    r"s\d",
+    rf"(?:(?<!\w)|(?<=complete))s(?:easons?)?{delimiters}*s?\d",
+    r"(?<![a-z])ep?\(?\d",
+    r"\s-\s\d",
+    r"\b\d{1,2}x\d",
+    rf"\d(?:st|nd|rd|th){delimiters}season",
+    rf"series{delimiters}\d",
+    rf"episod(?:e|io){delimiters}\d",
+]
+
+
+class TokenMatch:
+    """
+    What an option would have matched, with its groups.
+    """
+
+    def __init__(self, string: str, start: int, end: int, groups: Tuple[Optional[str], ...] = ()):
+        self.string = string
+        self._start, self._end, self._groups = start, end, groups
+
+    def start(self) -> int:
+        return self._start
+
+    def end(self) -> int:
+        return self._end
+
+    def span(self) -> Tuple[int, int]:
+        return self._start, self._end
+
+    def group(self, index: int = 0) -> Optional[str]:
+        return self.string[self._start:self._end] if index == 0 else self._groups[index - 1]
+
+    def groups(self) -> Tuple[Optional[str], ...]:
+        return self._groups
+
+
+class SeasonEpisodeScanner:
+    """
+    Finds the common forms of seasons and episodes in the last string, and what the
+    `seasons` and `episodes` options would match in it.
+    """
+
+    def __init__(self, compile: Callable[[str, int], Any], flags: int = re.IGNORECASE):
+        forms = "|".join(f"(?P<{form}>{pattern})" for form, pattern in FORMS.items())
+        # Everything starts with one of these (checking them first is much faster).
+        self.scan = compile(rf"(?=[se\d\s])(?:(?<!\w)(?:{forms})|{'|'.join(FEATURES)})", flags)
+        self.forms = {form: compile(pattern, flags) for form, pattern in FORMS.items()}
+        self.complete = compile(rf"\bcomplete{delimiters}", flags)
+        self.complete_run = compile(r"\bcomplete", flags)
+        self.delimiter = compile(delimiters, flags)
+        self.word = compile(r"\w", flags)
+        self._string: Optional[str] = None
+        self._matches: Optional[Dict[Tuple[str, int], TokenMatch]] = None
+
+    def wrap(self, key: str, regex: Any) -> Any:
+        """
+        A ScannedPattern for a compiled `seasons` or `episodes` option, or the option itself
+        if it was changed.
+        """
+        sources = SEASONS if key == "seasons" else EPISODES
+        if regex.pattern in sources:
+            return ScannedPattern(regex, (key, sources.index(regex.pattern)), self)
+        return regex
+
+    def matches(self, string: str) -> Optional[Dict[Tuple[str, int], TokenMatch]]:
+        """
+        The match of each option (by key and index) in a string, or None if the options
+        have to be matched with their regexes.
+        """
+        if string != self._string:
+            self._string, self._matches = string, self._scan(string)
+        return self._matches
+
+    def _scan(self, string: str) -> Optional[Dict[Tuple[str, int], TokenMatch]]:
+        found = self.scan.finditer(string)
+        token = next(found, None)
+        if token is None:
+            return {}
+        if token.lastgroup is None or next(found, None) is not None:
+            return None
+        form, start, end = token.lastgroup, token.start(), token.end()
+        groups = self.forms[form].match(string, start).groups()
+        # `\b(?:Complete{delimiters})?s...`
+        prefixed = start - 9 if start >= 9 and self.complete.match(string, start - 9) else start
+        if form == "season_range":
+            return {
+                ("seasons", SEASON_RANGE): TokenMatch(string, self._range_start(string, start), end),
+                ("seasons", SEASON_EPISODE): TokenMatch(string, prefixed, start + 1 + len(groups[0]), (groups[0], None)),
+            }
+        if form in ("episode_range", "episode"):
+            return {
+                ("seasons", SEASON_EPISODE): TokenMatch(string, prefixed, end, (groups[0], None)),
+                ("episodes", EPISODE): TokenMatch(string, start + 1 + len(groups[0]), end),
+            }
+        if form == "season":
+            return {("seasons", SEASON_EPISODE): TokenMatch(string, prefixed, end, (groups[0], None))}
+        if form == "cross":
+            return {
+                ("seasons", SEASON_X_EPISODE): TokenMatch(string, start, end, (groups[0],)),
+                ("episodes", X_EPISODE): TokenMatch(string, start, end, (groups[1],)),
+            }
+        return {("seasons", SEASON_WORD): TokenMatch(string, prefixed, end)}
+
+    def _range_start(self, string: str, start: int) -> int:
+        """
+        Where `\\b(?:Complete{delimiters}*)?{delimiters}*s...` starts, for an "s" at `start`.
+        """
+        run = start
+        while run > 0 and self.delimiter.match(string, run - 1):
+            run -= 1
+        if run >= 8 and self.complete_run.match(string, run - 8):
+            return run - 8
+        if 0 < run < start and self.word.match(string, run - 1):
+            return run
+        return start
+
+
+class ScannedPattern:
+    """
+    Matches like a compiled `seasons` or `episodes` option, from the forms found by a
+    SeasonEpisodeScanner where it can.
+    """
+
+    def __init__(self, regex: Any, role: Tuple[str, int], scanner: SeasonEpisodeScanner):
+        self.regex = regex
+        self.pattern = regex.pattern
+        self.flags = regex.flags
+        self.groups = regex.groups
+        self.role = role
+        self.scanner = scanner
+
+    def finditer(self, string: str) -> Iterator[Any]:
+        matches = self.scanner.matches(string)
+        if matches is None:
+            return self.regex.finditer(string)
+        match = matches.get(self.role)
+        return iter((match,) if match else ())
+
+    def search(self, string: str) -> Optional[Any]:
+        return next(self.finditer(string), None)
@@ -0,0 +1,258 @@
+#!/usr/bin/env python
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+from collections import deque
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Union
+from xml.etree import ElementTree
+
+from .parse import PTN
+
+# Read Torznab/RSS feeds (as saved from an indexer's API) item by item, without loading the
+# whole document: each item is taken out of the tree once it has been read, so memory stays
+# bounded by the size of an item whatever the size of the feed. Items are parsed in batches,
+# in worker processes if asked, while the feeds are still being read.
+
+# Namespaces of the `<torznab:attr name=... value=...>` elements of Torznab and Newznab feeds.
+ATTR_NAMESPACES = ("http://torznab.com/schemas/2015/feed", "http://www.newznab.com/DTD/2010/feeds/attributes/")
+ATTR_TAGS = frozenset(f"{{{namespace}}}attr" for namespace in ATTR_NAMESPACES)
+
+FEED_EXTENSIONS = (".xml", ".rss", ".torznab")
+
+# Set in each worker process by _init_worker.
+_worker_ptn = None
+_worker_options = None
+
+
+class FeedItem:
+    """
+    An item of a feed: its title, link, size in bytes, seeders and category ids. Those the
+    feed doesn't give are None (or an empty list of categories).
+    """
+
+    def __init__(
+        self,
+        source: Optional[str],
+        title: str,
+        link: Optional[str],
+        size: Optional[int],
+        seeders: Optional[int],
+        categories: List[int],
+    ):
+        self.source = source
+        self.title = title
+        self.link = link
+        self.size = size
+        self.seeders = seeders
+        self.categories = categories
+        # The parse of `title`, filled in by `parse_feeds`.
+        self.result: Optional[Dict[str, Any]] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "source": self.source,
+            "title": self.title,
+            "link": self.link,
+            "size": self.size,
+            "seeders": self.seeders,
+            "categories": self.categories,
+            "result": self.result,
+        }
+
+    def __repr__(self) -> str:
+        return f"FeedItem({self.title!r}, size={self.size}, seeders={self.seeders})"
+
+
+def _int(text: Optional[str]) -> Optional[int]:
+    try:
+        return int(text.strip())
+    except (AttributeError, ValueError):
+        return None
+
+
+def read_item(element: ElementTree.Element, source: Optional[str] = None) -> Optional[FeedItem]:
+    """
+    The item of an `<item>` element, or None if it has no title. The Torznab attributes are
+    preferred to the plain elements (`<size>`, `<category>`, the enclosure's length).
+    """
+    title = link = None
+    sizes, categories, attrs = [], [], {}
+    for child in element:
+        tag = child.tag
+        if tag == "title":
+            title = (child.text or "").strip()
+        elif tag == "link":
+            link = (child.text or "").strip() or None
+        elif tag == "size":
+            sizes.append(_int(child.text))
+        elif tag == "category":
+            categories.append(_int(child.text))
+        elif tag == "enclosure":
+            sizes.append(_int(child.get("length")))
+            link = link or child.get("url")
+        elif tag in ATTR_TAGS:
+            name, value = child.get("name"), child.get("value")
+            if name == "category":
+                attrs.setdefault("categories", []).append(_int(value))
+            elif name in ("size", "seeders"):
+                attrs[name] = _int(value)
+    if not title:
+        return None
+    size = attrs.get("size")
+    if size is None:
+        size = next((size for size in sizes if size is not None), None)
+    categories = [category for category in attrs.get("categories", categories) if category is not None]
+    return FeedItem(source, title, link, size, attrs.get("seeders"), list(dict.fromkeys(categories)))
+
+
+def read_feed(source: Union[str, BinaryIO]) -> Iterator[FeedItem]:
+    """
+    Read the items of a feed, from a path or a binary file-like object, as they're reached.
+    """
+    name = source if isinstance(source, str) else getattr(source, "name", None)
+    parents = []
+    for event, element in ElementTree.iterparse(source, events=("start", "end")):
+        if event == "start":
+            parents.append(element)
+            continue
+        parents.pop()
+        if element.tag != "item":
+            continue
+        item = read_item(element, name)
+        # Drop the item from the tree, which otherwise keeps every item read so far.
+        element.clear()
+        if parents:
+            parents[-1].remove(element)
+        if item is not None:
+            yield item
+
+
+def feed_paths(sources: Iterable[Union[str, BinaryIO]], recursive: bool = False) -> Iterator[Union[str, BinaryIO]]:
+    """
+    Expand directories into the feed files (`.xml`, `.rss`, `.torznab`) in them, in name order.
+    """
+    for source in sources:
+        if not isinstance(source, str) or not os.path.isdir(source):
+            yield source
+            continue
+        if recursive:
+            for root, dirs, files in os.walk(source):
+                dirs.sort()
+                for file_name in sorted(files):
+                    if file_name.endswith(FEED_EXTENSIONS):
+                        yield os.path.join(root, file_name)
+        else:
+            for file_name in sorted(os.listdir(source)):
+                if file_name.endswith(FEED_EXTENSIONS) and os.path.isfile(os.path.join(source, file_name)):
+                    yield os.path.join(source, file_name)
+
+
+def _read_feeds(sources: Iterable[Union[str, BinaryIO]], recursive: bool, skip_invalid: bool) -> Iterator[FeedItem]:
+    for source in feed_paths(sources, recursive):
+        try:
+            yield from read_feed(source)
+        except (OSError, ElementTree.ParseError):
+            # The items before the error were already read.
+            if skip_invalid:
+                continue
+            raise
+
+
+def _init_worker(options: Dict[str, Any]) -> None:
+    global _worker_ptn, _worker_options
+    _worker_ptn = PTN(**options["parser"])
+    _worker_options = options
+
+
+def _parse_titles(titles: List[str]) -> List[Dict[str, Any]]:
+    return _worker_ptn.parse_many(titles, standardise=_worker_options["standardise"], coherent_types=_worker_options["coherent_types"])
+
+
+def parse_feeds(
+    sources: Iterable[Union[str, BinaryIO]],
+    ptn: Optional[PTN] = None,
+    standardise: bool = True,
+    coherent_types: bool = False,
+    recursive: bool = False,
+    skip_invalid: bool = False,
+    workers: int = 1,
+    batch_size: int = 512,
+    **parser_options: Any,
+) -> Iterator[FeedItem]:
+    """
+    Read feeds (paths, directories expanded to the feed files in them, or binary file-like
+    objects) and yield their items, in order, with `item.result` set to the parse of their
+    title. Titles are parsed with `parse_many`, `batch_size` at a time.
+
+    :param workers: Number of worker processes to parse the batches in, while this process
+        reads the feeds. At most two batches per worker are waiting to be parsed, so memory
+        stays bounded. With 1, batches are parsed in this process, with `ptn`.
+    :param parser_options: Passed to `PTN(...)` in each worker, e.g. `profile="fast"`.
+    """
+    if batch_size < 1 or workers < 1:
+        raise ValueError("`batch_size` and `workers` must be positive")
+    if ptn is not None and (workers > 1 or parser_options):
+        raise ValueError("Give either `ptn` to parse in this process, or parser options")
+    items = _read_feeds(sources, recursive, skip_invalid)
+    batches = iter(lambda: list(itertools.islice(items, batch_size)), [])
+
+    if workers == 1:
+        ptn = ptn or PTN(**parser_options)
+        for batch in batches:
+            yield from _with_results(batch, ptn.parse_many([item.title for item in batch], standardise, coherent_types))
+        return
+
+    options = {"standardise": standardise, "coherent_types": coherent_types, "parser": parser_options}
+    pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(options,))
+    try:
+        pending = deque()
+        for batch in batches:
+            pending.append((batch, pool.apply_async(_parse_titles, ([item.title for item in batch],))))
+            if len(pending) == 2 * workers:
+                batch, parsed = pending.popleft()
+                yield from _with_results(batch, parsed.get())
+        while pending:
+            batch, parsed = pending.popleft()
+            yield from _with_results(batch, parsed.get())
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _with_results(batch: List[FeedItem], results: List[Dict[str, Any]]) -> Iterator[FeedItem]:
+    for item, result in zip(batch, results):
+        item.result = result
+        yield item
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse the items of saved Torznab/RSS feeds, writing them as NDJSON.")
+    parser.add_argument("feeds", nargs="+", help="feed files, or directories of them")
+    parser.add_argument("--output", help="file to write to (default: standard output)")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--raw", dest="standardise", action="store_false", help="don't standardise the output")
+    parser.add_argument("--coherent-types", action="store_true")
+    parser.add_argument("--recursive", action="store_true")
+    parser.add_argument("--skip-invalid", action="store_true")
+    parser.add_argument("--profile", default="full")
+    args = parser.parse_args()
+
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for item in parse_feeds(
+            args.feeds, standardise=args.standardise, coherent_types=args.coherent_types, recursive=args.recursive,
+            skip_invalid=args.skip_invalid, workers=args.workers, batch_size=args.batch_size, profile=args.profile,
+        ):
+            output.write(json.dumps(item.as_dict(), ensure_ascii=False))
+            output.write("\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
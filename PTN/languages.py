@@ -0,0 +1,308 @@
+#!/usr/bin/env python
+import re
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from .extras import delimiters, langs, link_patterns
+from .patterns import language_list_pattern, patterns
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants
+    import sre_parse
+
+# The `languages` patterns are a list of languages, each optionally followed by "dub(bed)" or
+# an audio option, then delimiters (`lang_list_pattern`, repeated), followed by a subtitles
+# condition. As one regex, the audio alternation under the repeat backtracks a lot on names
+# with long lists of languages. Instead, this walks the list a language at a time: the
+# language, audio and delimiters after each position are matched with small anchored regexes,
+# tried in the same order as the big regex would, and each position is only explored once.
+#
+# The regex picks the first of its alternatives (in priority order) that leads to a match.
+# Where the walk can't tell that order (several languages or audio options ending at
+# different places, the first of which doesn't lead to a match), it only goes on if all of
+# them lead to the same match, and otherwise hands the name to the regex.
+
+LANGUAGES = link_patterns(langs)
+FOLLOWED = rf"(?={delimiters}|\b)"
+
+
+def qualifiers_pattern(audio: Any) -> str:
+    return rf"(?:dub(?:bed)?|{link_patterns(audio)})"
+
+
+class Ambiguous(Exception):
+    pass
+
+
+class ListMatch:
+    """
+    A match of a `LanguageListPattern`, with the list of languages as its only group.
+    """
+
+    def __init__(self, string: str, start: int, list_end: int, end: int):
+        self.string = string
+        self._start, self._list_end, self._end = start, list_end, end
+
+    def start(self) -> int:
+        return self._start
+
+    def end(self) -> int:
+        return self._end
+
+    def span(self) -> Tuple[int, int]:
+        return self._start, self._end
+
+    def group(self, index: int = 0) -> str:
+        return self.string[self._start:self._end] if index == 0 else self.string[self._start:self._list_end]
+
+    def groups(self) -> Tuple[str]:
+        return (self.group(1),)
+
+
+class LanguageLists:
+    """
+    The parts the `languages` patterns share, and what was found walking the last string,
+    which all of them match in turn.
+    """
+
+    def __init__(self, compile: Callable[[str, int], Any], flags: int = re.IGNORECASE, audio: Any = None):
+        """
+        :param audio: The `audio` options the lists are built with, if not the default ones.
+        """
+        audio = patterns["audio"] if audio is None else audio
+        self.compile = compile
+        self.list_pattern = language_list_pattern(audio)
+        self.language = compile(LANGUAGES, flags)
+        self.first_language = compile(LANGUAGES + FOLLOWED, flags)
+        qualifiers = qualifiers_pattern(audio)
+        self.qualifier = compile(qualifiers, flags)
+        self.first_qualifier = compile(qualifiers + FOLLOWED, flags)
+        self.delimiters = compile(rf"{delimiters}+", flags)
+        self.boundary = compile(r"\b", flags)
+        # Where a language can start, checking its first character first (much faster).
+        first = first_characters(list(sre_parse.parse(LANGUAGES, flags)))
+        first = f"(?=[{''.join(re.escape(c) for c in sorted(first))}])" if first else ""
+        self.starts = compile(rf"\b{first}(?={LANGUAGES}{FOLLOWED})", flags)
+        self.language_width = sre_parse.parse(LANGUAGES, flags).getwidth()[1]
+        self.qualifier_width = sre_parse.parse(qualifiers, flags).getwidth()[1]
+        self._walk = None
+
+    def wrap(self, regex: Any) -> Any:
+        """
+        A LanguageListPattern for a compiled pattern, or the pattern itself if it isn't a list
+        of languages followed by a condition (e.g. the patterns were changed).
+        """
+        lang_list = self.list_pattern
+        for prefix, suffix in ((rf"\b(?:({lang_list}+)", r")\b"), (rf"({lang_list}+)", "")):
+            if regex.pattern.startswith(prefix) and regex.pattern.endswith(suffix):
+                condition = regex.pattern[len(prefix):len(regex.pattern) - len(suffix)] + suffix[1:]
+                return LanguageListPattern(regex, self.compile(condition, regex.flags), self)
+        return regex
+
+    def walk(self, string: str) -> "_Walk":
+        walk = self._walk
+        if walk is None or walk.string != string:
+            walk = self._walk = _Walk(self, string)
+        return walk
+
+
+def first_characters(sequence: List[Tuple[Any, Any]]) -> Optional[Set[str]]:
+    """
+    The characters a match of a parsed regex can start with, or None if it can't tell.
+    """
+    characters = set()
+    for op, av in sequence:
+        if op is sre_constants.AT:
+            continue
+        if op is sre_constants.LITERAL:
+            node = {chr(av)}
+        elif op is sre_constants.IN and all(item_op is sre_constants.LITERAL for item_op, _ in av):
+            node = {chr(item_av) for _, item_av in av}
+        elif op is sre_constants.SUBPATTERN:
+            node = first_characters(list(av[-1]))
+        elif op is sre_constants.BRANCH:
+            branches = [first_characters(list(branch)) for branch in av[1]]
+            node = None if None in branches else set().union(*branches)
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            node = first_characters(list(av[2]))
+        else:
+            node = None
+        if node is None:
+            return None
+        characters |= node
+        # Only a part that can match nothing lets the match start with what follows it.
+        if op in (sre_constants.LITERAL, sre_constants.IN):
+            return characters
+        if op is sre_constants.SUBPATTERN and av[-1].getwidth()[0] > 0:
+            return characters
+        if op is sre_constants.BRANCH and all(branch.getwidth()[0] > 0 for branch in av[1]):
+            return characters
+        if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) and av[0] > 0 and av[2].getwidth()[0] > 0:
+            return characters
+    return None
+
+
+class LanguageListPattern:
+    """
+    Matches like a compiled `languages` pattern (`(lang_list_pattern+)` and a condition),
+    with the same spans and list of languages.
+    """
+
+    def __init__(self, regex: Any, condition: Any, lists: LanguageLists):
+        self.regex = regex
+        self.pattern = regex.pattern
+        self.flags = regex.flags
+        self.groups = 1
+        self.condition = condition
+        self.lists = lists
+
+    def finditer(self, string: str) -> Iterator[Any]:
+        try:
+            return iter(self.lists.walk(string).matches(self.condition))
+        except Ambiguous:
+            return self.regex.finditer(string)
+
+    def search(self, string: str) -> Optional[Any]:
+        return next(self.finditer(string), None)
+
+
+# Groups of ends of a language: in the order the regex tries them, or the other ends of a
+# qualifier or language than the one tried first, which are only looked for if needed and
+# whose order isn't known.
+ORDERED, OTHER_QUALIFIERS, OTHER_LANGUAGES = range(3)
+
+
+class _Walk:
+    """
+    Walks the lists of languages in one string, for any condition.
+    """
+
+    def __init__(self, lists: LanguageLists, string: str):
+        self.lists = lists
+        self.string = string
+        self.starts = [match.start() for match in lists.starts.finditer(string)]
+        self._delimiter_runs: Dict[int, int] = {}
+        self._language_ends: Dict[int, List[Tuple[int, Any]]] = {}
+        self._other_ends: Dict[Tuple[int, int], List[int]] = {}
+        # By condition, the last position it was found to match at, and the first position
+        # from which it was found not to match anywhere.
+        self._conditions: Dict[int, Tuple[int, int]] = {}
+        # By condition (its id), the match (end of the list, end of the match) found from a
+        # position after a language, or None.
+        self._results: Dict[int, Dict[int, Optional[Tuple[int, int]]]] = {}
+
+    def matches(self, condition: Any) -> List[ListMatch]:
+        results = self._results.setdefault(id(condition), {})
+        matches, position = [], 0
+        for start in self.starts:
+            if start < position:
+                continue
+            result = self.after(start, condition, results)
+            if result is not None:
+                matches.append(ListMatch(self.string, start, *result))
+                position = result[1]
+        return matches
+
+    def result(self, position: int, condition: Any, results: Dict[int, Optional[Tuple[int, int]]]) -> Optional[Tuple[int, int]]:
+        """
+        The match from a position after at least one language: more languages, or the
+        condition.
+        """
+        if position not in results:
+            result = self.after(position, condition, results)
+            if result is None:
+                match = condition.match(self.string, position)
+                result = (position, match.end()) if match else None
+            results[position] = result
+        return results[position]
+
+    def after(self, position: int, condition: Any, results: Dict[int, Optional[Tuple[int, int]]]) -> Optional[Tuple[int, int]]:
+        """
+        The match from continuing with another language at a position.
+        """
+        if not self.condition_after(position, condition):
+            return None
+        for kind, ends in self.language_ends(position):
+            if kind == OTHER_LANGUAGES:
+                # Only languages ending at different places than the first can't be followed.
+                if self.other_ends(*ends):
+                    raise Ambiguous()
+                continue
+            if kind == OTHER_QUALIFIERS:
+                ends = [i for other in self.other_ends(*ends) for i in self.delimited_ends(other)]
+                found = {self.result(end, condition, results) for end in ends} - {None}
+                if len(found) > 1:
+                    raise Ambiguous()
+                if found:
+                    return found.pop()
+                continue
+            for end in ends:
+                result = self.result(end, condition, results)
+                if result is not None:
+                    return result
+        return None
+
+    def condition_after(self, position: int, condition: Any) -> bool:
+        """
+        Whether the condition matches anywhere from a position, without which nothing after
+        it can match.
+        """
+        matched, unmatched = self._conditions.get(id(condition), (-1, len(self.string) + 1))
+        if position <= matched:
+            return True
+        if position >= unmatched:
+            return False
+        match = condition.search(self.string, position)
+        if match:
+            matched = match.start()
+        else:
+            unmatched = position
+        self._conditions[id(condition)] = (matched, unmatched)
+        return match is not None
+
+    def language_ends(self, position: int) -> List[Tuple[int, Any]]:
+        """
+        Where a language (with its dub or audio qualifier, and delimiters) starting at a
+        position can end.
+        """
+        if position in self._language_ends:
+            return self._language_ends[position]
+        # Only the first language of a list must start at a word boundary (`starts` checks it):
+        # the ones after it can follow an underscore, which is a word character.
+        lists, groups = self.lists, []
+        first = lists.first_language.match(self.string, position)
+        if first:
+            end = first.end()
+            for skip in range(self.delimiter_run(end), 0, -1):
+                qualifier = lists.first_qualifier.match(self.string, end + skip)
+                if qualifier:
+                    groups.append((ORDERED, self.delimited_ends(qualifier.end())))
+                    groups.append((OTHER_QUALIFIERS, (lists.qualifier, end + skip, qualifier.end(), lists.qualifier_width)))
+            groups.append((ORDERED, self.delimited_ends(end)))
+            groups.append((OTHER_LANGUAGES, (lists.language, position, end, lists.language_width)))
+        self._language_ends[position] = groups
+        return groups
+
+    def delimiter_run(self, position: int) -> int:
+        if position not in self._delimiter_runs:
+            match = self.lists.delimiters.match(self.string, position)
+            self._delimiter_runs[position] = match.end() - position if match else 0
+        return self._delimiter_runs[position]
+
+    def delimited_ends(self, end: int) -> List[int]:
+        ends = [end + count for count in range(self.delimiter_run(end), 0, -1)]
+        return ends + [end] if self.lists.boundary.match(self.string, end) else ends
+
+    def other_ends(self, regex: Any, start: int, first: int, width: int) -> List[int]:
+        """
+        Where else than `first` a regex (matching at most `width` characters) starting at
+        `start` can end, and be followed by delimiters or a word boundary.
+        """
+        key = (start, first)
+        if key not in self._other_ends:
+            self._other_ends[key] = [
+                end for end in range(start + 1, min(start + width, len(self.string)) + 1)
+                if end != first and (self.delimiter_run(end) or self.lists.boundary.match(self.string, end)) and regex.fullmatch(self.string, start, end)
+            ]
+        return self._other_ends[key]
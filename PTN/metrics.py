@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence
+
+# Runtime metrics for a parser: parse latency, which fields come back, how much is left in
+# `excess`, and cache hit rates. Each thread counts into its own shard without locking, and
+# shards are summed when a snapshot is taken.
+
+# Upper bounds of the latency histogram buckets, in seconds.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.25)
+
+
+class _Shard:
+    """
+    The counts of a single thread.
+    """
+
+    def __init__(self, buckets: int):
+        self.latency = [0] * (buckets + 1)
+        self.latency_sum = 0.0
+        self.parses = 0
+        self.fields: Dict[str, int] = {}
+        self.empty_title = 0
+        self.with_excess = 0
+        self.excess_tokens = 0
+        # Cache name -> [hits, misses].
+        self.caches: Dict[str, List[int]] = {}
+
+
+class Metrics:
+    """
+    Counts parses made by the parsers it's attached to, e.g. `PTN(metrics=Metrics())`.
+    Safe to share between threads.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._lock = threading.Lock()
+
+    def _shard(self) -> _Shard:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = _Shard(len(self.buckets))
+            with self._lock:
+                self._shards.append(shard)
+            return shard
+
+    def observe(self, seconds: float, result: Dict[str, Any]) -> None:
+        """
+        Record one parse that took `seconds` and returned `result`.
+        """
+        shard = self._shard()
+        shard.latency[bisect_left(self.buckets, seconds)] += 1
+        shard.latency_sum += seconds
+        shard.parses += 1
+        fields = shard.fields
+        for field, value in result.items():
+            if value != "" and value != [] and value is not None:
+                fields[field] = fields.get(field, 0) + 1
+        if not result.get("title"):
+            shard.empty_title += 1
+        excess = result.get("excess")
+        if excess:
+            shard.with_excess += 1
+            shard.excess_tokens += len(excess) if isinstance(excess, list) else 1
+
+    def cache(self, name: str, hit: bool) -> None:
+        """
+        Record a lookup in the cache called `name`.
+        """
+        caches = self._shard().caches
+        counts = caches.get(name)
+        if counts is None:
+            counts = caches[name] = [0, 0]
+        counts[0 if hit else 1] += 1
+
+    def reset(self) -> None:
+        """
+        Forget everything recorded so far.
+        """
+        with self._lock:
+            self._shards = []
+            self._local = threading.local()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        The totals over all threads, as a plain dict.
+        """
+        with self._lock:
+            shards = list(self._shards)
+        latency = [0] * (len(self.buckets) + 1)
+        snapshot = {
+            "parses": 0,
+            "latency": {"sum": 0.0},
+            "fields": {},
+            "empty_title": 0,
+            "with_excess": 0,
+            "excess_tokens": 0,
+            "caches": {},
+        }
+        for shard in shards:
+            for i, count in enumerate(list(shard.latency)):
+                latency[i] += count
+            snapshot["latency"]["sum"] += shard.latency_sum
+            snapshot["parses"] += shard.parses
+            for field, count in dict(shard.fields).items():
+                snapshot["fields"][field] = snapshot["fields"].get(field, 0) + count
+            for key in ("empty_title", "with_excess", "excess_tokens"):
+                snapshot[key] += getattr(shard, key)
+            for name, (hits, misses) in dict(shard.caches).items():
+                cache = snapshot["caches"].setdefault(name, {"hits": 0, "misses": 0})
+                cache["hits"] += hits
+                cache["misses"] += misses
+
+        # Cumulative counts per bucket, as in Prometheus histograms.
+        cumulative, total = {}, 0
+        for bound, count in zip(list(self.buckets) + [float("inf")], latency):
+            total += count
+            cumulative[bound] = total
+        snapshot["latency"]["buckets"] = cumulative
+        snapshot["latency"]["count"] = total
+        for cache in snapshot["caches"].values():
+            lookups = cache["hits"] + cache["misses"]
+            cache["hit_rate"] = cache["hits"] / lookups if lookups else 0.0
+        return snapshot
+
+    def prometheus(self, prefix: str = "ptn", snapshot: Optional[Dict[str, Any]] = None) -> str:
+        """
+        The totals over all threads, in the Prometheus text exposition format.
+        """
+        snapshot = snapshot or self.snapshot()
+        lines = [
+            f"# HELP {prefix}_parse_seconds Time taken to parse a name.",
+            f"# TYPE {prefix}_parse_seconds histogram",
+        ]
+        for bound, count in snapshot["latency"]["buckets"].items():
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{prefix}_parse_seconds_bucket{{le="{le}"}} {count}')
+        lines += [
+            f"{prefix}_parse_seconds_sum {snapshot['latency']['sum']!r}",
+            f"{prefix}_parse_seconds_count {snapshot['latency']['count']}",
+            f"# HELP {prefix}_field_present_total Parses that returned a non-empty value for the field.",
+            f"# TYPE {prefix}_field_present_total counter",
+        ]
+        for field, count in sorted(snapshot["fields"].items()):
+            lines.append(f'{prefix}_field_present_total{{field="{field}"}} {count}')
+        for key, help_text in (
+            ("empty_title", "Parses that returned no title."),
+            ("with_excess", "Parses that left unmatched text in excess."),
+            ("excess_tokens", "Unmatched tokens in excess."),
+        ):
+            lines += [
+                f"# HELP {prefix}_{key}_total {help_text}",
+                f"# TYPE {prefix}_{key}_total counter",
+                f"{prefix}_{key}_total {snapshot[key]}",
+            ]
+        if snapshot["caches"]:
+            lines += [
+                f"# HELP {prefix}_cache_lookups_total Cache lookups, by cache and result.",
+                f"# TYPE {prefix}_cache_lookups_total counter",
+            ]
+            for name, cache in sorted(snapshot["caches"].items()):
+                lines.append(f'{prefix}_cache_lookups_total{{cache="{name}",result="hit"}} {cache["hits"]}')
+                lines.append(f'{prefix}_cache_lookups_total{{cache="{name}",result="miss"}} {cache["misses"]}')
+        return "\n".join(lines) + "\n"
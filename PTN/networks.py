@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+import re
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .extras import link_patterns
+from .languages import first_characters
+from .patterns import networks, standalone_networks
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+# Most of the `network` patterns are a network followed by the whole quality alternation, so
+# each of them, searched on its own, tries the quality alternatives after anything that
+# looks like its network, and looks for its network at every word boundary. Instead, where
+# any network of the vocabulary (`networks` and `standalone_networks`) starts is found once
+# per name, with a single scan, and each pattern is only matched at those positions.
+#
+# Every match of a pattern starts at a word boundary with its network, so it starts at one
+# of those positions, and matching the pattern there (rather than searching) finds the same
+# matches. What the `quality` pattern found isn't enough on its own: a network can be
+# followed by any of the quality alternatives, not just the one that was kept.
+
+VOCABULARY = link_patterns(networks + standalone_networks)
+
+
+class Networks:
+    """
+    Where the networks of the vocabulary start in the last string, which all of the
+    `network` patterns match in turn.
+    """
+
+    def __init__(self, compile: Callable[[str, int], Any], flags: int = re.IGNORECASE):
+        first = first_characters(list(sre_parse.parse(VOCABULARY, flags)))
+        first = f"(?=[{''.join(re.escape(c) for c in sorted(first))}])" if first else ""
+        self.starts = compile(rf"\b{first}(?={VOCABULARY})", flags)
+        self.vocabulary = [network for network, _ in networks + standalone_networks]
+        self._string, self._starts = None, []
+
+    def wrap(self, regex: Any) -> Any:
+        """
+        A NetworkPattern for a compiled pattern, or the pattern itself if it doesn't start
+        with a network of the vocabulary (e.g. the patterns were changed).
+        """
+        for network in self.vocabulary:
+            if regex.pattern.startswith((rf"\b(?:({network})", rf"\b(?:{network})")):
+                return NetworkPattern(regex, self)
+        return regex
+
+    def positions(self, string: str) -> List[int]:
+        if string != self._string:
+            self._string, self._starts = string, [match.start() for match in self.starts.finditer(string)]
+        return self._starts
+
+
+class NetworkPattern:
+    """
+    Matches like a compiled `network` pattern, only trying the positions where a network
+    starts.
+    """
+
+    def __init__(self, regex: Any, networks: Networks):
+        self.regex = regex
+        self.pattern = regex.pattern
+        self.flags = regex.flags
+        self.groups = regex.groups
+        self.networks = networks
+        # Whether a match can start with a character, by character (most positions are the
+        # start of another network).
+        first = first_characters(list(sre_parse.parse(regex.pattern, regex.flags)))
+        self.first = re.compile(f"[{''.join(re.escape(c) for c in sorted(first))}]", regex.flags) if first else None
+        self._starts_with: Dict[str, bool] = {}
+
+    def finditer(self, string: str) -> Iterator[Any]:
+        starts = self.networks.positions(string)
+        if not starts:
+            return iter(())
+        matches, position, starts_with = [], 0, self._starts_with
+        for start in starts:
+            if start < position:
+                continue
+            character = string[start]
+            if character not in starts_with:
+                starts_with[character] = self.first is None or self.first.match(character) is not None
+            if not starts_with[character]:
+                continue
+            match = self.regex.match(string, start)
+            if match:
+                matches.append(match)
+                position = match.end()
+        return iter(matches)
+
+    def search(self, string: str) -> Optional[Any]:
+        return next(self.finditer(string), None)
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+import re
+
+# `clean_string` cleans titles and other segments (episode names, encoders, sites): dots or
+# underscores as spaces, and brackets and dashes trimmed from the ends. It used to be a
+# chain of regex substitutions. Each of them only looks at the start or the end of the
+# string, or at runs of dots, so it's done with string methods instead, giving the same
+# results for any string.
+
+DOT_RUN_REGEX = re.compile(r"\.+")
+
+
+def clean_string(string: str) -> str:
+    """
+    Clean a title or another segment of a name.
+    """
+    if string.startswith(" -"):
+        string = string[2:]
+    elif string.startswith(("(", "[")):
+        string = string[1:]
+    string = clean_dots(string).replace("_", " ")
+
+    # A bracket, underscore or "- " at the end, or before a newline at the end (as `$` does).
+    body, newline = (string[:-1], "\n") if string.endswith("\n") else (string, "")
+    if body.endswith(("[", ")", "_", "]")):
+        string = body[:-1] + newline
+    elif body.endswith("- "):
+        string = body[:-2] + newline
+    string = string.strip().strip(" _-")
+
+    # Again, for titles with non-English characters that were cleaned up.
+    return clean_dots(string).strip()
+
+
+def clean_dots(string: str) -> str:
+    """
+    With dots rather than spaces between words, runs of one or two dots as a space, of three
+    as they are (an ellipsis) and of more as an ellipsis and a space.
+    """
+    if " " in string or "." not in string:
+        return string
+    if "..." not in string:
+        return string.replace("..", " ").replace(".", " ")
+    return DOT_RUN_REGEX.sub(_dot_run, string)
+
+
+def _dot_run(match: re.Match) -> str:
+    length = match.end() - match.start()
+    if length == 3:
+        return "..."
+    return "... " if length > 3 else " "
@@ -1,7 +1,14 @@
 #!/usr/bin/env python
+import json
 import re
-from typing import Dict, List, Tuple, Union, Optional, Any
-
+import time
+import warnings
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Sequence, Tuple, Union, Optional, Any
+
+from .backends import get_backend
+from .batch import SEPARATOR, scan_chunk, separator_safe
+from .dates import Dates
+from .episodes import SeasonEpisodeScanner
 from .extras import (
     delimiters,
     langs,
@@ -10,8 +17,29 @@ from .extras import (
     patterns_ignore_title,
     link_patterns,
 )
-from .patterns import patterns, patterns_ordered, types, patterns_allow_overlap
-from .post import post_processing_after_excess, post_processing_before_excess
+from .languages import LanguageLists
+from .metrics import Metrics
+from .networks import Networks
+from .normalise import clean_string
+from .patterns import types, patterns_allow_overlap, patterns_no_word_boundary
+from .profiles import profiles
+from .registry import PatternRegistry, default_registry
+from .scripts import NON_ENGLISH_SCRIPTS, classify
+from .post import LITERAL_REGEX_KEYS, enabled_stages, literal_regexes, post_processing_after_excess, post_processing_before_excess
+
+
+class MatchRecord(NamedTuple):
+    """
+    Everything the pattern matching found for a name, before any values are standardised.
+    The matching doesn't depend on `standardise` or `coherent_types`, so several views of
+    a result can be built from a single record.
+    """
+    torrent_name: str
+    # (key, slice, clean value, replace, transforms) for each part that was kept, in order.
+    parts: List[Tuple[str, Tuple[int, int], Any, Optional[str], Optional[Union[str, List[Tuple[str, List[Any]]]]]]]
+    match_slices: List[Tuple[int, int]]
+    # The scripts of the name (see `scripts.classify`).
+    scripts: FrozenSet[str]
 
 
 class PTN:
@@ -19,96 +47,334 @@ class PTN:
     Class to parse torrent names into meaningful components.
     """
 
-    def __init__(self):
+    def __init__(self, disabled_stages: Iterable[str] = (), backend: str = "re", profile: str = "full", metrics: Optional[Metrics] = None, plan: Optional[Union[str, Dict[str, Any]]] = None, registry: Optional[PatternRegistry] = None):
+        """
+        :param disabled_stages: Names of post-processing stages (see `post.post_processing_stages`)
+            to skip for this parser, e.g. `["try_episode_name"]`.
+        :param backend: The regex backend to compile patterns with (see `backends.py`).
+        :param profile: The parse profile, trading accuracy for speed (see `profiles.py`).
+        :param metrics: Where to record the latency and results of `parse` calls (see `metrics.py`).
+        :param plan: A plan file (or its loaded contents) made by `python -m PTN.tools.plan`,
+            whose guards let the parser skip options that can't match a name.
+        :param registry: Where the patterns are kept (see `registry.py`), by default the
+            registry of `patterns.patterns`. Changes to it are caught up with before the next
+            parse, recompiling only the keys that changed.
+        """
+        if profile not in profiles:
+            raise ValueError(f"Unknown parse profile '{profile}', expected one of: {', '.join(profiles)}")
+        self.profile = profile
+        disabled_stages = list(disabled_stages) + profiles[profile]["disabled_stages"]
+        self.registry = default_registry if registry is None else registry
+        self.snapshot = self.registry.snapshot()
+        self.patterns = self.snapshot.patterns
+        self.patterns_ordered = self._ordered_keys()
+        self.excess = profiles[profile]["excess"]
+        self.metrics = metrics
+        self.backend = get_backend(backend)
         self.compiled_patterns = self._compile_patterns()
+        self.post_title_pattern = self._generate_post_title_pattern()
+        self.literal_regexes = literal_regexes(self.patterns)
+        self.option_guards = {}
+        self.plan_options = {}
+        # The options searched for over chunks of names, worked out on the first `parse_many`
+        # with a chunk size, and their matches in the name being parsed (see `_scan_chunk`).
+        self.chunk_options = None
+        self.scanned, self.chunk_matches = frozenset(), {}
+        if plan is not None:
+            self.load_plan(plan)
+        self.post_processing_before_excess = enabled_stages(post_processing_before_excess, disabled_stages)
+        self.post_processing_after_excess = enabled_stages(post_processing_after_excess, disabled_stages)
+
+    def load_plan(self, plan: Union[str, Dict[str, Any]]) -> None:
+        """
+        Use the option guards of a plan (see `tools/plan.py`). A guard is a list of lowercase
+        strings, at least one of which is in every ASCII name its option matches. Entries made
+        for other versions of an option's pattern are ignored.
+        """
+        if isinstance(plan, str):
+            with open(plan, encoding="utf-8") as plan_file:
+                plan = json.load(plan_file)
+        self.option_guards = {}
+        self.plan_options = plan["options"]
+        stale = 0
+        for key, options in plan["options"].items():
+            if key not in self.compiled_patterns:
+                stale += len(options)
+                continue
+            stale += self._set_guards(key)
+        if stale:
+            warnings.warn(f"{stale} options of the plan don't match the current patterns, rebuild it with `python -m PTN.tools.plan`")
+
+    def _set_guards(self, key: str) -> int:
+        """
+        Set the guards of a key's options from the plan, returning how many of its entries
+        were made for other versions of the options.
+        """
+        self.option_guards.pop(key, None)
+        sources = [pattern.pattern for pattern, _, _ in self.compiled_patterns[key]]
+        by_pattern = {option["pattern"]: option.get("guard") for option in self.plan_options[key]}
+        guards = [by_pattern.get(source) for source in sources]
+        if any(guards):
+            self.option_guards[key] = [tuple(guard) if guard else None for guard in guards]
+        return len(set(by_pattern) - set(sources))
+
+    def _ordered_keys(self) -> List[str]:
+        """
+        The keys to match, in order, leaving out those the profile skips.
+        """
+        return [key for key in self.snapshot.order if key not in profiles[self.profile]["skip_keys"]]
 
     def _generate_post_title_pattern(self) -> str:
         """
         Generate the pattern to match post titles.
         """
-        return f"(?:{link_patterns(patterns['seasons'])}|{link_patterns(patterns['year'])}|720p|1080p)"
+        return f"(?:{link_patterns(self.patterns['seasons'])}|{link_patterns(self.patterns['year'])}|720p|1080p)"
 
     def _compile_patterns(self) -> Dict[str, List[Tuple[re.Pattern, Optional[str], Optional[Union[str, List[Tuple[str, List[Any]]]]]]]]:
         """
         Compile all regex patterns for better performance.
         """
+        # The lists of languages are walked a language at a time rather than with their regex.
+        self.language_lists = LanguageLists(self.regex, audio=self.patterns.get("audio"))
+        # The networks are only matched where a network of the vocabulary starts.
+        self.network_starts = Networks(self.regex)
+        # The common forms of seasons and episodes are found with one scan.
+        self.season_episode_scanner = SeasonEpisodeScanner(self.regex)
+        # The years and dates are found with one scan.
+        self.dates = Dates(self.regex)
+        return self._compile_keys(self.patterns)
+
+    def _compile_keys(self, keys: Iterable[str], previous: Optional[Dict[str, List[Tuple[Any, Any, Any]]]] = None) -> Dict[str, List[Tuple[re.Pattern, Optional[str], Optional[Union[str, List[Tuple[str, List[Any]]]]]]]]:
+        """
+        Compile the options of some of the keys, reusing the options of `previous` that
+        haven't changed.
+        """
         compiled_patterns = {}
-        for key in patterns:
-            pattern_options = self.normalise_pattern_options(patterns[key])
-            compiled_patterns[key] = [(re.compile(opt[0], re.IGNORECASE), opt[1], opt[2]) for opt in pattern_options]
+        for key in keys:
+            pattern_options = self.normalise_pattern_options(self.patterns[key])
+            if key not in patterns_no_word_boundary:
+                pattern_options = [(rf"\b(?:{opt[0]})\b",) + opt[1:] for opt in pattern_options]
+            reused = {pattern.pattern: pattern for pattern, _, _ in (previous or {}).get(key, ())}
+            compiled_patterns[key] = [
+                (reused.get(opt[0]) or self._wrap(key, self.regex(opt[0], re.IGNORECASE)), opt[1], opt[2])
+                for opt in pattern_options
+            ]
         return compiled_patterns
 
+    def _wrap(self, key: str, pattern: re.Pattern) -> Any:
+        """
+        The compiled option, or what matches like it sharing work with the other options.
+        """
+        if key == "languages":
+            return self.language_lists.wrap(pattern)
+        if key == "network":
+            return self.network_starts.wrap(pattern)
+        if key in ("seasons", "episodes"):
+            return self.season_episode_scanner.wrap(key, pattern)
+        if key in ("year", "month", "day"):
+            return self.dates.wrap(key, pattern)
+        return pattern
+
+    def _update(self) -> None:
+        """
+        Catch up with the changes to the registry, recompiling the keys whose options changed
+        and what's built from them.
+        """
+        snapshot, changed = self.registry.changes(self.snapshot.version)
+        self.snapshot, self.patterns = snapshot, snapshot.patterns
+        self.chunk_options = None
+        changed = set(changed)
+        if changed & LITERAL_REGEX_KEYS:
+            # Including removed keys, which the patterns stop being built from.
+            self.literal_regexes = literal_regexes(self.patterns)
+        previous = dict(self.compiled_patterns)
+        if "audio" in changed:
+            # The lists of languages are walked with the audio options.
+            self.language_lists = LanguageLists(self.regex, audio=self.patterns.get("audio"))
+            changed.add("languages")
+            previous.pop("languages", None)
+        changed &= set(self.patterns)
+        compiled_patterns = {key: options for key, options in self.compiled_patterns.items() if key in self.patterns and key not in changed}
+        compiled_patterns.update(self._compile_keys(sorted(changed), previous))
+        self.compiled_patterns = compiled_patterns
+        for key in changed:
+            if key in self.plan_options:
+                self._set_guards(key)
+        if changed & {"seasons", "year"}:
+            self.post_title_pattern = self._generate_post_title_pattern()
+        self.patterns_ordered = self._ordered_keys()
+
+    def regex(self, pattern: str, flags: int = 0) -> re.Pattern:
+        """
+        Compile a pattern with this parser's regex backend, which keeps it for reuse.
+        """
+        return self.backend.compile(pattern, flags)
+
     def _part(self, name: str, match_slice: Optional[Tuple[int, int]], clean: Union[str, int, List[int], bool], overwrite: bool = False) -> None:
         """
         Add a part to the parts dictionary.
         """
         if overwrite or name not in self.parts:
-            if self.coherent_types and name not in ["title", "episodeName"] and not isinstance(clean, bool):
-                if not isinstance(clean, list):
-                    clean = [clean]
-            self.parts[name] = clean
-            self.part_slices[name] = match_slice
+            self._set_part(name, match_slice, clean)
 
         # Ignored patterns will still be considered 'matched' to remove them from excess.
         if match_slice:
             self.match_slices.append(match_slice)
 
-    @staticmethod
-    def _clean_dots(string: str) -> str:
+    def _set_part(self, name: str, match_slice: Optional[Tuple[int, int]], clean: Union[str, int, List[int], bool]) -> None:
         """
-        Clean dots in a string.
+        Set a part's value and slice, applying coherent types if needed.
         """
-        if ' ' not in string and '.' in string:
-            string = re.sub(r"\.{4,}", "... ", string)
-
-            # Replace any instances of less than 3 dots with a space
-            # Lookarounds are used to prevent the 3-dots (ellipses) from being replaced
-            string = re.sub(r"(?<!\.)\.\.(?!\.)", " ", string)
-            string = re.sub(r"(?<!\.)\.(?!\.\.)", " ", string)
-        return string
+        if self.coherent_types and name not in ["title", "episodeName"] and not isinstance(clean, bool):
+            if not isinstance(clean, list):
+                clean = [clean]
+        self.parts[name] = clean
+        self.part_slices[name] = match_slice
 
     def _clean_string(self, string: str) -> str:
         """
-        Clean a string.
+        Clean a string (see `normalise.py`).
         """
-        clean = re.sub(r"^( -|\(|\[)", "", string)
-        clean = self._clean_dots(clean)
-        clean = re.sub(r"_", " ", clean)
-        clean = re.sub(r"([\[)_\]]|- )$", "", clean).strip()
-        clean = clean.strip(" _-")
-
-        # Again, we need to clean up the dots & strip for non-english chars titles that get cleaned from above re.sub.
-        clean = self._clean_dots(clean).strip()
-        return clean
+        return clean_string(string)
 
     def parse(self, name: str, standardise: bool = False, coherent_types: bool = False) -> Dict[str, Union[str, int, List[int], bool]]:
         """
         Parse a torrent name into its components.
         """
+        if self.metrics is None:
+            return self._finish(self._match(name), standardise, coherent_types)
+        start = time.perf_counter()
+        result = self._finish(self._match(name), standardise, coherent_types)
+        self.metrics.observe(time.perf_counter() - start, result)
+        return result
+
+    def parse_many(self, names: Sequence[str], standardise: bool = False, coherent_types: bool = False, chunk_size: int = 256) -> List[Dict[str, Union[str, int, List[int], bool]]]:
+        """
+        Parse a batch of torrent names, giving the same results as `parse`. Most options are
+        searched for over `chunk_size` names at a time (see `batch.scan_chunk`), or in each
+        name on its own with a `chunk_size` of 0.
+        """
+        if chunk_size < 0:
+            raise ValueError("`chunk_size` can't be negative")
+        results = []
+        for chunk_start in range(0, len(names), chunk_size or max(len(names), 1)):
+            chunk = names[chunk_start:chunk_start + chunk_size] if chunk_size else names
+            # The scanned options are kept until the chunk is parsed, so their ids stay theirs.
+            scanned, chunk_matches = self._scan_chunk(chunk) if chunk_size else ((), None)
+            for index, name in enumerate(chunk):
+                if chunk_matches is not None and chunk_matches[index] is not None:
+                    self.scanned, self.chunk_matches = scanned, chunk_matches[index]
+                try:
+                    if self.metrics is None:
+                        results.append(self._finish(self._match(name), standardise, coherent_types))
+                    else:
+                        start = time.perf_counter()
+                        result = self._finish(self._match(name), standardise, coherent_types)
+                        self.metrics.observe(time.perf_counter() - start, result)
+                        results.append(result)
+                finally:
+                    # The matches are only those of this name.
+                    self.scanned, self.chunk_matches = frozenset(), {}
+        return results
+
+    def _scan_chunk(self, names: Sequence[str]) -> Tuple[FrozenSet[int], List[Optional[Dict[int, List[Dict[str, Any]]]]]]:
+        """
+        Search for the options that can be over a chunk of names (see `batch.py`), giving the
+        ids of those options and their matches in each name (None for names that have to be
+        searched on their own).
+        """
+        if self.registry.version != self.snapshot.version:
+            self._update()
+        if self.chunk_options is None:
+            # Only options compiled by `re` are audited (`separator_safe` follows its syntax).
+            self.chunk_options = [
+                pattern for key in self.patterns_ordered for pattern, _, _ in self.compiled_patterns[key]
+                if isinstance(pattern, re.Pattern) and separator_safe(pattern.pattern, pattern.flags)
+            ]
+        clean_names = [name.strip().replace("_", " ") for name in names]
+        chunked = [index for index, name in enumerate(clean_names) if SEPARATOR not in name]
+        found = scan_chunk(self.chunk_options, [clean_names[index] for index in chunked])
+        chunk_matches = [None] * len(names)
+        for index, matches in zip(chunked, found):
+            chunk_matches[index] = matches
+        return frozenset(map(id, self.chunk_options)), chunk_matches
+
+    def parse_views(self, name: str) -> "ParseViews":
+        """
+        Match a torrent name once, returning a ParseViews from which the raw, standardised
+        and coherent results are built on first access.
+        """
+        return ParseViews(self, self._match(name))
+
+    def _match(self, name: str) -> MatchRecord:
+        """
+        Run every pattern over the torrent name, recording what was matched.
+        """
+        if self.registry.version != self.snapshot.version:
+            self._update()
         self.torrent_name = name.strip()
+        self.scripts = classify(self.torrent_name)
         self.parts = {}
         self.part_slices = {}
         self.match_slices = []
-        self.standardise = standardise
-        self.coherent_types = coherent_types
-        self.post_title_pattern = self._generate_post_title_pattern()
+        self.matched_parts = []
+        self.standardise = False
+        self.coherent_types = False
 
-        for key in patterns_ordered:
+        # Options whose guard isn't in the name can't match it (see `load_plan`).
+        clean_name = self.torrent_name.replace("_", " ")
+        guard_name = clean_name.lower() if self.option_guards and clean_name.isascii() else None
+
+        for key in self.patterns_ordered:
             pattern_options = self.compiled_patterns[key]
+            if guard_name is not None and key in self.option_guards:
+                pattern_options = [
+                    option for option, guard in zip(pattern_options, self.option_guards[key])
+                    if guard is None or any(literal in guard_name for literal in guard)
+                ]
+            if self.scanned:
+                # Options searched for over the chunk that didn't match in the name (see `parse_many`).
+                pattern_options = [
+                    option for option in pattern_options
+                    if id(option[0]) not in self.scanned or id(option[0]) in self.chunk_matches
+                ]
             self._apply_patterns(key, pattern_options)
 
+        return MatchRecord(self.torrent_name, self.matched_parts, self.match_slices, self.scripts)
+
+    def _finish(self, record: MatchRecord, standardise: bool, coherent_types: bool) -> Dict[str, Union[str, int, List[int], bool]]:
+        """
+        Build the result for a match record: standardise the matched values, then find the
+        title, excess and post-processed parts.
+        """
+        self.torrent_name = record.torrent_name
+        self.scripts = record.scripts
+        self.parts = {}
+        self.part_slices = {}
+        self.match_slices = list(record.match_slices)
+        self.standardise = standardise
+        self.coherent_types = coherent_types
+
+        for key, match_slice, clean, replace, transforms in record.parts:
+            if isinstance(clean, list):
+                clean = list(clean)
+            if standardise:
+                clean = self.standardise_clean(clean, key, replace, transforms)
+            self._set_part(key, match_slice, clean)
+
         self.process_title()
         self.fix_known_exceptions()
 
         unmatched = self.get_unmatched()
-        for f in post_processing_before_excess:
+        for f in self.post_processing_before_excess:
             unmatched = f(self, unmatched)
 
-        cleaned_unmatched = self.clean_unmatched()
-        if cleaned_unmatched:
-            self._part("excess", None, cleaned_unmatched)
+        if self.excess:
+            cleaned_unmatched = self.clean_unmatched()
+            if cleaned_unmatched:
+                self._part("excess", None, cleaned_unmatched)
 
-        for f in post_processing_after_excess:
+        for f in self.post_processing_after_excess:
             f(self)
 
         return self.parts
@@ -118,9 +384,6 @@ class PTN:
         Apply patterns to the torrent name.
         """
         for pattern, replace, transforms in pattern_options:
-            if key not in ("seasons", "episodes", "site", "languages", "genres"):
-                pattern = re.compile(rf"\b(?:{pattern.pattern})\b", re.IGNORECASE)
-
             clean_name = self.torrent_name.replace("_", " ")
             matches = self.get_matches(pattern, clean_name, key)
 
@@ -141,11 +404,9 @@ class PTN:
             index = self.get_match_indexes(match)
             clean = self._get_clean_value(key, match, index)
 
-            if self.standardise:
-                clean = self.standardise_clean(clean, key, replace, transforms)
-
             if not self._has_overlap(match_start, match_end):
                 self._part(key, (match_start, match_end), clean)
+                self.matched_parts.append((key, (match_start, match_end), clean, replace, transforms))
 
     @staticmethod
     def normalise_pattern_options(pattern_options: Union[str, Tuple, List[Union[str, Tuple]]]) -> List[Tuple[str, Optional[str], Optional[Union[str, List[Tuple[str, List[Any]]]]]]]:
@@ -173,10 +434,13 @@ class PTN:
         """
         Get all matches for a pattern in the clean_name.
         """
+        ignore_before = self.ignore_before_index(clean_name, key)
+        if id(pattern) in self.scanned:
+            return [match for match in self.chunk_matches.get(id(pattern), ()) if match["start"] >= ignore_before]
         matches = pattern.finditer(clean_name)
         grouped_matches = [
             {"match": (m.groups() if m.groups() else [m.group()]), "start": m.start(), "end": m.end()}
-            for m in matches if m.start() >= self.ignore_before_index(clean_name, key)
+            for m in matches if m.start() >= ignore_before
         ]
         return grouped_matches
 
@@ -187,11 +451,12 @@ class PTN:
         if key not in patterns_ignore_title:
             return 0
         patterns_ignored = patterns_ignore_title[key]
-        match = re.search(self.post_title_pattern, clean_name, re.IGNORECASE) if not patterns_ignored else None
+        post_title_pattern = self.regex(self.post_title_pattern, re.IGNORECASE)
+        match = post_title_pattern.search(clean_name) if not patterns_ignored else None
         if not match:
             for ignore_pattern in patterns_ignored:
-                if re.findall(ignore_pattern, clean_name, re.IGNORECASE):
-                    match = re.search(self.post_title_pattern, clean_name, re.IGNORECASE)
+                if self.regex(ignore_pattern, re.IGNORECASE).findall(clean_name):
+                    match = post_title_pattern.search(clean_name)
                     if match:
                         break
         return match.start() if match else 0
@@ -203,12 +468,11 @@ class PTN:
         """
         return {"raw": 0, "clean": next((i for i in range(1, len(match)) if match[i]), 0)}
 
-    @staticmethod
-    def get_season_episode(match: List[str]) -> Optional[List[int]]:
+    def get_season_episode(self, match: List[str]) -> Optional[List[int]]:
         """
         Get season or episode numbers from a match.
         """
-        m = re.findall(r"[0-9]+", match[0])
+        m = self.regex(r"[0-9]+").findall(match[0])
         if m and len(m) > 1:
             return list(range(int(m[0]), int(m[-1]) + 1))
         if len(match) > 1 and match[1] and m:
@@ -217,20 +481,18 @@ class PTN:
             return [int(m[0])]
         return None
 
-    @staticmethod
-    def split_multi(match: List[str]) -> List[str]:
+    def split_multi(self, match: List[str]) -> List[str]:
         """
         Split multiple values in a match.
         """
-        return list(filter(None, re.split(rf"{delimiters}+", match[0])))
+        return list(filter(None, self.regex(rf"{delimiters}+").split(match[0])))
 
-    @staticmethod
-    def get_subtitles(match: List[str]) -> List[str]:
+    def get_subtitles(self, match: List[str]) -> List[str]:
         """
         Get subtitles from a match.
         """
-        m = list(filter(None, re.split(rf"{delimiters}+", match[0])))
-        return m if len(m) == 1 else [x for x in m if not re.match("subs?|soft", x, re.I)]
+        m = list(filter(None, self.regex(rf"{delimiters}+").split(match[0])))
+        return m if len(m) == 1 else [x for x in m if not self.regex("subs?|soft", re.I).match(x)]
 
     def standardise_clean(self, clean: Union[str, List[str]], key: str, replace: Optional[str], transforms: Optional[Union[str, List[Tuple[str, List[Any]]]]]) -> Union[str, List[str]]:
         """
@@ -249,28 +511,26 @@ class PTN:
             clean = self.standardise_genres(clean)
         return clean
 
-    @staticmethod
-    def standardise_languages(clean: List[str]) -> List[str]:
+    def standardise_languages(self, clean: List[str]) -> List[str]:
         """
         Standardise language names.
         """
         cleaned_langs = []
         for lang in clean:
             for lang_regex, lang_clean in langs:
-                if re.match(lang_regex, re.sub(link_patterns(patterns["subtitles"][-2:]), "", lang, flags=re.I), re.IGNORECASE):
+                if self.regex(lang_regex, re.IGNORECASE).match(self.regex(link_patterns(self.patterns["subtitles"][-2:]), re.I).sub("", lang)):
                     cleaned_langs.append(lang_clean)
                     break
         return cleaned_langs
 
-    @staticmethod
-    def standardise_genres(clean: List[str]) -> List[str]:
+    def standardise_genres(self, clean: List[str]) -> List[str]:
         """
         Standardise genre names.
         """
         standard_genres = []
         for genre in clean:
             for regex, clean_genre in genres:
-                if re.match(regex, genre, re.IGNORECASE):
+                if self.regex(regex, re.IGNORECASE).match(genre):
                     standard_genres.append(clean_genre)
                     break
         return standard_genres
@@ -305,18 +565,18 @@ class PTN:
             # Something in square brackets with 3 chars or fewer is too weird to be right.
             # If this seems too arbitrary, make it any square bracket, and Mother test
             # case will lose its translated title (which is mostly fine I think).
-            m = re.search(r"\(|(?:\[(?:.{,3}\]|[^\]]*\d[^\]]*\]?))", raw, flags=re.I)
+            m = self.regex(r"\(|(?:\[(?:.{,3}\]|[^\]]*\d[^\]]*\]?))", re.I).search(raw)
             if m:
                 relative_title_end = m.start()
                 raw = raw[:relative_title_end]
                 title_end = relative_title_end + title_start
             # Similar logic as above, but looking at beginning of string unmatched brackets.
-            m = re.search(r"^(?:\)|\[.*\])", raw)
+            m = self.regex(r"^(?:\)|\[.*\])").search(raw)
             if m:
                 relative_title_start = m.end()
                 raw = raw[relative_title_start:]
                 title_start = relative_title_start + title_start
-            clean = self._clean_string(self.clean_title(raw))
+            clean = self._clean_string(self.clean_title(raw, self.scripts))
             # Re-add title_start to unrelative the index from raw to self.torrent_name
             self._part("title", (title_start, title_end), clean)
         else:
@@ -333,12 +593,12 @@ class PTN:
         end = len(self.torrent_name)
         # Find all unmatched strings that aren't just punctuation
         for start, end in self.match_slices:
-            if keep_punctuation or not re.match(rf"{delimiters}*\Z", self.torrent_name[prev_start:start]):
+            if keep_punctuation or not self.regex(rf"{delimiters}*\Z").match(self.torrent_name[prev_start:start]):
                 unmatched.append((prev_start, start))
             prev_start = end
 
         # Add the last unmatched slice
-        if keep_punctuation or not re.match(rf"{delimiters}*\Z", self.torrent_name[end:]):
+        if keep_punctuation or not self.regex(rf"{delimiters}*\Z").match(self.torrent_name[end:]):
             unmatched.append((end, len(self.torrent_name)))
 
         # If nothing matched, assume the whole thing is the title
@@ -371,22 +631,28 @@ class PTN:
         unmatched = [self.torrent_name[start:end] for start, end in self.unmatched_list()]
         unmatched_clean = []
         for raw in unmatched:
-            clean = re.sub(r"(^[-_.\s(),]+)|([-.\s,]+$)", "", raw)
-            clean = re.sub(r"[()/]", " ", clean)
-            unmatched_clean.extend(re.split(r"\.\.+|\s+", clean))
-        return [extra for extra in unmatched_clean if not re.match(rf"(?:Complete|Season|Full)?[\]\[,.+\- ]*(?:Complete|Season|Full)?\Z", extra, re.IGNORECASE)]
+            clean = self.regex(r"(^[-_.\s(),]+)|([-.\s,]+$)").sub("", raw)
+            clean = self.regex(r"[()/]").sub(" ", clean)
+            unmatched_clean.extend(self.regex(r"\.\.+|\s+").split(clean))
+        not_excess = self.regex(r"(?:Complete|Season|Full)?[\]\[,.+\- ]*(?:Complete|Season|Full)?\Z", re.IGNORECASE)
+        return [extra for extra in unmatched_clean if not not_excess.match(extra)]
 
-    @staticmethod
-    def clean_title(raw_title: str) -> str:
+    def clean_title(self, raw_title: str, scripts: Optional[FrozenSet[str]] = None) -> str:
         """
-        Clean the title string.
+        Clean the title string. The patterns built on `NON_ENGLISH_CHARS` only run if `scripts`
+        (by default, those of the title) include one of its scripts.
         """
+        if scripts is None:
+            scripts = classify(raw_title)
         cleaned_title = raw_title.replace(r"[[(]movie[)\]]", "")
-        cleaned_title = re.sub(patterns["RUSSIAN_CAST_REGEX"], " ", cleaned_title)
-        cleaned_title = re.sub(patterns["RELEASE_GROUP_REGEX_START"], r"\1", cleaned_title)
-        cleaned_title = re.sub(patterns["RELEASE_GROUP_REGEX_END"], r"\1", cleaned_title)
-        cleaned_title = re.sub(patterns["ALT_TITLES_REGEX"], "", cleaned_title)
-        cleaned_title = re.sub(patterns["NOT_ONLY_NON_ENGLISH_REGEX"], "", cleaned_title)
+        cleaned_title = self.regex(self.patterns["RUSSIAN_CAST_REGEX"]).sub(" ", cleaned_title)
+        cleaned_title = self.regex(self.patterns["RELEASE_GROUP_REGEX_START"]).sub(r"\1", cleaned_title)
+        cleaned_title = self.regex(self.patterns["RELEASE_GROUP_REGEX_END"]).sub(r"\1", cleaned_title)
+        # Neither can match without a character of `NON_ENGLISH_CHARS`, and the substitutions
+        # above don't add any.
+        if not scripts.isdisjoint(NON_ENGLISH_SCRIPTS):
+            cleaned_title = self.regex(self.patterns["ALT_TITLES_REGEX"]).sub("", cleaned_title)
+            cleaned_title = self.regex(self.patterns["NOT_ONLY_NON_ENGLISH_REGEX"]).sub("", cleaned_title)
         return cleaned_title
 
     @staticmethod
@@ -422,3 +688,36 @@ class PTN:
             for part, part_slice in self.part_slices.items()
             if part not in patterns_allow_overlap
         )
+
+
+class ParseViews:
+    """
+    Several views of one parse, sharing a single run of the pattern matching. Each view is
+    built from the match record the first time it's accessed.
+    """
+
+    def __init__(self, ptn: PTN, record: MatchRecord):
+        self._ptn = ptn
+        self._record = record
+        self._views = {}
+
+    def get(self, standardise: bool = False, coherent_types: bool = False) -> Dict[str, Union[str, int, List[int], bool]]:
+        """
+        Get the result as `PTN.parse` would return it with the same arguments.
+        """
+        key = (standardise, coherent_types)
+        if key not in self._views:
+            self._views[key] = self._ptn._finish(self._record, standardise, coherent_types)
+        return self._views[key]
+
+    @property
+    def raw(self) -> Dict[str, Union[str, int, List[int], bool]]:
+        return self.get(standardise=False)
+
+    @property
+    def standardised(self) -> Dict[str, Union[str, int, List[int], bool]]:
+        return self.get(standardise=True)
+
+    @property
+    def coherent(self) -> Dict[str, Union[str, int, List[int], bool]]:
+        return self.get(standardise=True, coherent_types=True)
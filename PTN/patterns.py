@@ -84,6 +84,15 @@ patterns_allow_overlap = [
     "sbs",
 ]
 
+# All other patterns are only matched between word boundaries (wrapped in `\b`).
+patterns_no_word_boundary = [
+    "seasons",
+    "episodes",
+    "site",
+    "languages",
+    "genres",
+]
+
 patterns = {}
 patterns["episodes"] = [
     r"(?<![a-z])(?:e|ep)(?:\(?[0-9]{1,2}(?:-?(?:e|ep)?(?:[0-9]{1,2}))?\)?)(?![0-9])",
@@ -155,7 +164,8 @@ patterns["quality"] = [
     # Match this last as it can show up with others.
     (r"PPV(?:Rip)?", "Pay-Per-View Rip"),
 ]
-patterns["network"] = [
+# Networks, which show up just before the quality.
+networks = [
     ("ATVP", "Apple TV+"),
     ("AMZN|Amazon", "Amazon Studios"),
     ("NF|Netflix", "Netflix"),
@@ -188,12 +198,9 @@ patterns["network"] = [
     ("DTV", "DirecTV Stream"),
     ("VICE", "VICE"),
 ]
-patterns["network"] = suffix_pattern_with(
-    link_patterns(patterns["quality"]), patterns["network"], delimiters
-)
 # Not all networks always show up just before the quality, so if they're unlikely to clash,
 # they should be added here.
-patterns["network"] += [
+standalone_networks = [
     ("BBC", "BBC"),
     ("Hoichoi", "Hoichoi"),
     ("Zee5", "ZEE5"),
@@ -201,6 +208,14 @@ patterns["network"] += [
     ("Sony\s?LIV", "SONY LIV"),
 ]
 
+
+def network_patterns(quality):
+    # Each of the networks followed by any quality, then the standalone networks.
+    return suffix_pattern_with(link_patterns(quality), networks, delimiters) + standalone_networks
+
+
+patterns["network"] = network_patterns(patterns["quality"])
+
 patterns["codec"] = [
     (r"xvid", "Xvid"),
     (r"av1", "AV1"),
@@ -273,9 +288,13 @@ patterns["site"] = [
     r"^(\[ ?([^\]]+?)\s?\])"
 ]
 
-lang_list_pattern = (
-    rf"\b(?:{link_patterns(langs)}(?:{delimiters}+(?:dub(?:bed)?|{link_patterns(patterns['audio'])}))?(?:{delimiters}+|\b))"
-)
+
+def language_list_pattern(audio):
+    # A language, optionally dubbed or with an audio option, then delimiters.
+    return rf"\b(?:{link_patterns(langs)}(?:{delimiters}+(?:dub(?:bed)?|{link_patterns(audio)}))?(?:{delimiters}+|\b))"
+
+
+lang_list_pattern = language_list_pattern(patterns["audio"])
 subs_list_pattern = rf"(?:{link_patterns(langs)}{delimiters}*)"
 
 patterns["subtitles"] = [
@@ -294,11 +313,18 @@ patterns["subtitles"] = [
 # then a subtitles match starting with subs, the first langs are languages, and the
 # rest will be left as subtitles. Otherwise, don't match if there are subtitles matches
 # after the langs.
-patterns["languages"] = [
-    rf"({lang_list_pattern}+)(?:{delimiters}*{patterns['subtitles'][0]})",
-    rf"({lang_list_pattern}+)(?!{delimiters}*{link_patterns(patterns['subtitles'])})",
-    rf"({lang_list_pattern}+)(?:{delimiters}*{patterns['subtitles'][-2]})",
-]
+
+
+def language_patterns(audio, subtitles):
+    lang_list = language_list_pattern(audio)
+    return [
+        rf"({lang_list}+)(?:{delimiters}*{subtitles[0]})",
+        rf"({lang_list}+)(?!{delimiters}*{link_patterns(subtitles)})",
+        rf"({lang_list}+)(?:{delimiters}*{subtitles[-2]})",
+    ]
+
+
+patterns["languages"] = language_patterns(patterns["audio"], patterns["subtitles"])
 patterns["sbs"] = [("Half-SBS", "Half SBS"), ("SBS", None, "upper")]
 patterns["unrated"] = r"UNRATED"
 patterns["size"] = (
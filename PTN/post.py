@@ -1,16 +1,63 @@
 #!/usr/bin/env python
 
 import re
-from typing import Any
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from .extras import link_patterns, complete_series, langs
-from .patterns import episode_name_pattern, patterns, pre_website_encoder_pattern
-
-# Compile regex patterns once for reuse
-episode_name_compiled = re.compile(episode_name_pattern)
-pre_website_encoder_compiled = re.compile(pre_website_encoder_pattern.strip(), re.IGNORECASE)
-complete_series_compiled = re.compile(link_patterns(complete_series), re.IGNORECASE)
-filetype_pattern_compiled = re.compile(link_patterns(patterns['filetype']), re.IGNORECASE)
+from .patterns import episode_name_pattern, pre_website_encoder_pattern
+
+# Patterns used by the stages, as (pattern, flags). They're compiled once per regex backend,
+# through `self.regex(*...)` (see backends.py).
+episode_name_regex = (episode_name_pattern, 0)
+pre_website_encoder_regex = (pre_website_encoder_pattern.strip(), re.IGNORECASE)
+complete_series_regex = (link_patterns(complete_series), re.IGNORECASE)
+site_in_encoder_regex = (r"(\[(.*)\])", re.IGNORECASE)
+site_punctuation_only_regex = (r"[\[\],.+\-]*\Z", re.IGNORECASE)
+encoder_site_split_regex = (r"[\-\s\)]", 0)
+vague_season_episode_regex = (r"(\d{1,2})-(\d{1,2})$", 0)
+langs_regexes = [(lang_regex, re.IGNORECASE) for lang_regex, _ in langs]
+
+# Some stages look for a literal taken from `unmatched` inside the full torrent name. Rather
+# than compiling a new regex around every literal, the literal is prepended to the searched
+# string (separated by a NUL) and matched through the `\1` back-reference, so the
+# expensive part of the pattern is only compiled once. The lazy `[\s\S]*?` keeps
+# re.search's leftmost-match semantics, group 2 wraps what a plain search would have
+# matched, and the `literal` group is the literal as found in the name.
+LITERAL_PREFIX = r"\A([^\x00]*)\x00[\s\S]*?"
+
+# The keys of the patterns those are built from: a parser rebuilds them when one changes.
+LITERAL_REGEX_KEYS = frozenset({"episodes", "day", "year", "filetype"})
+
+
+def literal_regexes(patterns: Dict[str, Any]) -> Dict[str, Tuple[str, int]]:
+    """
+    The patterns built on LITERAL_PREFIX, by name, from a parser's current patterns.
+    """
+    before_episode_name = "|".join(link_patterns(patterns[key]) for key in ("episodes", "day", "year") if key in patterns) or "(?!)"
+    extension = rf"(?:\.{link_patterns(patterns['filetype'])})?" if "filetype" in patterns else ""
+    return {
+        "episode_name_in_name": (rf"{LITERAL_PREFIX}((?:{before_episode_name})[._\-\s+]*(?P<literal>\1))", re.IGNORECASE),
+        "encoder_before_site_in_name": (rf"{LITERAL_PREFIX}([\s\-](?P<literal>\1){extension}$)", re.IGNORECASE),
+    }
+
+
+def search_with_literal(pattern: re.Pattern, literal: str, string: str) -> Optional[Tuple[Tuple[int, int], Tuple[int, int], str]]:
+    """
+    Search `string` with a pattern built on LITERAL_PREFIX, using `literal` for its back-reference.
+    Returns the (start, end) of the whole match and of the literal, relative to `string`, and the
+    literal as it appears in `string`.
+    """
+    if "\x00" in literal:
+        return None
+    match = pattern.search(f"{literal}\x00{string}")
+    if not match:
+        return None
+    offset = len(literal) + 1
+    return (
+        (match.start(2) - offset, match.end(2) - offset),
+        (match.start("literal") - offset, match.end("literal") - offset),
+        match.group("literal"),
+    )
 
 
 # Post-processing functions that run after the main parsing.
@@ -21,38 +68,36 @@ filetype_pattern_compiled = re.compile(link_patterns(patterns['filetype']), re.I
 
 # Try and find the episode name.
 def try_episode_name(self: Any, unmatched: str) -> str:
-    match = episode_name_compiled.findall(unmatched)
+    match = self.regex(*episode_name_regex).findall(unmatched)
     if match:
-        pattern = rf"(?:{link_patterns(patterns['episodes'])}|{patterns['day']}|{patterns['year']})[._\-\s+]*({re.escape(match[0])})"
-        match = re.search(pattern, self.torrent_name, re.IGNORECASE)
-        if match:
-            match_s, match_e = match.start(len(match.groups())), match.end(len(match.groups()))
-            self._part("episodeName", (match_s, match_e), self._clean_string(match.group(len(match.groups()))))
-            unmatched = unmatched.replace(match.group(len(match.groups())), "")
+        found = search_with_literal(self.regex(*self.literal_regexes["episode_name_in_name"]), match[0], self.torrent_name)
+        if found:
+            _, (match_s, match_e), episode_name = found
+            self._part("episodeName", (match_s, match_e), self._clean_string(episode_name))
+            unmatched = unmatched.replace(episode_name, "")
     return unmatched
 
 
 def try_encoder_before_site(self: Any, unmatched: str) -> str:
-    match = pre_website_encoder_compiled.findall(unmatched.strip())
+    match = self.regex(*pre_website_encoder_regex).findall(unmatched.strip())
     if match:
         for m in match:
-            pattern = rf"[\s\-]({re.escape(m)})(?:\.{filetype_pattern_compiled.pattern})?$"
-            full_title_match = re.search(pattern, self.torrent_name, re.I)
-            if full_title_match:
-                match_s, match_e = full_title_match.start(0), full_title_match.end(0)
-                encoder_and_site = list(filter(None, re.split(r"[\-\s\)]", full_title_match.group(1))))
+            found = search_with_literal(self.regex(*self.literal_regexes["encoder_before_site_in_name"]), m, self.torrent_name)
+            if found:
+                (match_s, match_e), _, encoder_and_site_raw = found
+                encoder_and_site = list(filter(None, self.regex(*encoder_site_split_regex).split(encoder_and_site_raw)))
                 if len(encoder_and_site) == 2:
                     encoder_raw, site_raw = encoder_and_site
                     self._part("encoder", (match_s, match_e - len(site_raw)), self._clean_string(encoder_raw))
                     self._part("site", (match_s + len(encoder_raw), match_e), self._clean_string(site_raw), overwrite=False)
-                    unmatched = unmatched.replace(full_title_match.group(0), "")
+                    unmatched = unmatched.replace(self.torrent_name[match_s:match_e], "")
                 break
     return unmatched
 
 
 def remove_complete_series_string(self: Any, unmatched: str) -> str:
     if "title" in self.parts:
-        complete_match = complete_series_compiled.search(self.parts["title"])
+        complete_match = self.regex(*complete_series_regex).search(self.parts["title"])
         if complete_match:
             title = self.parts["title"]
             title = title[:complete_match.start()] + title[complete_match.end():]
@@ -92,10 +137,10 @@ def try_site(self: Any) -> None:
     encoder = self.parts["encoder"]
     if self.coherent_types:
         encoder = encoder[0]
-    match = re.findall(r"(\[(.*)\])", encoder, re.IGNORECASE)
+    match = self.regex(*site_in_encoder_regex).findall(encoder)
     if match:
         raw, site = match[0]
-        if not re.match(r"[\[\],.+\-]*\Z", site, re.IGNORECASE):
+        if not self.regex(*site_punctuation_only_regex).match(site):
             self._part("site", None, site)
         self._part("encoder", None, encoder.replace(raw, ""), overwrite=True)
 
@@ -120,7 +165,7 @@ def filter_non_languages(self: Any) -> None:
     if "languages" in self.parts and isinstance(self.parts["languages"], list):
         languages = [
             lang for lang in self.parts["languages"]
-            if any(re.match(lang_regex, lang, re.IGNORECASE) for lang_regex, _ in langs)
+            if any(self.regex(*lang_regex).match(lang) for lang_regex in langs_regexes)
         ]
         self._part("languages", self.part_slices["languages"], languages, overwrite=True)
 
@@ -138,7 +183,7 @@ def is_subtitle_available(self: Any) -> None:
 
 def try_vague_season_episode(self: Any) -> None:
     title = self.parts["title"]
-    m = re.search(r"(\d{1,2})-(\d{1,2})$", title)
+    m = self.regex(*vague_season_episode_regex).search(title)
     if m and "seasons" not in self.parts and "episodes" not in self.parts:
         offset = self.part_slices["title"][0]
         self._part("seasons", (offset + m.start(1), offset + m.end(1)), [int(m.group(1))])
@@ -168,3 +213,19 @@ post_processing_after_excess = [
     use_year_as_title_if_absent,
     remove_empty_parts,
 ]
+
+# Every stage, by name, so they can be turned off per parser (see `PTN(disabled_stages=...)`).
+post_processing_stages = {
+    f.__name__: f for f in post_processing_before_excess + post_processing_after_excess
+}
+
+
+def enabled_stages(stages: List[Any], disabled: Iterable[str] = ()) -> List[Any]:
+    """
+    Filter a stage list, keeping its order, removing those named in `disabled`.
+    """
+    disabled = set(disabled)
+    unknown = disabled - set(post_processing_stages)
+    if unknown:
+        raise ValueError(f"Unknown post-processing stages: {', '.join(sorted(unknown))}")
+    return [f for f in stages if f.__name__ not in disabled]
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+
+# Parse profiles trade accuracy for speed, by skipping some pattern keys (from
+# `patterns_ordered`) and post-processing stages (from `post.post_processing_stages`).
+# Select one with `PTN(profile="fast")`. `python -m benchmarks.profiles` measures each
+# profile's speed and accuracy against the test corpus.
+#
+# Skipped keys are never matched, so their text can end up in the title or excess. Every
+# profile other than "full" also skips building `excess` (and so guessing the encoder from it).
+
+profiles = {
+    "full": {
+        "skip_keys": [],
+        "disabled_stages": [],
+        "excess": True,
+    },
+    # Drops the fields that are rarely needed, or only guessed at.
+    "fast": {
+        "skip_keys": [
+            "genres",
+            "readnfo",
+            "untouched",
+            "internationalCut",
+        ],
+        "disabled_stages": [
+            "try_episode_name",
+            "try_encoder_before_site",
+            "try_encoder",
+            "try_site",
+        ],
+        "excess": False,
+    },
+    # Just enough to identify the media (title, year, seasons & episodes, ...) and the
+    # release's resolution, quality and codec, e.g. for search-as-you-type.
+    "minimal": {
+        "skip_keys": [
+            "genres",
+            "readnfo",
+            "untouched",
+            "internationalCut",
+            "audio",
+            "network",
+            "languages",
+            "subtitles",
+        ],
+        "disabled_stages": [
+            "try_episode_name",
+            "try_encoder_before_site",
+            "try_encoder",
+            "try_site",
+            "fix_subtitles_no_language",
+            "filter_non_languages",
+            "is_subtitle_available",
+        ],
+        "excess": False,
+    },
+}
@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+import threading
+from typing import Any, Callable, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+from .patterns import language_patterns, network_patterns, patterns, patterns_ordered
+
+# Keys can be added to the patterns, and their options or place in the order changed, at
+# runtime through a PatternRegistry. Each change makes a new version of the patterns, and
+# parsers using the registry catch up before their next parse, recompiling only the keys
+# whose options changed (see `PTN._update`). A parse that has started carries on with the
+# patterns it started with.
+#
+# Some keys are built from the options of others: the `network` patterns embed the quality
+# options, and the `languages` patterns the audio and subtitles options. These composites
+# are rebuilt when what they embed changes, keeping the options added to or removed from
+# them. Other options embedding another key (the seasons in the episodes and the other way
+# round, the parts of a date) are copies made when the patterns were written, and aren't.
+
+COMPOSITES: Dict[str, Tuple[Tuple[str, ...], Callable[[Dict[str, Any]], List[Any]]]] = {
+    "network": (("quality",), lambda table: network_patterns(table["quality"])),
+    "languages": (("audio", "subtitles"), lambda table: language_patterns(table["audio"], table["subtitles"])),
+}
+
+
+class PatternSnapshot(NamedTuple):
+    """
+    The patterns and their order at a version of a registry.
+    """
+    version: int
+    patterns: Dict[str, Any]
+    order: Tuple[str, ...]
+
+
+class PatternRegistry:
+    """
+    The patterns, by key, and the order they're matched in, which can be changed while
+    parsers are using them.
+    """
+
+    def __init__(self, table: Optional[Dict[str, Any]] = None, order: Optional[List[str]] = None):
+        """
+        :param table: The patterns by key, changed in place (by default `patterns.patterns`).
+        :param order: The keys in the order they're matched, changed in place (by default
+            `patterns.patterns_ordered`).
+        """
+        self.patterns = patterns if table is None else table
+        self.order = patterns_ordered if order is None else order
+        self.version = 0
+        self.composites = {
+            key: composite for key, composite in COMPOSITES.items()
+            if key in self.patterns and all(part in self.patterns for part in composite[0])
+        }
+        # The keys changed by each version.
+        self._changes: List[Tuple[int, FrozenSet[str]]] = []
+        # The options added to and removed from each composite, which it keeps when it's rebuilt.
+        self._added: Dict[str, List[Any]] = {}
+        self._removed: Dict[str, List[Any]] = {}
+        self._lock = threading.RLock()
+
+    def options(self, key: str) -> List[Any]:
+        """
+        The options of a key.
+        """
+        self._check_key(key)
+        return _as_list(self.patterns[key])
+
+    def add(self, key: str, options: Any, before: Optional[str] = None, after: Optional[str] = None) -> None:
+        """
+        Add options (a pattern, an option tuple, or a list of them, see `patterns.py`) after
+        the options of a key, or a new key with them, which is matched last unless `before`
+        or `after` gives the key to match it next to.
+        """
+        options = _as_list(options)
+        placed = before is not None or after is not None
+        with self._lock:
+            if placed:
+                self._position(key, before, after)
+            if key in self.patterns:
+                self.patterns[key] = _as_list(self.patterns[key]) + options
+                if key in self.composites:
+                    self._added.setdefault(key, []).extend(options)
+            else:
+                self.patterns[key] = options
+                if not placed:
+                    self.order.append(key)
+            if placed:
+                self._place(key, before, after)
+            self._commit({key})
+
+    def replace(self, key: str, options: Any) -> None:
+        """
+        Replace the options of a key. A composite's options are its own from then on, and
+        aren't rebuilt when what it embedded changes.
+        """
+        with self._lock:
+            self._check_key(key)
+            self.patterns[key] = _as_list(options)
+            self._detach(key)
+            self._commit({key})
+
+    def remove(self, key: str, option: Any = None) -> None:
+        """
+        Remove one of the options of a key, or without `option` the key itself.
+        """
+        with self._lock:
+            self._check_key(key)
+            if option is not None:
+                options = _as_list(self.patterns[key])
+                if option not in options:
+                    raise ValueError(f"'{key}' has no option {option!r}")
+                options.remove(option)
+                self.patterns[key] = options
+                if option in self._added.get(key, []):
+                    self._added[key].remove(option)
+                elif key in self.composites:
+                    self._removed.setdefault(key, []).append(option)
+                self._commit({key})
+                return
+            for composite, (parts, _) in self.composites.items():
+                if key in parts and composite != key:
+                    raise ValueError(f"'{key}' is embedded in the '{composite}' patterns, replace them first")
+            del self.patterns[key]
+            if key in self.order:
+                self.order.remove(key)
+            self._detach(key)
+            self._commit({key})
+
+    def move(self, key: str, before: Optional[str] = None, after: Optional[str] = None) -> None:
+        """
+        Match a key just before or after another one.
+        """
+        with self._lock:
+            self._check_key(key)
+            self._place(key, before, after)
+            self._commit(set())
+
+    def snapshot(self) -> PatternSnapshot:
+        """
+        A copy of the patterns and their order, which later changes don't affect.
+        """
+        with self._lock:
+            return PatternSnapshot(self.version, dict(self.patterns), tuple(self.order))
+
+    def changes(self, version: int) -> Tuple[PatternSnapshot, FrozenSet[str]]:
+        """
+        A snapshot of the patterns, and the keys changed since an earlier version.
+        """
+        with self._lock:
+            changed = frozenset().union(*(keys for changed_in, keys in self._changes if changed_in > version))
+            return self.snapshot(), changed
+
+    def _commit(self, changed: set) -> None:
+        for key, (parts, build) in self.composites.items():
+            if changed & set(parts):
+                removed = self._removed.get(key, [])
+                self.patterns[key] = [option for option in build(self.patterns) if option not in removed] + self._added.get(key, [])
+                changed.add(key)
+        self.version += 1
+        self._changes.append((self.version, frozenset(changed)))
+
+    def _detach(self, key: str) -> None:
+        self.composites.pop(key, None)
+        self._added.pop(key, None)
+        self._removed.pop(key, None)
+
+    def _check_key(self, key: str) -> None:
+        if key not in self.patterns:
+            raise ValueError(f"Unknown pattern key '{key}'")
+
+    def _place(self, key: str, before: Optional[str], after: Optional[str]) -> None:
+        position = self._position(key, before, after)
+        if key in self.order:
+            position -= self.order.index(key) < position
+            self.order.remove(key)
+        self.order.insert(position, key)
+
+    def _position(self, key: str, before: Optional[str], after: Optional[str]) -> int:
+        if (before is None) == (after is None):
+            raise ValueError(f"Give one of `before` or `after` to place '{key}'")
+        other = before if after is None else after
+        if other == key or other not in self.order:
+            raise ValueError(f"Can't place '{key}' next to '{other}', which isn't matched")
+        return self.order.index(other) + (after is not None)
+
+
+def _as_list(options: Any) -> List[Any]:
+    """
+    Options as a list (a key's options can also be a single pattern or option tuple).
+    """
+    return [options] if isinstance(options, (str, tuple)) else list(options)
+
+
+# The registry of `patterns.patterns`, which parsers use unless they're given another one.
+default_registry = PatternRegistry()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+import re
+from typing import FrozenSet
+
+# Classify the scripts a name is written in, so cleaning that only applies to some scripts
+# (see `patterns["NON_ENGLISH_CHARS"]`) can be skipped for names without them.
+
+# The ranges of `patterns["NON_ENGLISH_CHARS"]`, by script.
+SCRIPT_CHARS = {
+    "cjk": "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff66-\uff9f",
+    "cyrillic": "\u0400-\u04ff",
+    "arabic": "\u0600-\u06ff",
+}
+# Latin-1 Supplement, Latin Extended-A and -B, and Latin Extended Additional.
+LATIN_CHARS = "\u0080-\u024f\u1e00-\u1eff"
+
+NON_ENGLISH_SCRIPTS = frozenset(SCRIPT_CHARS)
+ALL_SCRIPTS = frozenset(["ascii", "latin", "other"]) | NON_ENGLISH_SCRIPTS
+ASCII = frozenset(["ascii"])
+
+_script_patterns = {script: re.compile(f"[{chars}]") for script, chars in {**SCRIPT_CHARS, "latin": LATIN_CHARS}.items()}
+_other_pattern = re.compile(f"[^\x00-\x7f{LATIN_CHARS}{''.join(SCRIPT_CHARS.values())}]")
+
+
+def classify(text: str) -> FrozenSet[str]:
+    """
+    The scripts in `text`: {"ascii"} if it's pure ASCII, otherwise those of "latin"
+    (accented and extended Latin), "cjk", "cyrillic", "arabic" and "other" it contains.
+    """
+    if text.isascii():
+        return ASCII
+    scripts = [script for script, pattern in _script_patterns.items() if pattern.search(text)]
+    if _other_pattern.search(text):
+        scripts.append("other")
+    return frozenset(scripts)
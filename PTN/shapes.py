@@ -0,0 +1,406 @@
+#!/usr/bin/env python
+import functools
+import re
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .parse import PTN
+from .patterns import types
+
+try:
+    from re import _compiler as sre_compile, _constants as sre_constants, _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_compile
+    import sre_constants
+    import sre_parse
+
+# Most names in a stream follow a few hundred shapes, and names of the same show and shape
+# (`The.Show.S01E02.1080p.WEB-DL.x264-GRP`, `The.Show.S01E03...`) only differ by their
+# numbers. A ShapeCache groups names by their signature, the name with every ASCII digit
+# masked, and learns from the first parse of a shape which numbers the integer fields
+# (`types`) were read from and how: as the number, a list of it, or a range between two.
+# Some options only match some numbers (years start with 19 or 20), so the option each of
+# those fields was matched by has to match the same span of later names. And any option of
+# any key that tells digits apart might match the numbers read differently
+# (`Complete.Series.7K` has a season, `Complete.Series.4K` a resolution, and audio's `2.0`
+# matches `240` but not `233`): each of them has to match over or next to those numbers
+# where it did in the first name, if it did. Options that don't (with no digits, or only
+# `\d`, `\w` or `[0-9]`) match names of the same shape the same way, and neither do those
+# that can't match the first name with each of their digits matching any digit.
+#
+# Later names of the shape get the first result with those fields read from their own
+# numbers, once the shape is verified: the next names of the shape are still parsed, and
+# the shape is only used once as many as `verify` of them were predicted exactly. Numbers
+# that weren't read into a field (in the title, in `excess`, ...) have to be the same as in
+# the first name. Names that don't pass those checks are parsed. Every `audit_every`th name
+# a shape predicts is parsed too, in case the values read change a result some other way
+# (the post-processing), and a shape that mispredicts is retired: its names are always
+# parsed from then on.
+#
+# Words are part of the signature, rather than token classes: any word can be what a
+# pattern matches (a language, "Extended", a network), so titles can't be masked the way
+# numbers are.
+
+DIGITS = re.compile(r"[0-9]+")
+DIGIT = re.compile(r"[0-9]")
+MASK = str.maketrans("0123456789", "##########")
+INTEGER_KEYS = frozenset(key for key, kind in types.items() if kind == "integer")
+
+# How a field is read from the numbers of a name (indexes into its digit runs).
+NUMBER, NUMBER_LIST, RANGE = "number", "list", "range"
+
+
+class Shape:
+    """
+    What was learnt from the first parse of a shape, and how it did since.
+    """
+
+    def __init__(
+        self,
+        signature: str,
+        result: Dict[str, Any],
+        fields: Dict[str, Tuple[Any, ...]],
+        literals: Tuple[Tuple[int, str], ...],
+        checks: List[Tuple[Any, int, int]],
+        clean_name: str,
+        spans: Tuple[Tuple[int, int], ...],
+    ):
+        self.signature = signature
+        self.result = result
+        # Field -> (how it's read, digit run indexes), for the fields read from numbers.
+        self.fields = fields
+        # (index, digits) of the digit runs that have to be the same in every name.
+        self.literals = literals
+        # (regex, start, end) of the options the fields read from numbers were matched by.
+        self.checks = checks
+        # The first name cleaned, the spans of the numbers read, and (regex, matches) of the
+        # options that tell digits apart, with where they matched over or next to those spans
+        # (set by the cache once a second name of the shape is seen).
+        self.clean_name = clean_name
+        self.spans = spans
+        self.guards: Optional[List[Tuple[Any, List[Tuple[int, int]]]]] = None
+        self.verified = 0
+        self.predictions = 0
+        self.retired = False
+        self.hits = 0
+        self.parses = 1
+
+    def matches(self, runs: List[str], clean_name: str) -> bool:
+        """
+        Whether a name of the shape can be predicted, from its digit runs and cleaned name.
+        """
+        for index, digits in self.literals:
+            if runs[index] != digits:
+                return False
+        for regex, start, end in self.checks:
+            match = regex.match(clean_name, start)
+            if match is None or match.end() != end:
+                return False
+        for regex, matches in self.guards:
+            if _matches_over(regex, clean_name, self.spans) != matches:
+                return False
+        return True
+
+    def predict(self, runs: List[str]) -> Dict[str, Any]:
+        result = _copy(self.result)
+        for field, (how, indexes) in self.fields.items():
+            if how == NUMBER:
+                result[field] = int(runs[indexes[0]])
+            elif how == NUMBER_LIST:
+                result[field] = [int(runs[index]) for index in indexes]
+            else:
+                result[field] = list(range(int(runs[indexes[0]]), int(runs[indexes[1]]) + 1))
+        return result
+
+
+class ShapeCache:
+    """
+    Parses names, reusing the parses of earlier names of the same shape (see above).
+    """
+
+    def __init__(
+        self,
+        ptn: Optional[PTN] = None,
+        standardise: bool = True,
+        coherent_types: bool = False,
+        max_shapes: int = 4096,
+        verify: int = 2,
+        audit_every: int = 64,
+    ):
+        """
+        :param ptn: The parser to parse names with, by default a new one.
+        :param max_shapes: How many shapes to keep, dropping the least recently used.
+        :param verify: How many names a shape has to predict before it's used.
+        :param audit_every: Parse every so many names a shape predicts, to check it (0 never).
+        """
+        if max_shapes < 1 or verify < 0 or audit_every < 0:
+            raise ValueError("`max_shapes` must be positive, and `verify` and `audit_every` can't be negative")
+        self.ptn = ptn or PTN()
+        self.standardise = standardise
+        self.coherent_types = coherent_types
+        self.max_shapes = max_shapes
+        self.verify = verify
+        self.audit_every = audit_every
+        self.shapes: "OrderedDict[str, Shape]" = OrderedDict()
+        # The options that can match a digit, for the patterns at `_version`.
+        self._options: List[Tuple[Any, Optional[Any]]] = []
+        self._version = None
+        self.parses = 0
+        self.hits = 0
+        self.evicted = 0
+
+    def parse(self, name: str) -> Dict[str, Any]:
+        stripped = name.strip()
+        signature = stripped.translate(MASK)
+        shape = self.shapes.get(signature)
+        if shape is None:
+            return self._learn(stripped, signature)
+        self.shapes.move_to_end(signature)
+        runs = DIGITS.findall(stripped)
+        if shape.guards is None:
+            shape.guards = [
+                (regex, _matches_over(regex, shape.clean_name, shape.spans))
+                for regex, blurred in self._digit_options()
+                if shape.spans and (blurred is None or blurred.search(shape.clean_name))
+            ]
+        if shape.retired or not shape.matches(runs, stripped.replace("_", " ")):
+            return self._parse(stripped, shape)
+        predicted = shape.predict(runs)
+        shape.predictions += 1
+        if shape.verified < self.verify or (self.audit_every and shape.predictions % self.audit_every == 0):
+            result = self._parse(stripped, shape)
+            if result == predicted:
+                shape.verified += 1
+            else:
+                shape.retired = True
+            return result
+        shape.hits += 1
+        self.hits += 1
+        if self.ptn.metrics is not None:
+            self.ptn.metrics.cache("shapes", True)
+        return predicted
+
+    def parse_many(self, names: Iterable[str]) -> List[Dict[str, Any]]:
+        return [self.parse(name) for name in names]
+
+    def stats(self, top: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        The names each shape was used for and parsed, most used first, and how its fields are
+        read.
+        """
+        shapes = sorted(self.shapes.values(), key=lambda shape: shape.hits + shape.parses, reverse=True)
+        return [
+            {
+                "shape": shape.signature,
+                "hits": shape.hits,
+                "parses": shape.parses,
+                "hit_rate": shape.hits / (shape.hits + shape.parses),
+                "state": "retired" if shape.retired else "verified" if shape.verified >= self.verify else "verifying",
+                "fields": {field: how for field, (how, _) in shape.fields.items()},
+            }
+            for shape in shapes[:top]
+        ]
+
+    def _parse(self, stripped: str, shape: Optional[Shape] = None) -> Dict[str, Any]:
+        self.parses += 1
+        if shape is not None:
+            shape.parses += 1
+        if self.ptn.metrics is not None:
+            self.ptn.metrics.cache("shapes", False)
+        return self.ptn.parse(stripped, standardise=self.standardise, coherent_types=self.coherent_types)
+
+    def _learn(self, stripped: str, signature: str) -> Dict[str, Any]:
+        result = self._parse(stripped)
+        spans = [(match.start(), match.end()) for match in DIGITS.finditer(stripped)]
+        runs = [stripped[start:end] for start, end in spans]
+        clean_name = stripped.replace("_", " ")
+        fields, bound, checks = {}, set(), {}
+        for field, value in result.items():
+            part_slice = self.ptn.part_slices.get(field)
+            if field not in INTEGER_KEYS or not part_slice:
+                continue
+            check = self._check(field, clean_name, part_slice)
+            if check is not None:
+                checks[field] = [index for index, (start, end) in enumerate(spans) if part_slice[0] <= start and end <= part_slice[1]], check
+        # A field is read from numbers in its match that no other field was read from, once
+        # they're the only ones it could have been read from (`S01E01` has the episode after
+        # the season, `1x01` either way).
+        while True:
+            for field, (inside, check) in checks.items():
+                how = None if field in fields else _read(result[field], [(index, int(runs[index])) for index in inside if index not in bound])
+                if how is not None:
+                    fields[field] = how
+                    bound.update(how[1])
+                    break
+            else:
+                break
+        checks = {field: check for field, (_, check) in checks.items()}
+        # A number is only read from if nothing else was: it's in no other field, and no
+        # other value has its digits.
+        for field, value in result.items():
+            part_slice = self.ptn.part_slices.get(field)
+            if field in fields:
+                continue
+            for index in list(bound):
+                start, end = spans[index]
+                if (part_slice and part_slice[0] < end and start < part_slice[1]) or runs[index] in str(value):
+                    bound.discard(index)
+        fields = {field: how for field, how in fields.items() if bound.issuperset(how[1])}
+        bound = set().union(*(how[1] for how in fields.values()))
+        literals = tuple((index, digits) for index, digits in enumerate(runs) if index not in bound)
+        if len(self.shapes) >= self.max_shapes:
+            self.shapes.popitem(last=False)
+            self.evicted += 1
+        self.shapes[signature] = Shape(
+            signature, _copy(result), fields, literals, [checks[field] for field in fields],
+            clean_name, tuple(spans[index] for index in sorted(bound)),
+        )
+        return result
+
+    def _check(self, key: str, clean_name: str, part_slice: Tuple[int, int]) -> Optional[Tuple[Any, int, int]]:
+        """
+        The first option of a key matching exactly the slice of its part, as (regex, start,
+        end), or None if none does.
+        """
+        start, end = part_slice
+        for pattern, _, _ in self.ptn.compiled_patterns.get(key, ()):
+            # The shared scans (see `PTN._wrap`) match like their regex.
+            regex = getattr(pattern, "regex", pattern)
+            match = regex.match(clean_name, start)
+            if match is not None and match.end() == end:
+                return regex, start, end
+        return None
+
+    def _digit_options(self) -> List[Tuple[Any, Optional[Any]]]:
+        """
+        The regexes of the options of every key which tell digits apart, with them blurred
+        (see `_blurred`): those that can't match the first name of a shape blurred can't match
+        any name of it.
+        """
+        if self._version != self.ptn.snapshot.version:
+            self._options = [
+                (regex, blurred)
+                for key in self.ptn.patterns_ordered
+                for regex in (getattr(pattern, "regex", pattern) for pattern, _, _ in self.ptn.compiled_patterns.get(key, ()))
+                for tells, blurred in [_blurred(regex.pattern, regex.flags)]
+                if tells
+            ]
+            self._version = self.ptn.snapshot.version
+        return self._options
+
+
+def _read(value: Any, numbers: List[Tuple[int, int]]) -> Optional[Tuple[str, Tuple[int, ...]]]:
+    """
+    How an integer field's value is read from the numbers in its match, if it is.
+    """
+    def index_of(number, after=-1):
+        indexes = [index for index, found in numbers if found == number and index > after]
+        # A number that's there twice (`1x01`) could have been read from either.
+        return indexes[0] if len(indexes) == 1 else None
+
+    if isinstance(value, int) and not isinstance(value, bool):
+        index = index_of(value)
+        return None if index is None else (NUMBER, (index,))
+    if not isinstance(value, list) or not value or not all(isinstance(item, int) for item in value):
+        return None
+    # Two numbers are read as a range (`E10-E11`, `E10E11`, and `E01-E09` the same way) even
+    # when the value lists both of them.
+    if len(value) > 1 and value == list(range(value[0], value[-1] + 1)):
+        start = index_of(value[0])
+        end = index_of(value[-1], start if start is not None else -1)
+        if start is not None and end is not None:
+            return RANGE, (start, end)
+    indexes, after = [], -1
+    for item in value:
+        after = index_of(item, after)
+        if after is None:
+            return None
+        indexes.append(after)
+    return NUMBER_LIST, tuple(indexes)
+
+
+def _matches_over(regex: Any, string: str, spans: Tuple[Tuple[int, int], ...]) -> List[Tuple[int, int]]:
+    """
+    The spans of the matches of a regex over or next to any of `spans` (in order).
+    """
+    found, last = [], spans[-1][1]
+    for match in regex.finditer(string):
+        if match.start() > last:
+            break
+        if any(match.start() <= end and start <= match.end() for start, end in spans):
+            found.append(match.span())
+    return found
+
+
+@functools.lru_cache(maxsize=None)
+def _blurred(pattern: str, flags: int) -> Tuple[bool, Optional[Any]]:
+    """
+    Whether a pattern can match one digit where it wouldn't match another (True if it can't
+    tell), and if so, the pattern matching any digit where it matches some, which matches a
+    name wherever the pattern could match a name of its shape (None if there's no such
+    pattern: with a negated digit, a back-reference, ...).
+    """
+    # Without a digit, a pattern can only have classes of all of them or none (the lists of
+    # languages are slow to parse).
+    if not DIGIT.search(pattern):
+        return False, None
+    try:
+        tree = sre_parse.parse(pattern, flags)
+        tells, blurred = _blur(tree)
+        return tells, sre_compile.compile(tree, flags) if tells and blurred else None
+    except Exception:
+        return True, None
+
+
+DIGIT_CODES = frozenset(range(ord("0"), ord("9") + 1))
+ANY_DIGIT = (sre_constants.RANGE, (ord("0"), ord("9")))
+DIGIT_CATEGORIES = {sre_constants.CATEGORY_DIGIT, sre_constants.CATEGORY_WORD, sre_constants.CATEGORY_NOT_SPACE}
+NO_DIGIT_CATEGORIES = {sre_constants.CATEGORY_NOT_DIGIT, sre_constants.CATEGORY_NOT_WORD, sre_constants.CATEGORY_SPACE}
+
+
+def _blur(sequence: Any) -> Tuple[bool, bool]:
+    """
+    Make the digits and classes of some digits of a parsed pattern match any digit, in place.
+    Whether any did, and whether the pattern could be blurred.
+    """
+    tells, blurred = False, True
+    for index, (op, av) in enumerate(sequence):
+        if op is sre_constants.LITERAL:
+            if av in DIGIT_CODES:
+                tells, sequence[index] = True, (sre_constants.IN, [ANY_DIGIT])
+        elif op is sre_constants.NOT_LITERAL:
+            if av in DIGIT_CODES:
+                tells, blurred = True, False
+        elif op is sre_constants.IN:
+            digits, negated = set(), False
+            for item_op, item_av in av:
+                if item_op is sre_constants.NEGATE:
+                    negated = True
+                elif item_op is sre_constants.LITERAL:
+                    digits.update(DIGIT_CODES & {item_av})
+                elif item_op is sre_constants.RANGE:
+                    digits.update(DIGIT_CODES.intersection(range(item_av[0], item_av[1] + 1)))
+                elif item_op is sre_constants.CATEGORY and item_av in DIGIT_CATEGORIES:
+                    digits.update(DIGIT_CODES)
+                elif not (item_op is sre_constants.CATEGORY and item_av in NO_DIGIT_CATEGORIES):
+                    return True, False
+            if digits and digits != DIGIT_CODES:
+                tells = True
+                if negated:
+                    blurred = False
+                else:
+                    av.append(ANY_DIGIT)
+        elif op in (sre_constants.SUBPATTERN, sre_constants.BRANCH, sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT, sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            for inner in av[1] if op is sre_constants.BRANCH else [av[-1]]:
+                inner_tells, inner_blurred = _blur(inner)
+                tells = tells or inner_tells
+                # Matching more inside a negative lookaround matches less.
+                blurred = blurred and inner_blurred and not (inner_tells and op is sre_constants.ASSERT_NOT)
+        elif op not in (sre_constants.AT, sre_constants.ANY):
+            # Anything else (a back-reference, ...) might tell digits apart.
+            return True, False
+    return tells, blurred
+
+
+def _copy(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {part: list(value) if isinstance(value, list) else value for part, value in result.items()}
@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+import argparse
+import json
+import mmap
+import multiprocessing
+import os
+import shutil
+import sys
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .parse import PTN
+
+# Parse large newline-delimited files of names in parallel. The input is memory-mapped and
+# split into byte-range shards on line boundaries; each worker maps the file itself and only
+# reads its own shard. Finished shards are kept next to the output until everything is done,
+# so an interrupted run resumes from the shards it already completed.
+
+DEFAULT_SHARD_SIZE = 64 * 1024 * 1024
+
+# Set in each worker process by _init_worker.
+_worker_ptn = None
+_worker_options = None
+
+
+def shard_ranges(path: str, shard_size: int = DEFAULT_SHARD_SIZE) -> List[Tuple[int, int]]:
+    """
+    Split a file into (start, end) byte ranges of about `shard_size`, each ending after a newline
+    (or at the end of the file).
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    ranges = []
+    with open(path, "rb") as input_file, mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        start = 0
+        while start < size:
+            newline = data.find(b"\n", min(start + shard_size, size) - 1)
+            end = size if newline == -1 else newline + 1
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def read_shard(path: str, start: int, end: int) -> List[str]:
+    """
+    Read the names in a byte range of a file, one per line.
+    """
+    with open(path, "rb") as input_file, mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        text = data[start:end].decode("utf-8", errors="replace")
+    lines = text.split("\n")
+    if lines and lines[-1] == "":
+        lines.pop()
+    return [line[:-1] if line.endswith("\r") else line for line in lines]
+
+
+def _init_worker(options: Dict[str, Any]) -> None:
+    global _worker_ptn, _worker_options
+    _worker_ptn = PTN(**options["parser"])
+    _worker_options = options
+
+
+def _parse_shard(shard: Tuple[int, int, int]) -> Tuple[int, int]:
+    """
+    Parse one shard, writing its results as NDJSON to its file in the shard directory.
+    """
+    index, start, end = shard
+    options = _worker_options
+    shard_path = _shard_path(options["shard_dir"], index)
+    names = read_shard(options["input"], start, end)
+    with open(shard_path + ".tmp", "w", encoding="utf-8") as shard_file:
+        for result in _worker_ptn.parse_many(names, standardise=options["standardise"], coherent_types=options["coherent_types"]):
+            shard_file.write(json.dumps(result, ensure_ascii=False))
+            shard_file.write("\n")
+    # Only completed shards get their final name, which is what resuming looks for.
+    os.replace(shard_path + ".tmp", shard_path)
+    return index, len(names)
+
+
+def _shard_path(shard_dir: str, index: int) -> str:
+    return os.path.join(shard_dir, f"{index:06d}.ndjson")
+
+
+def _manifest(path: str, shard_size: int, options: Dict[str, Any]) -> Dict[str, Any]:
+    stat = os.stat(path)
+    return {
+        "input": os.path.abspath(path),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "shard_size": shard_size,
+        "standardise": options["standardise"],
+        "coherent_types": options["coherent_types"],
+        "parser": options["parser"],
+    }
+
+
+def parse_file(
+    path: str,
+    output: str,
+    workers: Optional[int] = None,
+    output_format: str = "ndjson",
+    standardise: bool = True,
+    coherent_types: bool = False,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    resume: bool = True,
+    progress: Optional[Callable[[int, int, int], None]] = None,
+    **parser_options: Any,
+) -> int:
+    """
+    Parse every line of a newline-delimited file of names, in parallel, writing the results in
+    input order to `output`. Returns the number of names parsed.
+
+    :param workers: Number of worker processes (default: the number of CPUs). With 1, shards are
+        parsed in this process.
+    :param output_format: "ndjson" writes one JSON result per input line. "columnar" makes
+        `output` a directory with a `<field>.jsonl` file per field, holding one value (or null)
+        per input line.
+    :param shard_size: Approximate size in bytes of each shard.
+    :param resume: Reuse shards completed by a previous, interrupted run with the same input and
+        options. Shards are kept in `<output>.shards` until the output is written.
+    :param progress: Called after each shard with (shards done, total shards, names done).
+    :param parser_options: Passed to `PTN(...)` in each worker, e.g. `profile="fast"`.
+    """
+    if output_format not in ("ndjson", "columnar"):
+        raise ValueError(f"Unknown output format '{output_format}', expected 'ndjson' or 'columnar'")
+    options = {
+        "input": path,
+        "shard_dir": output + ".shards",
+        "standardise": standardise,
+        "coherent_types": coherent_types,
+        "parser": parser_options,
+    }
+    manifest = _manifest(path, shard_size, options)
+    manifest_path = os.path.join(options["shard_dir"], "manifest.json")
+    if resume and os.path.isfile(manifest_path):
+        with open(manifest_path, encoding="utf-8") as manifest_file:
+            if json.load(manifest_file) != json.loads(json.dumps(manifest)):
+                shutil.rmtree(options["shard_dir"])
+    elif os.path.isdir(options["shard_dir"]):
+        shutil.rmtree(options["shard_dir"])
+    os.makedirs(options["shard_dir"], exist_ok=True)
+    with open(manifest_path, "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file)
+
+    shards = [(index, start, end) for index, (start, end) in enumerate(shard_ranges(path, shard_size))]
+    pending = [shard for shard in shards if not os.path.isfile(_shard_path(options["shard_dir"], shard[0]))]
+    done = len(shards) - len(pending)
+    lines = 0
+    if progress and done:
+        progress(done, len(shards), lines)
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(pending) <= 1:
+        _init_worker(options)
+        results = map(_parse_shard, pending)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(min(workers, len(pending)), initializer=_init_worker, initargs=(options,))
+        results = pool.imap_unordered(_parse_shard, pending)
+    try:
+        for _, count in results:
+            done += 1
+            lines += count
+            if progress:
+                progress(done, len(shards), lines)
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    shard_paths = [_shard_path(options["shard_dir"], index) for index, _, _ in shards]
+    if output_format == "ndjson":
+        total = _merge_ndjson(shard_paths, output)
+    else:
+        total = _merge_columnar(shard_paths, output)
+    shutil.rmtree(options["shard_dir"])
+    return total
+
+
+def _merge_ndjson(shard_paths: List[str], output: str) -> int:
+    total = 0
+    with open(output + ".tmp", "wb") as output_file:
+        for shard_path in shard_paths:
+            with open(shard_path, "rb") as shard_file:
+                for line in shard_file:
+                    output_file.write(line)
+                    total += 1
+    os.replace(output + ".tmp", output)
+    return total
+
+
+def _merge_columnar(shard_paths: List[str], output: str) -> int:
+    temporary = output + ".tmp"
+    if os.path.isdir(temporary):
+        shutil.rmtree(temporary)
+    os.makedirs(temporary)
+    columns = {}
+    total = 0
+    try:
+        for shard_path in shard_paths:
+            with open(shard_path, encoding="utf-8") as shard_file:
+                for line in shard_file:
+                    result = json.loads(line)
+                    for field, value in result.items():
+                        if field not in columns:
+                            columns[field] = [open(os.path.join(temporary, f"{field}.jsonl"), "w", encoding="utf-8"), 0]
+                        column = columns[field]
+                        column[0].write("null\n" * (total - column[1]))
+                        column[0].write(json.dumps(value, ensure_ascii=False) + "\n")
+                        column[1] = total + 1
+                    total += 1
+        for column in columns.values():
+            column[0].write("null\n" * (total - column[1]))
+    finally:
+        for column in columns.values():
+            column[0].close()
+    if os.path.isdir(output):
+        shutil.rmtree(output)
+    os.replace(temporary, output)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse a newline-delimited file of torrent names in parallel.")
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--format", dest="output_format", choices=["ndjson", "columnar"], default="ndjson")
+    parser.add_argument("--raw", dest="standardise", action="store_false", help="don't standardise the output")
+    parser.add_argument("--coherent-types", action="store_true")
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE, help="approximate shard size in bytes")
+    parser.add_argument("--no-resume", dest="resume", action="store_false")
+    parser.add_argument("--profile", default="full")
+    args = parser.parse_args()
+
+    def report(done: int, total: int, names: int) -> None:
+        print(f"\r{done}/{total} shards, {names} names", end="", file=sys.stderr, flush=True)
+
+    total = parse_file(
+        args.input, args.output, workers=args.workers, output_format=args.output_format,
+        standardise=args.standardise, coherent_types=args.coherent_types, shard_size=args.shard_size,
+        resume=args.resume, progress=report, profile=args.profile,
+    )
+    print(f"\nParsed {total} names into {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
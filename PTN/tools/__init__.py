@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+import importlib.util
+import json
+import os
+import sys
+import time
+from types import ModuleType
+from typing import Callable, Iterable, List
+
+# Offline tools for working on PTN's patterns, each runnable with `python -m PTN.tools.<name>`.
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "tests", "files", "input.json")
+
+
+def load_corpus(path: str = CORPUS_PATH) -> List[str]:
+    """
+    Load a corpus of torrent names, either a JSON list or one name per line.
+    """
+    with open(path, encoding="utf-8") as corpus_file:
+        if path.endswith(".json"):
+            return json.load(corpus_file)
+        return [line.rstrip("\n") for line in corpus_file if line.strip()]
+
+
+def load_package(path: str, alias: str) -> ModuleType:
+    """
+    Import the PTN package found at `path` (a checkout, or its PTN directory) as `alias`, so
+    several versions can be loaded side by side.
+    """
+    package_dir = path if os.path.isfile(os.path.join(path, "patterns.py")) else os.path.join(path, "PTN")
+    init_path = os.path.join(package_dir, "__init__.py")
+    if not os.path.isfile(init_path):
+        raise FileNotFoundError(f"No PTN package found at {path}")
+    # Submodules of a package loaded earlier under the alias would be imported from its path.
+    for name in [name for name in sys.modules if name == alias or name.startswith(alias + ".")]:
+        del sys.modules[name]
+    spec = importlib.util.spec_from_file_location(alias, init_path, submodule_search_locations=[package_dir])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[alias] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def best_time(run: Callable[[], object], repeat: int = 3) -> float:
+    """
+    Time `run`, returning the best of `repeat` runs in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def time_names(parse: Callable[[str], object], names: Iterable[str], repeat: int = 3) -> float:
+    """
+    Time `parse` over all names, returning the best of `repeat` runs in seconds.
+    """
+    names = list(names)
+
+    def run():
+        for name in names:
+            parse(name)
+
+    return best_time(run, repeat)
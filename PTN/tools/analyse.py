@@ -0,0 +1,393 @@
+#!/usr/bin/env python
+import argparse
+import itertools
+import json
+import os
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .. import extras, patterns as patterns_module
+from ..parse import PTN
+from . import CORPUS_PATH, best_time, load_corpus
+
+try:
+    from re import _compiler as sre_compile, _constants as sre_constants, _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_compile
+    import sre_constants
+    import sre_parse
+
+# Static analysis of the pattern table (and the lists in extras.py it's built from), to find
+# what can be removed or simplified safely:
+#
+# - duplicated options, and alternatives (`a|b`) that are shadowed: every string they match is
+#   also matched by an earlier option of the key as the parser compiles it, between spaces,
+#   which wins instead (unless its match is rejected for overlapping another part), or by an
+#   earlier alternative of the same option. Alternatives with anchors or lookarounds match
+#   depending on what's around them, so they're never reported;
+# - standardised values given by more than one option or list entry;
+# - keys whose options share a long suffix, e.g. the `network` x `quality` cross product;
+# - options ranked by compiled size, nested-quantifier risk and measured cost on a corpus.
+#
+#   python -m PTN.tools.analyse [--corpus names.txt] [--json report.json]
+
+# Alternatives are compared by the strings they match, if there are at most this many.
+MAX_STRINGS = 512
+REPEATS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT, getattr(sre_constants, "POSSESSIVE_REPEAT", None)}
+
+
+class TooMany(Exception):
+    pass
+
+
+def split_alternatives(regex: str) -> List[str]:
+    """
+    The top-level alternatives of a regex, with those of a group spanning a whole alternative
+    (e.g. `(?:a|b)`) split further.
+    """
+    alternatives, depth, in_class, start, i = [], 0, False, 0, 0
+    while i < len(regex):
+        c = regex[i]
+        if c == "\\":
+            i += 2
+            continue
+        if in_class:
+            in_class = c != "]"
+        elif c == "[":
+            in_class = True
+            # A `]` straight after `[` or `[^` is a literal.
+            if regex[i + 1:i + 2] == "]" or regex[i + 1:i + 3] == "^]":
+                i += 2 if regex[i + 1] == "]" else 3
+                continue
+        elif c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == "|" and depth == 0:
+            alternatives.append(regex[start:i])
+            start = i + 1
+        i += 1
+    alternatives.append(regex[start:])
+    if len(alternatives) == 1:
+        inner = _whole_group(regex)
+        if inner is not None and len(split_alternatives(inner)) > 1:
+            return split_alternatives(inner)
+        return alternatives
+    return [part for alternative in alternatives for part in split_alternatives(alternative)]
+
+
+def _whole_group(regex: str) -> Optional[str]:
+    """
+    The contents of a (capturing or non-capturing) group that is the whole regex.
+    """
+    match = re.match(r"\((?:\?:)?", regex)
+    if not match or not regex.endswith(")"):
+        return None
+    depth, in_class, i = 0, False, 0
+    while i < len(regex):
+        c = regex[i]
+        if c == "\\":
+            i += 2
+            continue
+        if in_class:
+            in_class = c != "]"
+        elif c == "[":
+            in_class = True
+        elif c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+            if depth == 0 and i != len(regex) - 1:
+                return None
+        i += 1
+    return regex[match.end():-1]
+
+
+def matched_strings(regex: str, limit: int = MAX_STRINGS) -> Optional[Set[str]]:
+    """
+    Every (lowercased) string the regex matches, or None if there are more than `limit` or it
+    can't tell (with anchors or lookarounds, it depends on what's around the string).
+    """
+    try:
+        return {string.lower() for string in _strings(list(sre_parse.parse(regex, re.IGNORECASE)), limit)}
+    except (TooMany, re.error):
+        return None
+
+
+def _strings(sequence: List[Tuple[Any, Any]], limit: int) -> Set[str]:
+    strings = {""}
+    for op, av in sequence:
+        if op is sre_constants.LITERAL:
+            options = {chr(av)}
+        elif op is sre_constants.SUBPATTERN:
+            options = _strings(list(av[-1]), limit)
+        elif op is sre_constants.BRANCH:
+            options = set().union(*(_strings(list(branch), limit) for branch in av[1]))
+        elif op is sre_constants.IN:
+            options = set()
+            for item_op, item_av in av:
+                if item_op is sre_constants.LITERAL:
+                    options.add(chr(item_av))
+                elif item_op is sre_constants.RANGE and item_av[1] - item_av[0] < 26:
+                    options.update(chr(c) for c in range(item_av[0], item_av[1] + 1))
+                else:
+                    raise TooMany()
+        elif op in REPEATS and av[1] <= 4:
+            item = _strings(list(av[2]), limit)
+            options = set()
+            for count in range(av[0], av[1] + 1):
+                options.update("".join(parts) for parts in itertools.product(item, repeat=count))
+                if len(options) > limit:
+                    raise TooMany()
+        else:
+            raise TooMany()
+        strings = {prefix + option for prefix in strings for option in options}
+        if len(strings) > limit:
+            raise TooMany()
+    return strings
+
+
+def compiled_size(regex: str, flags: int = re.IGNORECASE) -> int:
+    """
+    The length of the compiled regex program, in code words.
+    """
+    try:
+        return len(sre_compile._code(sre_parse.parse(regex, flags), flags))
+    except (AttributeError, TypeError):
+        return len(regex)
+
+
+def quantifier_risk(regex: str) -> int:
+    """
+    How deeply unbounded (or large) quantifiers are nested in the regex: 0 for none, 1 for a
+    quantifier, 2 or more for nested ones, which can backtrack badly.
+    """
+    def depth(sequence: List[Tuple[Any, Any]]) -> int:
+        deepest = 0
+        for op, av in sequence:
+            if op in REPEATS:
+                inner = depth(list(av[2]))
+                deepest = max(deepest, inner + 1 if av[1] > 4 else inner)
+            elif op is sre_constants.SUBPATTERN:
+                deepest = max(deepest, depth(list(av[-1])))
+            elif op is sre_constants.BRANCH:
+                deepest = max([deepest] + [depth(list(branch)) for branch in av[1]])
+            elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+                deepest = max(deepest, depth(list(av[1])))
+        return deepest
+
+    return depth(list(sre_parse.parse(regex, re.IGNORECASE)))
+
+
+def pattern_lists() -> Dict[str, List[Tuple[str, Optional[str]]]]:
+    """
+    The options of every key of the pattern table, in matching order, and the lists of
+    extras.py that patterns are built from, as (regex, standardised value).
+    """
+    lists = {}
+    for key in patterns_module.patterns_ordered:
+        lists[key] = [(option[0], option[1]) for option in PTN.normalise_pattern_options(patterns_module.patterns[key])]
+    for name in ("langs", "genres", "complete_series"):
+        lists[f"extras.{name}"] = [(option[0], option[1]) for option in PTN.normalise_pattern_options(getattr(extras, name))]
+    return lists
+
+
+def find_redundancy(lists: Dict[str, List[Tuple[str, Optional[str]]]]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Duplicated options, shadowed or overlapping alternatives, and duplicated values.
+    """
+    findings = {"duplicate_options": [], "shadowed": [], "overlapping": [], "duplicate_values": []}
+    compiled = PTN().compiled_patterns
+    for key, options in lists.items():
+        # The options as the parser compiles them, to check shadowing in context with.
+        regexes = [getattr(pattern, "regex", pattern) for pattern, _, _ in compiled.get(key, ())]
+        if len(regexes) != len(options):
+            regexes = [None] * len(options)
+        seen = {}
+        values = {}
+        # (option index, alternative, the strings it matches) of the options before.
+        earlier: List[Tuple[int, str, Optional[Set[str]]]] = []
+        for index, (regex, value) in enumerate(options):
+            if regex in seen:
+                findings["duplicate_options"].append({"key": key, "option": index, "same_as": seen[regex], "regex": regex})
+                continue
+            seen[regex] = index
+            if isinstance(value, str):
+                values.setdefault(value, []).append(index)
+
+            alternatives = split_alternatives(regex)
+            own: List[Tuple[str, Optional[Set[str]]]] = []
+            for alternative in alternatives:
+                strings = matched_strings(alternative)
+                if strings:
+                    covered_by = _covered_by(
+                        strings, [(f"option {i}", s, regexes[i]) for i, _, s in earlier] + [("this option", s, None) for _, s in own],
+                    )
+                    if covered_by is not None:
+                        findings["shadowed"].append({
+                            "key": key, "option": index, "alternative": alternative, "by": covered_by,
+                            "strings": sorted(strings)[:8],
+                        })
+                    else:
+                        for other_index, other_alternative, other_strings in earlier:
+                            shared = strings & other_strings if other_strings else set()
+                            if shared:
+                                findings["overlapping"].append({
+                                    "key": key, "option": index, "alternative": alternative,
+                                    "other_option": other_index, "other_alternative": other_alternative,
+                                    "shared": sorted(shared)[:8],
+                                })
+                own.append((alternative, strings))
+            earlier += [(index, alternative, strings) for alternative, strings in own]
+
+        for value, indexes in values.items():
+            if len(indexes) > 1 and key.startswith("extras."):
+                findings["duplicate_values"].append({"key": key, "value": value, "options": indexes})
+    return findings
+
+
+def _covered_by(strings: Set[str], others: List[Tuple[str, Optional[Set[str]], Any]]) -> Optional[str]:
+    """
+    The labels of the alternatives matching all the strings, if they do. Those with a
+    compiled regex only match a string if the regex matches exactly it between spaces.
+    """
+    covered = set()
+    sources = []
+    for label, other, regex in others:
+        shared = {string for string in strings & (other or set()) if regex is None or _matches_in_context(regex, string)}
+        if shared:
+            covered |= shared
+            sources.append(label)
+            if covered >= strings:
+                return ", ".join(dict.fromkeys(sources))
+    return None
+
+
+def _matches_in_context(regex: Any, string: str) -> bool:
+    match = regex.match(f" {string} ", 1)
+    return match is not None and match.end() == len(string) + 1
+
+
+def find_cross_products(lists: Dict[str, List[Tuple[str, Optional[str]]]], min_suffix: int = 40, min_options: int = 5) -> List[Dict[str, Any]]:
+    """
+    Keys where many options end with the same long suffix, as built by `suffix_pattern_with`.
+    """
+    products = []
+    for key, options in lists.items():
+        by_suffix = {}
+        for regex, _ in options:
+            if len(regex) > min_suffix:
+                by_suffix.setdefault(regex[-min_suffix:], []).append(regex)
+        for group in by_suffix.values():
+            if len(group) < min_options:
+                continue
+            suffix = os.path.commonprefix([regex[::-1] for regex in group])[::-1]
+            products.append({
+                "key": key, "options": len(group), "suffix_length": len(suffix),
+                "repeated_chars": len(suffix) * (len(group) - 1), "suffix": suffix[:80],
+            })
+    return products
+
+
+def rank_options(names: List[str], repeat: int = 1) -> List[Dict[str, Any]]:
+    """
+    Every option of the pattern table as the parser compiles it, with its compiled size,
+    quantifier risk, and time per name over `names` (if any).
+    """
+    ptn = PTN()
+    clean_names = [name.strip().replace("_", " ") for name in names]
+    ranked = []
+    for key in ptn.patterns_ordered:
+        for index, (pattern, _, _) in enumerate(ptn.compiled_patterns[key]):
+            cost = None
+            if clean_names:
+                cost = best_time(lambda: [None for clean_name in clean_names for _ in pattern.finditer(clean_name)], repeat) / len(clean_names) * 1e6
+            ranked.append({
+                "key": key, "option": index, "regex": pattern.pattern,
+                "size": compiled_size(pattern.pattern, pattern.flags),
+                "risk": quantifier_risk(pattern.pattern),
+                "cost_us": cost,
+            })
+    return ranked
+
+
+def analyse(names: List[str], repeat: int = 1) -> Dict[str, Any]:
+    lists = pattern_lists()
+    ranked = rank_options(names, repeat)
+    keys = {}
+    for option in ranked:
+        key = keys.setdefault(option["key"], {"key": option["key"], "options": 0, "size": 0, "cost_us": 0.0})
+        key["options"] += 1
+        key["size"] += option["size"]
+        key["cost_us"] += option["cost_us"] or 0.0
+    return {
+        "names": len(names),
+        "keys": sorted(keys.values(), key=lambda key: key["size"], reverse=True),
+        "options": ranked,
+        "cross_products": find_cross_products(lists),
+        **find_redundancy(lists),
+    }
+
+
+def _short(regex: str, length: int = 60) -> str:
+    return regex if len(regex) <= length else regex[:length - 3] + "..."
+
+
+def format_analysis(report: Dict[str, Any], top: int = 10) -> str:
+    total_size = sum(key["size"] for key in report["keys"]) or 1
+    lines = [f"{len(report['options'])} options in {len(report['keys'])} keys, {total_size} compiled code words", ""]
+    lines.append("Keys by compiled size:")
+    for key in report["keys"][:top]:
+        cost = f"{key['cost_us']:>8.1f} us/name" if report["names"] else ""
+        lines.append(f"  {key['key']:<16}{key['options']:>5} options{key['size']:>8}  ({key['size'] / total_size:>5.1%}){cost}")
+
+    lines += ["", f"Duplicated options: {len(report['duplicate_options'])}"]
+    for finding in report["duplicate_options"]:
+        lines.append(f"  {finding['key']} option {finding['option']} is the same as option {finding['same_as']}: {_short(finding['regex'])}")
+    lines += ["", f"Shadowed alternatives (everything they match is matched earlier): {len(report['shadowed'])}"]
+    for finding in report["shadowed"]:
+        lines.append(f"  {finding['key']} option {finding['option']}: {_short(finding['alternative'], 40)!r} by {finding['by']}")
+    lines += ["", f"Partly overlapping alternatives: {len(report['overlapping'])}"]
+    for finding in report["overlapping"][:top]:
+        lines.append(
+            f"  {finding['key']} option {finding['option']} {_short(finding['alternative'], 30)!r} and option "
+            f"{finding['other_option']} {_short(finding['other_alternative'], 30)!r} both match {', '.join(finding['shared'][:4])}"
+        )
+    if len(report["overlapping"]) > top:
+        lines.append(f"  ... and {len(report['overlapping']) - top} more")
+    lines += ["", f"Values given by several entries: {len(report['duplicate_values'])}"]
+    for finding in report["duplicate_values"]:
+        lines.append(f"  {finding['key']}: {finding['value']!r} by entries {finding['options']}")
+    lines += ["", "Cross products (options sharing a long suffix):"]
+    for product in report["cross_products"]:
+        lines.append(f"  {product['key']}: {product['options']} options share a {product['suffix_length']}-char suffix ({product['repeated_chars']} repeated chars)")
+
+    for label, field in (("compiled size", "size"), ("nested quantifiers", "risk"), ("cost (us/name)", "cost_us")):
+        if field == "cost_us" and not report["names"]:
+            continue
+        lines += ["", f"Options by {label}:"]
+        for option in sorted(report["options"], key=lambda o: o[field] or 0, reverse=True)[:top]:
+            value = f"{option[field]:.1f}" if isinstance(option[field], float) else str(option[field])
+            lines.append(f"  {option['key']:<14}{option['option']:>4}{value:>9}  {_short(option['regex'])}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report redundant, shadowed and expensive pattern options.")
+    parser.add_argument("--corpus", default=CORPUS_PATH, help="names to measure option costs on (default: the test inputs)")
+    parser.add_argument("--no-timing", action="store_true", help="skip measuring option costs")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--json", dest="json_path", help="also write the full report as JSON here")
+    args = parser.parse_args()
+
+    names = [] if args.no_timing else load_corpus(args.corpus)
+    report = analyse(names, args.repeat)
+    print(format_analysis(report, args.top))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as json_file:
+            json.dump(report, json_file, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
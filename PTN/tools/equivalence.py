@@ -0,0 +1,280 @@
+#!/usr/bin/env python
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import random
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ..parse import PTN
+from . import CORPUS_PATH, load_corpus
+
+# Differential testing: parse the same names with a reference parser and a candidate
+# configuration (other options, a plan, another backend, or another parser class) and report
+# every name whose results aren't byte-identical, with the fields that differ and a minimised
+# name that still shows the difference. Names come from the test corpus, a synthetic corpus
+# and random mutations of both, and are checked in parallel.
+#
+#   python -m PTN.tools.equivalence '{"plan": "plan.json"}' --synthetic 100000
+#   python -m pytest tests/test_equivalence.py --equivalence '{"backend": "regex"}'
+
+# The views compared, as (standardise, coherent_types).
+VIEWS = [(False, False), (True, False), (True, True)]
+
+SYNTHETIC_PARTS = {
+    "title": [
+        "The Show", "Movie Title", "Some Long Film Name", "Another Story", "Marvel's Agents of S.H.I.E.L.D",
+        "The Movie Part 2", "Dark", "Le Film Français", "Фильм", "Show (US)", "1917", "Blade Runner 2049",
+    ],
+    "year": ["1999", "2010", "2019", "(2021)", "[2005]"],
+    "episode": ["S01E01", "S02E10-E11", "s03e05", "1x02", "Season 1", "S01", "E05", "Complete Series", "2021.03.04"],
+    "resolution": ["720p", "1080p", "2160p", "4K", "480p", "1080i"],
+    "quality": ["WEB-DL", "WEBRip", "BluRay", "HDTV", "DVDRip", "BDRip", "HDRip", "CAM", "REMUX"],
+    "codec": ["x264", "x265", "H.264", "HEVC", "XviD", "AVC", "10bit"],
+    "audio": ["AAC", "DD5.1", "DDP5.1", "AC3", "DTS-HD MA 5.1", "Atmos", "TrueHD 7.1", "MP3", "Dual Audio"],
+    "extra": ["PROPER", "REPACK", "iNTERNAL", "EXTENDED", "UNRATED", "NF", "AMZN", "HDR", "MULTi", "ITA ENG", "ESub", "Hindi"],
+    "group": ["-GRP", "-RARBG", "-YIFY", "[ettv]", "-GalaxyTV", " [eztv]", "-NTb", ""],
+    "container": ["", "", ".mkv", ".mp4", ".avi"],
+}
+
+SEPARATORS = [".", " ", "_", "-"]
+
+
+def synthetic_names(count: int, seed: int = 0) -> Iterator[str]:
+    """
+    Names made of a title and a random selection of the usual parts, in the usual order.
+    """
+    rng = random.Random(seed)
+    for _ in range(count):
+        separator = rng.choice(SEPARATORS)
+        parts = [rng.choice(SYNTHETIC_PARTS["title"])]
+        for part in ("year", "episode", "resolution", "quality", "codec", "audio", "extra"):
+            if rng.random() < 0.6:
+                parts.append(rng.choice(SYNTHETIC_PARTS[part]))
+        rng.shuffle(parts[2:])
+        name = separator.join(parts).replace(" ", separator)
+        yield name + rng.choice(SYNTHETIC_PARTS["group"]) + rng.choice(SYNTHETIC_PARTS["container"])
+
+
+def mutate(name: str, rng: random.Random) -> str:
+    """
+    Apply one random edit to a name: change separators, case, drop, duplicate or swap a token,
+    or insert brackets, punctuation or non-ASCII characters.
+    """
+    tokens = re.split(r"([ ._\-\[\]()]+)", name)
+    words = [i for i, token in enumerate(tokens) if token and i % 2 == 0]
+    edit = rng.randrange(8)
+    if edit == 0:
+        return re.sub(r"[ ._]", rng.choice(SEPARATORS), name)
+    if edit == 1:
+        return name.upper() if rng.random() < 0.5 else name.lower()
+    if not words:
+        return name + rng.choice(["é", " 1080p", "[x]"])
+    i = rng.choice(words)
+    if edit == 2:
+        tokens[i] = ""
+    elif edit == 3:
+        tokens[i] = tokens[i] + "." + tokens[i]
+    elif edit == 4:
+        j = rng.choice(words)
+        tokens[i], tokens[j] = tokens[j], tokens[i]
+    elif edit == 5:
+        tokens[i] = rng.choice(["[", "(", "{"]) + tokens[i] + rng.choice(["]", ")", "}"])
+    elif edit == 6:
+        tokens[i] = tokens[i] + rng.choice(["!", "'", ",", "+", "&", "~"])
+    else:
+        position = rng.randrange(len(tokens[i]) + 1)
+        tokens[i] = tokens[i][:position] + rng.choice(["é", "ü", "ø", "д", "の", "​"]) + tokens[i][position:]
+    return "".join(tokens)
+
+
+def mutated_names(names: List[str], count: int, seed: int = 0) -> Iterator[str]:
+    """
+    `count` mutations of each name, each with one to three edits.
+    """
+    rng = random.Random(seed)
+    for name in names:
+        for _ in range(count):
+            mutated = name
+            for _ in range(rng.randint(1, 3)):
+                mutated = mutate(mutated, rng)
+            yield mutated
+
+
+def make_parser(config: Dict[str, Any]) -> PTN:
+    """
+    Build a parser from a configuration: keyword arguments for the parser class, which is PTN
+    unless a "class" is given as "module:Name".
+    """
+    config = dict(config)
+    parser_class = PTN
+    if "class" in config:
+        module_name, class_name = config.pop("class").split(":")
+        parser_class = getattr(importlib.import_module(module_name), class_name)
+    return parser_class(**config)
+
+
+def differences(reference: PTN, candidate: PTN, name: str) -> List[Tuple[bool, bool, List[str]]]:
+    """
+    For each view whose results differ: (standardise, coherent_types, the differing fields).
+    A field list of ["<order>"] means only the order of the fields differs.
+    """
+    found = []
+    for standardise, coherent_types in VIEWS:
+        try:
+            expected = json.dumps(reference.parse(name, standardise, coherent_types), ensure_ascii=False)
+        except Exception as e:
+            expected = f"<error {e!r}>"
+        try:
+            actual = json.dumps(candidate.parse(name, standardise, coherent_types), ensure_ascii=False)
+        except Exception as e:
+            actual = f"<error {e!r}>"
+        if expected == actual:
+            continue
+        if expected.startswith("<error") or actual.startswith("<error"):
+            fields = ["<error>"]
+        else:
+            expected_result, actual_result = json.loads(expected), json.loads(actual)
+            fields = sorted(
+                field for field in set(expected_result) | set(actual_result)
+                if expected_result.get(field, "<missing>") != actual_result.get(field, "<missing>")
+            ) or ["<order>"]
+        found.append((standardise, coherent_types, fields))
+    return found
+
+
+def minimise(reference: PTN, candidate: PTN, name: str) -> str:
+    """
+    Shrink a name while its results still differ: drop tokens, then single characters.
+    """
+    def differs(text: str) -> bool:
+        return bool(text.strip()) and bool(differences(reference, candidate, text))
+
+    tokens = re.split(r"([ ._\-\[\]()]+)", name)
+    i = 0
+    while i < len(tokens):
+        shorter = tokens[:i] + tokens[i + 1:]
+        if differs("".join(shorter)):
+            tokens = shorter
+        else:
+            i += 1
+    name = "".join(tokens)
+    i = 0
+    while i < len(name) and len(name) <= 200:
+        shorter = name[:i] + name[i + 1:]
+        if differs(shorter):
+            name = shorter
+        else:
+            i += 1
+    return name
+
+
+_reference = None
+_candidate = None
+
+
+def _init_worker(reference_config: Dict[str, Any], candidate_config: Dict[str, Any]) -> None:
+    global _reference, _candidate
+    _reference, _candidate = make_parser(reference_config), make_parser(candidate_config)
+
+
+def _check(chunk: Tuple[List[str], int]) -> List[Dict[str, Any]]:
+    names, minimise_limit = chunk
+    mismatches = []
+    for name in names:
+        found = differences(_reference, _candidate, name)
+        if not found:
+            continue
+        standardise, coherent_types, fields = found[0]
+        mismatches.append({
+            "name": name,
+            "fields": sorted({field for _, _, view_fields in found for field in view_fields}),
+            "views": [{"standardise": s, "coherent_types": c, "fields": f} for s, c, f in found],
+            "minimised": minimise(_reference, _candidate, name) if len(mismatches) < minimise_limit else None,
+            "reference": _safe_parse(_reference, name, standardise, coherent_types),
+            "candidate": _safe_parse(_candidate, name, standardise, coherent_types),
+        })
+    return mismatches
+
+
+def _safe_parse(parser: PTN, name: str, standardise: bool, coherent_types: bool) -> Any:
+    try:
+        return parser.parse(name, standardise, coherent_types)
+    except Exception as e:
+        return f"<error {e!r}>"
+
+
+def compare(
+    candidate_config: Dict[str, Any],
+    names: List[str],
+    reference_config: Optional[Dict[str, Any]] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = 500,
+    minimise_limit: int = 20,
+) -> List[Dict[str, Any]]:
+    """
+    Parse every name with both configurations and return the mismatches, in input order. The
+    first `minimise_limit` mismatches of each chunk get a minimised name.
+    """
+    reference_config = reference_config or {}
+    chunks = [(names[i:i + chunk_size], minimise_limit) for i in range(0, len(names), chunk_size)]
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+    if workers <= 1:
+        _init_worker(reference_config, candidate_config)
+        results = map(_check, chunks)
+        return [mismatch for chunk in results for mismatch in chunk]
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(reference_config, candidate_config)) as pool:
+        return [mismatch for chunk in pool.imap(_check, chunks) for mismatch in chunk]
+
+
+def build_names(synthetic: int = 10000, mutations: int = 2, seed: int = 0, corpus: str = CORPUS_PATH) -> List[str]:
+    """
+    The corpus, `synthetic` generated names, and `mutations` mutations of each of those.
+    """
+    names = load_corpus(corpus) + list(synthetic_names(synthetic, seed))
+    return names + list(mutated_names(names, mutations, seed))
+
+
+def format_mismatches(mismatches: List[Dict[str, Any]], total: int, examples: int = 10) -> str:
+    lines = [f"{len(mismatches)} of {total} names differ"]
+    by_field = {}
+    for mismatch in mismatches:
+        for field in mismatch["fields"]:
+            by_field[field] = by_field.get(field, 0) + 1
+    for field, count in sorted(by_field.items(), key=lambda item: item[1], reverse=True):
+        lines.append(f"  {field}: {count}")
+    for mismatch in mismatches[:examples]:
+        lines.append(f"\n{mismatch['name']!r}")
+        if mismatch["minimised"] is not None:
+            lines.append(f"  minimised: {mismatch['minimised']!r}")
+        for field in mismatch["fields"]:
+            if isinstance(mismatch["reference"], dict) and isinstance(mismatch["candidate"], dict):
+                lines.append(f"  {field}: {mismatch['reference'].get(field)!r} -> {mismatch['candidate'].get(field)!r}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that a parser configuration gives byte-identical results to the reference.")
+    parser.add_argument("candidate", help='JSON parser configuration, e.g. \'{"plan": "plan.json"}\' or \'{"class": "module:Parser"}\'')
+    parser.add_argument("--reference", default="{}", help="JSON configuration of the reference parser (default: PTN())")
+    parser.add_argument("--corpus", default=CORPUS_PATH)
+    parser.add_argument("--synthetic", type=int, default=10000, help="generated names to add to the corpus")
+    parser.add_argument("--mutations", type=int, default=2, help="mutations of each name to add")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--json", dest="json_path", help="also write the mismatches as JSON here")
+    args = parser.parse_args()
+
+    names = build_names(args.synthetic, args.mutations, args.seed, args.corpus)
+    mismatches = compare(json.loads(args.candidate), names, json.loads(args.reference), args.workers)
+    print(format_mismatches(mismatches, len(names)))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as json_file:
+            json.dump(mismatches, json_file, indent=2, ensure_ascii=False)
+    raise SystemExit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
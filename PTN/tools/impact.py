@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+import argparse
+import importlib
+import json
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import CORPUS_PATH, load_corpus, load_package, time_names
+
+# Compare two versions of PTN's patterns (e.g. two checkouts) over a corpus: the throughput of
+# each version as a whole, how long each key and option of the pattern table takes on its own,
+# and which fields of the output changed.
+#
+#   python -m PTN.tools.impact path/to/old-checkout path/to/new-checkout [--corpus names.txt]
+
+# Used for versions that predate `patterns_no_word_boundary`.
+DEFAULT_NO_WORD_BOUNDARY = ["seasons", "episodes", "site", "languages", "genres"]
+
+
+class Version:
+    """
+    One loaded version of PTN, with its pattern table.
+    """
+
+    def __init__(self, path: str, alias: str):
+        self.path = path
+        self.package = load_package(path, alias)
+        self.patterns_module = importlib.import_module(f"{alias}.patterns")
+        self.parser_class = importlib.import_module(f"{alias}.parse").PTN
+
+    def options(self) -> Dict[str, List[str]]:
+        """
+        The regex of each option, per key in matching order, as the parser compiles them.
+        """
+        patterns_module = self.patterns_module
+        no_word_boundary = getattr(patterns_module, "patterns_no_word_boundary", DEFAULT_NO_WORD_BOUNDARY)
+        options = {}
+        for key in patterns_module.patterns_ordered:
+            normalised = self.parser_class.normalise_pattern_options(patterns_module.patterns[key])
+            options[key] = [
+                option[0] if key in no_word_boundary else rf"\b(?:{option[0]})\b" for option in normalised
+            ]
+        return options
+
+    def parse(self, name: str, standardise: bool) -> Dict[str, Any]:
+        return self.package.parse(name, standardise=standardise)
+
+
+def time_options(versions: List[Version], names: List[str], repeat: int = 3) -> List[Dict[Tuple[str, str], float]]:
+    """
+    Time each option of each version on its own over the corpus, keyed by (key, regex). Runs
+    are interleaved across versions so drift in machine load affects them equally.
+    """
+    clean_names = [name.strip().replace("_", " ") for name in names]
+    compiled = [
+        {(key, option): re.compile(option, re.IGNORECASE) for key, options in version.options().items() for option in options}
+        for version in versions
+    ]
+    timings = [{option: float("inf") for option in version_compiled} for version_compiled in compiled]
+    for _ in range(repeat):
+        for version_compiled, version_timings in zip(compiled, timings):
+            for option, pattern in version_compiled.items():
+                start = time.perf_counter()
+                for clean_name in clean_names:
+                    for _ in pattern.finditer(clean_name):
+                        pass
+                version_timings[option] = min(version_timings[option], time.perf_counter() - start)
+    return timings
+
+
+def diff_outputs(old: Version, new: Version, names: List[str], standardise: bool = True) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Every field that differs between the two versions' results, with the names it differs for.
+    """
+    changes = {}
+    for name in names:
+        old_result, new_result = old.parse(name, standardise), new.parse(name, standardise)
+        for field in sorted(set(old_result) | set(new_result)):
+            if old_result.get(field) != new_result.get(field):
+                changes.setdefault(field, []).append(
+                    {"name": name, "old": old_result.get(field), "new": new_result.get(field)}
+                )
+    return changes
+
+
+def impact_report(old_path: str, new_path: str, names: List[str], repeat: int = 3, standardise: bool = True) -> Dict[str, Any]:
+    """
+    Build the full report comparing the patterns at `old_path` with those at `new_path`.
+    """
+    old, new = Version(old_path, "_ptn_impact_old"), Version(new_path, "_ptn_impact_new")
+
+    throughput = {}
+    for label, version in (("old", old), ("new", new)):
+        elapsed = time_names(lambda name: version.parse(name, standardise), names, repeat)
+        throughput[label] = len(names) / elapsed
+
+    old_options, new_options = time_options([old, new], names, repeat)
+    options = []
+    for key, option in sorted(set(old_options) | set(new_options)):
+        old_time, new_time = old_options.get((key, option)), new_options.get((key, option))
+        options.append({"key": key, "option": option, "old": old_time, "new": new_time})
+
+    keys = {}
+    for option in options:
+        key = keys.setdefault(option["key"], {"key": option["key"], "old": 0.0, "new": 0.0})
+        key["old"] += option["old"] or 0.0
+        key["new"] += option["new"] or 0.0
+
+    return {
+        "old": old_path,
+        "new": new_path,
+        "names": len(names),
+        "throughput": throughput,
+        "keys": sorted(keys.values(), key=lambda k: abs(k["new"] - k["old"]), reverse=True),
+        "options": sorted(options, key=lambda o: abs((o["new"] or 0.0) - (o["old"] or 0.0)), reverse=True),
+        "output_changes": diff_outputs(old, new, names, standardise),
+    }
+
+
+def _ms(seconds: Optional[float]) -> str:
+    return "-" if seconds is None else f"{seconds * 1e3:.2f}"
+
+
+def _delta(old: Optional[float], new: Optional[float]) -> str:
+    if old is None:
+        return "added"
+    if new is None:
+        return "removed"
+    return f"{(new - old) * 1e3:+.2f}"
+
+
+def format_report(report: Dict[str, Any], top: int = 15, examples: int = 3) -> str:
+    """
+    Format a report from `impact_report` as text.
+    """
+    old_rate, new_rate = report["throughput"]["old"], report["throughput"]["new"]
+    lines = [
+        f"Corpus: {report['names']} names",
+        f"Throughput: {old_rate:.0f} -> {new_rate:.0f} names/sec ({new_rate / old_rate - 1:+.1%})",
+        "",
+        f"Keys by time change (ms per corpus pass, top {top}):",
+        f"  {'key':<20}{'old':>10}{'new':>10}{'delta':>10}",
+    ]
+    for key in report["keys"][:top]:
+        lines.append(f"  {key['key']:<20}{_ms(key['old']):>10}{_ms(key['new']):>10}{_delta(key['old'], key['new']):>10}")
+
+    lines += ["", f"Options by time change (top {top}):"]
+    for option in report["options"][:top]:
+        regex = option["option"] if len(option["option"]) <= 60 else option["option"][:57] + "..."
+        lines.append(f"  {option['key']:<16}{_ms(option['old']):>8}{_ms(option['new']):>8}{_delta(option['old'], option['new']):>9}  {regex}")
+
+    changes = report["output_changes"]
+    lines += ["", f"Output changes: {sum(len(c) for c in changes.values())} field changes in {len({c['name'] for cs in changes.values() for c in cs})} names"]
+    for field, field_changes in sorted(changes.items(), key=lambda c: len(c[1]), reverse=True):
+        lines.append(f"  {field}: {len(field_changes)}")
+        for change in field_changes[:examples]:
+            lines.append(f"    {change['name']}\n      {change['old']!r} -> {change['new']!r}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report the performance and output impact of a pattern change.")
+    parser.add_argument("old", help="checkout (or PTN package directory) with the old patterns")
+    parser.add_argument("new", help="checkout (or PTN package directory) with the new patterns")
+    parser.add_argument("--corpus", default=CORPUS_PATH, help="JSON list or text file of names (default: the test inputs)")
+    parser.add_argument("--repeat", type=int, default=5, help="timings are the best of this many runs")
+    parser.add_argument("--raw", dest="standardise", action="store_false", help="compare raw instead of standardised output")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", dest="json_path", help="also write the full report as JSON here")
+    args = parser.parse_args()
+
+    report = impact_report(args.old, args.new, load_corpus(args.corpus), args.repeat, args.standardise)
+    print(format_report(report, top=args.top))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as json_file:
+            json.dump(report, json_file, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
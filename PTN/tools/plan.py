@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+import argparse
+import json
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..parse import PTN
+from . import CORPUS_PATH, load_corpus, time_names
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants
+    import sre_parse
+
+# Build a parse plan from a corpus: replay it through an instrumented parser to record how often
+# each option of each key matches and wins, and what it costs, then attach guards to options.
+# A guard is a set of literals, one of which every match of the option must contain, proven
+# from the option's regex. The parser skips an option when none of its guard's literals are in
+# the (ASCII) name, which is always safe, so the plan only keeps guards that skip often enough
+# to pay for themselves. The plan is only written if parsing the corpus with it gives exactly
+# the same results.
+#
+# Options aren't reordered: every option of a key is evaluated even after one has won, as its
+# matches still mark text as matched (for the title and excess), so their order doesn't change
+# the cost, and two options can only be swapped safely if no name could match both.
+# Options that never matched on the corpus are marked as dead, but still evaluated.
+#
+#   python -m PTN.tools.plan --corpus names.txt --output plan.json
+#   PTN(plan="plan.json")
+
+# Zero-width nodes, which don't break up a run of literals.
+ZERO_WIDTH = {sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT}
+REPEATS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT, getattr(sre_constants, "POSSESSIVE_REPEAT", None)}
+
+
+def required_literals(pattern: str, flags: int = re.IGNORECASE) -> Optional[List[str]]:
+    """
+    Lowercase strings of which at least one is in every string `pattern` matches, or None if
+    there's no such set (or it involves non-ASCII characters, whose case folding `re` treats
+    specially).
+    """
+    literals = _required(list(sre_parse.parse(pattern, flags)))
+    if not literals:
+        return None
+    literals = sorted({literal.lower() for literal in literals})
+    if not all(literal.isascii() for literal in literals):
+        return None
+    return literals
+
+
+def _required(sequence: List[Tuple[Any, Any]]) -> Optional[List[str]]:
+    """
+    The most selective requirement of any element of a sequence: runs of literals, or the
+    requirement of a group, alternation or repeat.
+    """
+    best, best_score = None, None
+
+    def consider(literals: Optional[List[str]]) -> None:
+        nonlocal best, best_score
+        if literals:
+            # Longer literals are rarer, and fewer alternatives make a cheaper guard.
+            score = (min(len(literal) for literal in literals), -len(literals))
+            if best_score is None or score > best_score:
+                best, best_score = literals, score
+
+    run = ""
+    for op, av in sequence:
+        if op is sre_constants.LITERAL:
+            run += chr(av)
+            continue
+        if op in ZERO_WIDTH:
+            continue
+        consider([run] if run else None)
+        run = ""
+        consider(_required_node(op, av))
+    consider([run] if run else None)
+    return best
+
+
+def _required_node(op: Any, av: Any) -> Optional[List[str]]:
+    if op is sre_constants.SUBPATTERN:
+        return _required(list(av[-1]))
+    if op is sre_constants.BRANCH:
+        literals = []
+        for branch in av[1]:
+            branch_literals = _required(list(branch))
+            if not branch_literals:
+                return None
+            literals += branch_literals
+        return list(dict.fromkeys(literals))
+    if op in REPEATS:
+        minimum, _, item = av
+        return _required(list(item)) if minimum >= 1 else None
+    if op is sre_constants.IN:
+        characters = []
+        for item_op, item_av in av:
+            if item_op is sre_constants.LITERAL:
+                characters.append(chr(item_av))
+            elif item_op is sre_constants.RANGE and item_av[1] - item_av[0] < 10:
+                characters += [chr(c) for c in range(item_av[0], item_av[1] + 1)]
+            else:
+                return None
+        return characters if len(characters) <= 10 else None
+    return None
+
+
+class InstrumentedPTN(PTN):
+    """
+    A parser that applies the options of each key one at a time, recording how often each one
+    matched and won, and how long it took.
+    """
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.stats = {
+            key: [{"hits": 0, "wins": 0, "seconds": 0.0} for _ in options]
+            for key, options in self.compiled_patterns.items()
+        }
+
+    def _apply_patterns(self, key: str, pattern_options: List[Tuple[Any, Optional[str], Any]]) -> None:
+        # Applying options one by one is the same as applying them together, as each option
+        # only depends on the parts found before it.
+        for option, stats in zip(pattern_options, self.stats[key]):
+            had_part, slices = key in self.parts, len(self.match_slices)
+            start = time.perf_counter()
+            super()._apply_patterns(key, [option])
+            stats["seconds"] += time.perf_counter() - start
+            stats["hits"] += len(self.match_slices) > slices
+            stats["wins"] += not had_part and key in self.parts
+
+
+def build_plan(names: List[str], min_skip: float = 0.05, **parser_options: Any) -> Dict[str, Any]:
+    """
+    Replay `names` and build a plan, with guards on the options whose guard would skip them
+    for at least `min_skip` of the (ASCII) names.
+    """
+    instrumented = InstrumentedPTN(**parser_options)
+    for name in names:
+        instrumented.parse(name)
+
+    clean_names = [name.strip().replace("_", " ").lower() for name in names]
+    clean_names = [clean_name for clean_name in clean_names if clean_name.isascii()]
+    plan = {"names": len(names), "options": {}}
+    for key in instrumented.patterns_ordered:
+        options = []
+        for (pattern, _, _), stats in zip(instrumented.compiled_patterns[key], instrumented.stats[key]):
+            guard = required_literals(pattern.pattern, pattern.flags)
+            skip_rate = None
+            if guard is not None and clean_names:
+                skip_rate = sum(1 for clean_name in clean_names if not any(literal in clean_name for literal in guard)) / len(clean_names)
+            options.append({
+                "pattern": pattern.pattern,
+                "hits": stats["hits"],
+                "wins": stats["wins"],
+                "cost_us": stats["seconds"] / max(len(names), 1) * 1e6,
+                "dead": stats["hits"] == 0,
+                "skip_rate": skip_rate,
+                "guard": guard if skip_rate is not None and skip_rate >= min_skip else None,
+            })
+        plan["options"][key] = options
+    return plan
+
+
+def verify_plan(plan: Dict[str, Any], names: List[str], **parser_options: Any) -> List[str]:
+    """
+    The names whose raw or standardised results change when parsing with the plan.
+    """
+    plain, planned = PTN(**parser_options), PTN(plan=plan, **parser_options)
+    return [
+        name for name in names
+        if any(plain.parse(name, standardise) != planned.parse(name, standardise) for standardise in (False, True))
+    ]
+
+
+def format_plan(plan: Dict[str, Any], top: int = 15) -> str:
+    """
+    Summarise a plan as text: the costliest options, guards and dead options.
+    """
+    options = [(key, option) for key, key_options in plan["options"].items() for option in key_options]
+    guarded = [option for _, option in options if option["guard"]]
+    dead = [(key, option) for key, option in options if option["dead"]]
+    lines = [
+        f"Corpus: {plan['names']} names, {len(options)} options",
+        f"Guarded: {len(guarded)} options, skipped for {sum(o['skip_rate'] for o in guarded) / max(len(guarded), 1):.1%} of names on average",
+        f"Dead (never matched): {len(dead)} options",
+        "",
+        f"Costliest options (us per name, top {top}):",
+    ]
+    for key, option in sorted(options, key=lambda o: o[1]["cost_us"], reverse=True)[:top]:
+        guard = ",".join(option["guard"]) if option["guard"] else "-"
+        regex = option["pattern"] if len(option["pattern"]) <= 50 else option["pattern"][:47] + "..."
+        lines.append(f"  {key:<14}{option['cost_us']:>7.1f}{option['hits']:>7}{option['wins']:>7}  {guard[:20]:<20}  {regex}")
+    if dead:
+        lines += ["", "Dead options:"]
+        lines += [f"  {key:<14}{option['pattern'][:70]}" for key, option in dead[:top]]
+        if len(dead) > top:
+            lines.append(f"  ... and {len(dead) - top} more")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a parse plan that lets the parser skip options that can't match.")
+    parser.add_argument("--corpus", default=CORPUS_PATH, help="JSON list or text file of names (default: the test inputs)")
+    parser.add_argument("--output", default="plan.json")
+    parser.add_argument("--min-skip", type=float, default=0.05, help="only guard options skipped for at least this share of names")
+    parser.add_argument("--profile", default="full")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    names = load_corpus(args.corpus)
+    plan = build_plan(names, args.min_skip, profile=args.profile)
+    print(format_plan(plan, args.top))
+
+    changed = verify_plan(plan, names, profile=args.profile)
+    if changed:
+        print(f"\nNot writing the plan: it changes the results of {len(changed)} names, e.g. {changed[0]!r}")
+        raise SystemExit(1)
+    plain, planned = PTN(profile=args.profile), PTN(plan=plan, profile=args.profile)
+    plain_time = time_names(lambda name: plain.parse(name, standardise=True), names)
+    planned_time = time_names(lambda name: planned.parse(name, standardise=True), names)
+    print(f"\nIdentical results on the corpus, {plain_time / planned_time:.2f}x faster with the plan")
+    with open(args.output, "w", encoding="utf-8") as plan_file:
+        json.dump(plan, plan_file, indent=1)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,443 @@
+#!/usr/bin/env python
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import random
+import re
+import shutil
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..shards import DEFAULT_SHARD_SIZE, read_shard, shard_ranges
+from .impact import DEFAULT_NO_WORD_BOUNDARY, Version
+from .plan import required_literals
+
+# Re-parse only the names of a stored corpus whose results a pattern change can affect. The
+# pattern tables of two versions (e.g. two checkouts) are diffed by key and option, and a name
+# is a candidate if any option that was added, removed or changed, or that belongs to a key
+# whose settings or place in the order changed, matches it in either version. An option that
+# matches nowhere in a name leaves its parse as it was, so only the candidates are re-parsed
+# with the new version, in parallel, and the stored results are rewritten with a report of
+# what changed.
+#
+# The other tables the parser uses are diffed too. The values a key's matches are
+# standardised with (`extras.langs`, `extras.genres`) only affect the names its options
+# match. Those used on every name (the patterns cleaning titles, the known exceptions, the
+# patterns of the post-processing stages) can't be tied to the names they affect, and a
+# change to one makes every name a candidate.
+#
+# Candidates are found with the options' guards (see `plan.required_literals`) where they have
+# one, and their regex otherwise. Changes to the parser's code aren't seen: `--sample`
+# re-parses a share of the other names too, and the report counts those whose results
+# changed anyway.
+#
+#   python -m PTN.tools.reparse old-checkout new-checkout names.txt results.ndjson updated.ndjson
+
+# The tables of `extras` whose values the matches of keys are standardised with, and the keys.
+STANDARDISED_TABLES = {"extras.langs": ("languages", "subtitles"), "extras.genres": ("genres",)}
+# The tables used on every name: in `patterns`, those cleaning titles (see `PTN.clean_title`),
+# and in `extras`, those used on titles.
+TITLE_PATTERNS = (
+    "NON_ENGLISH_CHARS",
+    "RUSSIAN_CAST_REGEX",
+    "ALT_TITLES_REGEX",
+    "NOT_ONLY_NON_ENGLISH_REGEX",
+    "NOT_ALLOWED_SYMBOLS_AT_START_AND_END",
+    "REMAINING_NOT_ALLOWED_SYMBOLS_AT_START_AND_END",
+    "RELEASE_GROUP_REGEX_START",
+    "RELEASE_GROUP_REGEX_END",
+)
+TITLE_EXTRAS = ("exceptions", "complete_series")
+# The suffixes of the names of the patterns in `post`.
+POST_PATTERN_SUFFIXES = ("_regex", "_regexes", "_pattern", "_PREFIX")
+
+# Set in each worker process by _init_worker.
+_worker_version = None
+_worker_prefilter = None
+_worker_options = None
+
+
+def key_options(version: Version) -> Dict[str, List[Tuple[Any, ...]]]:
+    """
+    The options of each key of a version, as (regex, replacement, transforms) with the regex
+    as the parser compiles it.
+    """
+    patterns_module = version.patterns_module
+    no_word_boundary = getattr(patterns_module, "patterns_no_word_boundary", DEFAULT_NO_WORD_BOUNDARY)
+    options = {}
+    for key in patterns_module.patterns_ordered:
+        options[key] = [
+            (option[0] if key in no_word_boundary else rf"\b(?:{option[0]})\b",) + tuple(option[1:])
+            for option in version.parser_class.normalise_pattern_options(patterns_module.patterns[key])
+        ]
+    return options
+
+
+def key_settings(version: Version, key: str) -> Tuple[Any, ...]:
+    """
+    What else the parser does with a key's matches: whether they may overlap others, their
+    type, and what they're ignored before.
+    """
+    patterns_module = version.patterns_module
+    try:
+        ignore_title = importlib.import_module(f"{version.package.__name__}.extras").patterns_ignore_title
+    except (ImportError, AttributeError):
+        ignore_title = {}
+    return (
+        key in getattr(patterns_module, "patterns_allow_overlap", ()),
+        getattr(patterns_module, "types", {}).get(key),
+        ignore_title.get(key),
+    )
+
+
+def table_values(version: Version) -> Dict[str, Any]:
+    """
+    The tables of a version the parser uses besides the options of its keys, by name
+    ("module.name"), with None for those it doesn't have.
+    """
+    patterns = version.patterns_module.patterns
+    tables = {f"patterns.{name}": patterns.get(name) for name in TITLE_PATTERNS}
+    extras = _module(version, "extras")
+    for name in [table.split(".")[1] for table in STANDARDISED_TABLES] + list(TITLE_EXTRAS):
+        tables[f"extras.{name}"] = getattr(extras, name, None)
+    post = _module(version, "post")
+    for name, value in vars(post).items() if post else ():
+        if name.endswith(POST_PATTERN_SUFFIXES) and not callable(value):
+            tables[f"post.{name}"] = value
+    if hasattr(post, "literal_regexes"):
+        tables["post.literal_regexes"] = post.literal_regexes(patterns)
+    return tables
+
+
+def _module(version: Version, name: str) -> Any:
+    """
+    A module of a version's package, or None if it has none of that name.
+    """
+    try:
+        return importlib.import_module(f"{version.package.__name__}.{name}")
+    except ImportError:
+        return None
+
+
+def diff_patterns(old: Version, new: Version) -> List[Dict[str, Any]]:
+    """
+    The changes between the pattern tables of two versions, as {"key", "change", "option"}
+    with a change of "added", "removed", "settings" or "moved" (the option is None for the
+    last two, which concern all the key's options), or of "table" for the other tables
+    (see `table_values`), whose "key" is the table's name.
+    """
+    old_options, new_options = key_options(old), key_options(new)
+    changes = []
+    for key in list(old_options) + [key for key in new_options if key not in old_options]:
+        before, after = old_options.get(key, []), new_options.get(key, [])
+        changes += [{"key": key, "change": "removed", "option": option[0]} for option in before if option not in after]
+        changes += [{"key": key, "change": "added", "option": option[0]} for option in after if option not in before]
+        if key in old_options and key in new_options and key_settings(old, key) != key_settings(new, key):
+            changes.append({"key": key, "change": "settings", "option": None})
+
+    # The keys that stayed in the same order are the longest common subsequence of the two
+    # orders: in a name that none of the others match, the keys that match it still match in
+    # the same order.
+    old_order = [key for key in old_options if key in new_options]
+    new_order = [key for key in new_options if key in old_options]
+    stayed = _common_subsequence(old_order, new_order)
+    changes += [{"key": key, "change": "moved", "option": None} for key in old_order if key not in stayed]
+
+    old_tables, new_tables = table_values(old), table_values(new)
+    for name in list(old_tables) + [name for name in new_tables if name not in old_tables]:
+        if old_tables.get(name) != new_tables.get(name):
+            changes.append({"key": name, "change": "table", "option": None})
+    return changes
+
+
+def _common_subsequence(first: List[str], second: List[str]) -> set:
+    lengths = [[0] * (len(second) + 1) for _ in range(len(first) + 1)]
+    for i in range(len(first) - 1, -1, -1):
+        for j in range(len(second) - 1, -1, -1):
+            lengths[i][j] = lengths[i + 1][j + 1] + 1 if first[i] == second[j] else max(lengths[i + 1][j], lengths[i][j + 1])
+    common, i, j = set(), 0, 0
+    while i < len(first) and j < len(second):
+        if first[i] == second[j]:
+            common.add(first[i])
+            i, j = i + 1, j + 1
+        elif lengths[i + 1][j] >= lengths[i][j + 1]:
+            i += 1
+        else:
+            j += 1
+    return common
+
+
+def changed_regexes(changes: List[Dict[str, Any]], old: Version, new: Version) -> List[str]:
+    """
+    The regexes of the options that can match the names a set of changes affects.
+    """
+    old_options, new_options = key_options(old), key_options(new)
+    regexes = []
+    for change in changes:
+        if change["option"] is not None:
+            regexes.append(change["option"])
+        else:
+            keys = STANDARDISED_TABLES.get(change["key"], ()) if change["change"] == "table" else (change["key"],)
+            regexes += [option[0] for key in keys for option in old_options.get(key, []) + new_options.get(key, [])]
+    return list(dict.fromkeys(regexes))
+
+
+def affects_all(changes: List[Dict[str, Any]]) -> bool:
+    """
+    Whether a set of changes can affect any name: it changes a table used on every name.
+    """
+    return any(change["change"] == "table" and change["key"] not in STANDARDISED_TABLES for change in changes)
+
+
+class Prefilter:
+    """
+    Tells whether any of a set of option regexes can match a name. Regexes with a guard are
+    checked with one search for the guards' literals in the (ASCII) name, and the others one
+    by one.
+    """
+
+    def __init__(self, regexes: Iterable[str]):
+        regexes = list(regexes)
+        self.regexes = [re.compile(regex, re.IGNORECASE) for regex in regexes]
+        self.unguarded = []
+        literals = set()
+        for regex, compiled in zip(regexes, self.regexes):
+            guard = required_literals(regex)
+            if guard is None:
+                self.unguarded.append(compiled)
+            else:
+                literals.update(guard)
+        self.literals = re.compile("|".join(map(re.escape, sorted(literals)))) if literals else None
+
+    def __bool__(self) -> bool:
+        return bool(self.regexes)
+
+    def may_match(self, name: str) -> bool:
+        clean_name = name.strip().replace("_", " ")
+        if not clean_name.isascii():
+            return any(regex.search(clean_name) for regex in self.regexes)
+        if self.literals is not None and self.literals.search(clean_name.lower()):
+            return True
+        return any(regex.search(clean_name) for regex in self.unguarded)
+
+
+def _init_worker(options: Dict[str, Any]) -> None:
+    global _worker_version, _worker_prefilter, _worker_options
+    _worker_version = Version(options["new"], "_ptn_reparse_worker")
+    _worker_prefilter = Prefilter(options["regexes"])
+    _worker_options = options
+
+
+def _reparse_shard(shard: Tuple[int, int, int]) -> Tuple[int, int, int, int]:
+    """
+    Re-parse the candidates (and sampled names) of one shard, writing them as NDJSON of
+    {"line", "sampled", "result"} to its file in the shard directory. Returns the shard's
+    index, and its number of names, candidates and sampled names.
+    """
+    index, start, end = shard
+    options = _worker_options
+    names = read_shard(options["names"], start, end)
+    rng = random.Random(f"{options['seed']}:{index}")
+    parser = _worker_version.parser_class()
+    candidates = sampled = 0
+    with open(_shard_path(options["shard_dir"], index), "w", encoding="utf-8") as shard_file:
+        for line, name in enumerate(names):
+            candidate = options["all"] or _worker_prefilter.may_match(name)
+            if not candidate and not (options["sample"] and rng.random() < options["sample"]):
+                continue
+            candidates += candidate
+            sampled += not candidate
+            result = parser.parse(name, options["standardise"], options["coherent_types"])
+            shard_file.write(json.dumps({"line": line, "sampled": not candidate, "result": result}, ensure_ascii=False))
+            shard_file.write("\n")
+    return index, len(names), candidates, sampled
+
+
+def _shard_path(shard_dir: str, index: int) -> str:
+    return os.path.join(shard_dir, f"{index:06d}.ndjson")
+
+
+def reparse(
+    old_path: str,
+    new_path: str,
+    names_path: str,
+    results_path: str,
+    output: str,
+    workers: Optional[int] = None,
+    standardise: bool = True,
+    coherent_types: bool = False,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    sample: float = 0.0,
+    seed: int = 0,
+    examples: int = 5,
+) -> Dict[str, Any]:
+    """
+    Write to `output` the results of `results_path` (one JSON result per line of `names_path`,
+    as `parse_file` writes them) with the names a change from the patterns at `old_path` to
+    those at `new_path` can affect re-parsed with the new patterns. Returns a report of the
+    changes to the patterns and to the results.
+
+    :param workers: Number of worker processes (default: the number of CPUs).
+    :param standardise: How the stored results were parsed.
+    :param sample: Share of the other names to re-parse too, to check that they didn't change.
+    :param examples: Names to keep as examples of each field that changed.
+    """
+    if not 0 <= sample <= 1:
+        raise ValueError("`sample` must be between 0 and 1")
+    start_time = time.perf_counter()
+    old, new = Version(old_path, "_ptn_reparse_old"), Version(new_path, "_ptn_reparse_new")
+    changes = diff_patterns(old, new)
+    options = {
+        "new": new_path,
+        "regexes": changed_regexes(changes, old, new),
+        "all": affects_all(changes),
+        "names": names_path,
+        "shard_dir": output + ".shards",
+        "standardise": standardise,
+        "coherent_types": coherent_types,
+        "sample": sample,
+        "seed": seed,
+    }
+    if os.path.isdir(options["shard_dir"]):
+        shutil.rmtree(options["shard_dir"])
+    os.makedirs(options["shard_dir"])
+
+    shards = [(index, start, end) for index, (start, end) in enumerate(shard_ranges(names_path, shard_size))]
+    workers = min(workers or os.cpu_count() or 1, max(len(shards), 1))
+    if workers == 1:
+        _init_worker(options)
+        counts = list(map(_reparse_shard, shards))
+    else:
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(options,)) as pool:
+            counts = pool.map(_reparse_shard, shards)
+
+    report = {
+        "old": old_path,
+        "new": new_path,
+        "pattern_changes": changes,
+        "names": sum(count[1] for count in counts),
+        "candidates": sum(count[2] for count in counts),
+        "sampled": sum(count[3] for count in counts),
+        "changed": 0,
+        "sampled_changed": 0,
+        "fields": {},
+        "examples": {},
+    }
+    try:
+        _merge(shards, counts, options, results_path, output, report, examples)
+    finally:
+        shutil.rmtree(options["shard_dir"])
+    report["seconds"] = time.perf_counter() - start_time
+    return report
+
+
+def _merge(
+    shards: List[Tuple[int, int, int]],
+    counts: List[Tuple[int, int, int, int]],
+    options: Dict[str, Any],
+    results_path: str,
+    output: str,
+    report: Dict[str, Any],
+    examples: int,
+) -> None:
+    """
+    Copy the stored results to the output a line at a time, replacing those that were
+    re-parsed and changed, and recording the changes in the report.
+    """
+    line_offset = 0
+    with open(results_path, encoding="utf-8") as results_file, open(output + ".tmp", "w", encoding="utf-8") as output_file:
+        for (index, start, end), (_, count, _, _) in zip(shards, counts):
+            names = None
+            with open(_shard_path(options["shard_dir"], index), encoding="utf-8") as shard_file:
+                reparsed = (json.loads(line) for line in shard_file)
+                next_reparsed = next(reparsed, None)
+                for line in range(count):
+                    stored = results_file.readline()
+                    if not stored:
+                        raise ValueError(f"{results_path} has fewer results than {options['names']} has names")
+                    if next_reparsed is None or next_reparsed["line"] != line:
+                        output_file.write(stored)
+                        continue
+                    old_result, new_result = json.loads(stored), next_reparsed["result"]
+                    if old_result == new_result:
+                        output_file.write(stored)
+                    else:
+                        output_file.write(json.dumps(new_result, ensure_ascii=False) + "\n")
+                        report["changed"] += 1
+                        report["sampled_changed"] += next_reparsed["sampled"]
+                        names = names or read_shard(options["names"], start, end)
+                        for field in sorted(set(old_result) | set(new_result)):
+                            if old_result.get(field) != new_result.get(field):
+                                report["fields"][field] = report["fields"].get(field, 0) + 1
+                                field_examples = report["examples"].setdefault(field, [])
+                                if len(field_examples) < examples:
+                                    field_examples.append({
+                                        "line": line_offset + line,
+                                        "name": names[line],
+                                        "old": old_result.get(field),
+                                        "new": new_result.get(field),
+                                    })
+                    next_reparsed = next(reparsed, None)
+            line_offset += count
+        if results_file.readline():
+            raise ValueError(f"{results_path} has more results than {options['names']} has names")
+    os.replace(output + ".tmp", output)
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """
+    Format a report from `reparse` as text.
+    """
+    changes = report["pattern_changes"]
+    lines = [f"Pattern changes: {len(changes)}"]
+    for change in changes:
+        option = change["option"] if change["option"] is None or len(change["option"]) <= 60 else change["option"][:57] + "..."
+        lines.append(f"  {change['key']:<16}{change['change']:<10}{option or ''}")
+    names = max(report["names"], 1)
+    lines += [
+        "",
+        f"Names: {report['names']}, re-parsed {report['candidates']} candidates ({report['candidates'] / names:.2%}) "
+        f"and {report['sampled']} sampled names in {report['seconds']:.1f}s",
+        f"Changed: {report['changed']} names",
+    ]
+    if report["sampled_changed"]:
+        lines.append(
+            f"  {report['sampled_changed']} of them sampled, not candidates: something besides the patterns changed, "
+            f"re-parse everything"
+        )
+    for field, count in sorted(report["fields"].items(), key=lambda item: item[1], reverse=True):
+        lines.append(f"  {field}: {count}")
+        for example in report["examples"][field]:
+            lines.append(f"    {example['name']}\n      {example['old']!r} -> {example['new']!r}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-parse the names of a stored corpus that a pattern change can affect.")
+    parser.add_argument("old", help="checkout (or PTN package directory) with the patterns the results were parsed with")
+    parser.add_argument("new", help="checkout (or PTN package directory) with the new patterns")
+    parser.add_argument("names", help="newline-delimited file of names")
+    parser.add_argument("results", help="NDJSON file of their results, as written by `python -m PTN.shards`")
+    parser.add_argument("output", help="where to write the updated results")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--raw", dest="standardise", action="store_false", help="the results aren't standardised")
+    parser.add_argument("--coherent-types", action="store_true")
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE, help="approximate shard size in bytes")
+    parser.add_argument("--sample", type=float, default=0.001, help="share of the other names to re-parse as a check")
+    parser.add_argument("--report", dest="report_path", help="also write the report as JSON here")
+    args = parser.parse_args()
+
+    report = reparse(
+        args.old, args.new, args.names, args.results, args.output, workers=args.workers, standardise=args.standardise,
+        coherent_types=args.coherent_types, shard_size=args.shard_size, sample=args.sample,
+    )
+    print(format_report(report))
+    if args.report_path:
+        with open(args.report_path, "w", encoding="utf-8") as report_file:
+            json.dump(report, report_file, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
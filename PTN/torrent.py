@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+import hashlib
+import mmap
+import os
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .parse import PTN
+
+# Read `.torrent` files (bencoded metainfo) and parse the torrent's name and every file in it.
+# Files are memory-mapped, and the (potentially large) `pieces` hashes are skipped over rather
+# than copied out.
+
+
+class BencodeError(ValueError):
+    pass
+
+
+# How deeply lists and dictionaries may be nested. Metainfo only nests a few levels, and
+# deeper data would exhaust the recursion limit.
+MAX_DEPTH = 512
+
+
+def decode_bencode(data: Union[bytes, mmap.mmap], skip_keys: Iterable[bytes] = (b"pieces",)) -> Tuple[Any, Dict[bytes, Tuple[int, int]]]:
+    """
+    Decode bencoded data. Byte strings stay as bytes, and values of dictionary keys in
+    `skip_keys` are left out. Also returns the (start, end) offsets of each top-level
+    dictionary value, e.g. to hash the raw `info` dictionary.
+    """
+    skip_keys = set(skip_keys)
+    spans = {}
+
+    def decode(i: int, depth: int) -> Tuple[Any, int]:
+        if i >= len(data):
+            raise BencodeError("Unexpected end of data")
+        if depth > MAX_DEPTH:
+            raise BencodeError(f"Data nested more than {MAX_DEPTH} levels deep at {i}")
+        c = data[i]
+        if c == 0x69:  # i<integer>e
+            end = data.find(b"e", i)
+            if end == -1:
+                raise BencodeError(f"Unterminated integer at {i}")
+            try:
+                return int(data[i + 1:end]), end + 1
+            except ValueError:
+                raise BencodeError(f"Invalid integer at {i}")
+        if c == 0x6C:  # l<values>e
+            values = []
+            i += 1
+            while i < len(data) and data[i] != 0x65:
+                value, i = decode(i, depth + 1)
+                values.append(value)
+            return values, i + 1
+        if c == 0x64:  # d<key><value>...e
+            values = {}
+            i += 1
+            while i < len(data) and data[i] != 0x65:
+                key, i = decode(i, depth + 1)
+                if not isinstance(key, bytes):
+                    raise BencodeError(f"Dictionary key must be a string at {i}")
+                start = i
+                if key in skip_keys:
+                    i = skip(i, depth + 1)
+                else:
+                    values[key], i = decode(i, depth + 1)
+                if depth == 0:
+                    spans[key] = (start, i)
+            return values, i + 1
+        if 0x30 <= c <= 0x39:  # <length>:<bytes>
+            start = string_start(i)
+            end = start + int(data[i:start - 1])
+            if end > len(data):
+                raise BencodeError(f"String at {i} runs past the end of data")
+            return data[start:end], end
+        raise BencodeError(f"Unexpected byte {c!r} at {i}")
+
+    def string_start(i: int) -> int:
+        colon = data.find(b":", i, i + 21)
+        if colon == -1 or not data[i:colon].isdigit():
+            raise BencodeError(f"Invalid string length at {i}")
+        return colon + 1
+
+    def skip(i: int, depth: int) -> int:
+        if i < len(data) and 0x30 <= data[i] <= 0x39:
+            start = string_start(i)
+            return start + int(data[i:start - 1])
+        return decode(i, depth)[1]
+
+    value, end = decode(0, 0)
+    if end > len(data):
+        raise BencodeError("Unexpected end of data")
+    return value, spans
+
+
+def encode_bencode(value: Any) -> bytes:
+    """
+    Bencode a value made of ints, strings (or bytes), lists and dicts.
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, str, bytes, list, dict)):
+        raise TypeError(f"Can't bencode {type(value).__name__}")
+    if isinstance(value, int):
+        return b"i%de" % value
+    if isinstance(value, str):
+        value = value.encode("utf-8")
+    if isinstance(value, bytes):
+        return b"%d:%s" % (len(value), value)
+    if isinstance(value, list):
+        return b"l" + b"".join(encode_bencode(v) for v in value) + b"e"
+    items = sorted((k.encode("utf-8") if isinstance(k, str) else k, v) for k, v in value.items())
+    return b"d" + b"".join(encode_bencode(k) + encode_bencode(v) for k, v in items) + b"e"
+
+
+class Torrent:
+    """
+    The metainfo of a `.torrent` file: its name, info hash, and files as (path, length).
+    Single-file torrents have just the one file, named after the torrent.
+    """
+
+    def __init__(self, path: str, name: str, infohash: str, files: List[Tuple[str, int]]):
+        self.path = path
+        self.name = name
+        self.infohash = infohash
+        self.files = files
+        # The parse of `name`, filled in by `parse_torrents`.
+        self.result: Optional[Dict[str, Any]] = None
+
+    def __repr__(self) -> str:
+        return f"Torrent({self.name!r}, {len(self.files)} files)"
+
+
+def _text(value: Dict[bytes, Any], key: bytes, encoding: str) -> str:
+    if key + b".utf-8" in value:
+        return value[key + b".utf-8"].decode("utf-8", errors="replace")
+    return value.get(key, b"").decode(encoding, errors="replace")
+
+
+def read_torrent(path: str) -> Torrent:
+    """
+    Read a `.torrent` file, memory-mapping it.
+    """
+    with open(path, "rb") as torrent_file:
+        if os.fstat(torrent_file.fileno()).st_size == 0:
+            raise BencodeError(f"{path} is empty")
+        with mmap.mmap(torrent_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            metainfo, spans = decode_bencode(data)
+            if not isinstance(metainfo, dict) or not isinstance(metainfo.get(b"info"), dict):
+                raise BencodeError(f"{path} has no info dictionary")
+            start, end = spans[b"info"]
+            with memoryview(data) as view:
+                infohash = hashlib.sha1(view[start:end]).hexdigest()
+
+    info = metainfo[b"info"]
+    encoding = metainfo.get(b"encoding", b"utf-8").decode("ascii", errors="replace")
+    try:
+        "".encode(encoding)
+    except LookupError:
+        encoding = "utf-8"
+    name = _text(info, b"name", encoding)
+    if b"files" in info:
+        files = [(_file_path(entry, encoding), entry.get(b"length", 0)) for entry in info[b"files"]]
+    else:
+        files = [(name, info.get(b"length", 0))]
+    return Torrent(path, name, infohash, files)
+
+
+def _file_path(entry: Dict[bytes, Any], encoding: str) -> str:
+    if b"path.utf-8" in entry:
+        parts, encoding = entry[b"path.utf-8"], "utf-8"
+    else:
+        parts = entry.get(b"path", [])
+    return "/".join(part.decode(encoding, errors="replace") for part in parts)
+
+
+def torrent_paths(paths: Iterable[str], recursive: bool = False) -> Iterator[str]:
+    """
+    Expand directories into the `.torrent` files in them, in name order.
+    """
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        if recursive:
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for file_name in sorted(files):
+                    if file_name.endswith(".torrent"):
+                        yield os.path.join(root, file_name)
+        else:
+            for file_name in sorted(os.listdir(path)):
+                if file_name.endswith(".torrent") and os.path.isfile(os.path.join(path, file_name)):
+                    yield os.path.join(path, file_name)
+
+
+# Fields of the torrent's name that files don't inherit, as they describe the torrent as a whole.
+not_inherited = ["excess", "episodeName", "filetype", "size"]
+
+# A plain SxxEyy token. Files of a season pack usually only differ by the numbers in it, so
+# its digits are masked to group file names (see `FileParser`).
+EPISODE_TOKEN = re.compile(r"(?<![^\W_])S([0-9]{1,2})E([0-9]{1,3})(?![^\W_])", re.IGNORECASE)
+
+
+class FileParser:
+    """
+    Parses the file names of torrents, reusing work between similar names.
+
+    File names that are identical apart from the numbers of a single SxxEyy token are parsed
+    once. If that parse took its seasons and episodes from exactly that token, and nothing
+    else from it, the others only need those two fields swapped in: none of the patterns of
+    other keys can match inside such a token, as it contains no word boundary.
+    """
+
+    def __init__(self, ptn: PTN, standardise: bool = True, coherent_types: bool = False, max_templates: int = 4096):
+        self.ptn = ptn
+        self.standardise = standardise
+        self.coherent_types = coherent_types
+        self.max_templates = max_templates
+        # Template name -> the result to reuse for it, or None if it can't be reused.
+        self.templates = {}
+        self.parses = 0
+
+    def parse(self, name: str) -> Dict[str, Any]:
+        tokens = list(EPISODE_TOKEN.finditer(name))
+        if len(tokens) != 1:
+            return self._parse(name)
+        token = tokens[0]
+        template = name[:token.start()] + EPISODE_TOKEN.sub(lambda m: "S" + "#" * len(m.group(1)) + "E" + "#" * len(m.group(2)), token.group()) + name[token.end():]
+        if self.ptn.metrics is not None:
+            self.ptn.metrics.cache("file_templates", self.templates.get(template) is not None)
+        if template in self.templates:
+            result = self.templates[template]
+            if result is None:
+                return self._parse(name)
+            result = _copy(result)
+            result["seasons"], result["episodes"] = [int(token.group(1))], [int(token.group(2))]
+            return result
+
+        result = self._parse(name)
+        if len(self.templates) >= self.max_templates:
+            self.templates.clear()
+        self.templates[template] = _copy(result) if self._from_token(name, token, result) else None
+        return result
+
+    def _parse(self, name: str) -> Dict[str, Any]:
+        self.parses += 1
+        return self.ptn.parse(name, standardise=self.standardise, coherent_types=self.coherent_types)
+
+    def _from_token(self, name: str, token: re.Match, result: Dict[str, Any]) -> bool:
+        """
+        Whether the last parse got its seasons and episodes from `token`, and nothing else.
+        """
+        if result.get("seasons") != [int(token.group(1))] or result.get("episodes") != [int(token.group(2))]:
+            return False
+        # The torrent name is stripped before parsing, so slices are relative to that.
+        offset = len(name) - len(name.lstrip())
+        start, end = token.start() - offset, token.end() - offset
+        covered = set()
+        for part, part_slice in self.ptn.part_slices.items():
+            if not part_slice or part_slice[1] <= start or part_slice[0] >= end:
+                continue
+            if part not in ("seasons", "episodes"):
+                return False
+            covered.update(range(max(start, part_slice[0]), min(end, part_slice[1])))
+        return len(covered) == end - start
+
+
+def _copy(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {part: list(value) if isinstance(value, list) else value for part, value in result.items()}
+
+
+def parse_torrents(
+    paths: Iterable[str],
+    ptn: Optional[PTN] = None,
+    standardise: bool = True,
+    coherent_types: bool = False,
+    recursive: bool = False,
+    skip_invalid: bool = False,
+) -> Iterator[Tuple[Torrent, str, Dict[str, Any]]]:
+    """
+    Read `.torrent` files (directories are expanded to the `.torrent` files in them), and yield
+    (torrent, file_path, result) for every file in each torrent.
+
+    The torrent's name is parsed once (kept on `torrent.result`), and each file's result
+    inherits the fields it lacks from it, apart from those in `not_inherited`. Only the last
+    component of each file path is parsed.
+    """
+    ptn = ptn or PTN()
+    file_parser = FileParser(ptn, standardise, coherent_types)
+    for path in torrent_paths(paths, recursive):
+        try:
+            torrent = read_torrent(path)
+        except (OSError, BencodeError):
+            if skip_invalid:
+                continue
+            raise
+        torrent.result = file_parser.parse(torrent.name)
+        inherited = {part: value for part, value in torrent.result.items() if part not in not_inherited}
+        for file_path, _ in torrent.files:
+            if file_path == torrent.name:
+                yield torrent, file_path, torrent.result
+                continue
+            result = file_parser.parse(file_path.rsplit("/", 1)[-1])
+            for part, value in inherited.items():
+                if part not in result or result[part] == "":
+                    result[part] = list(value) if isinstance(value, list) else value
+            yield torrent, file_path, result
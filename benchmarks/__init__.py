@@ -0,0 +1,6 @@
+#!/usr/bin/env python
+
+# Benchmark scripts for PTN. Run them from the repository root, e.g.
+# `python -m benchmarks.post_stages`.
+
+from PTN.tools import CORPUS_PATH, best_time, load_corpus, time_names  # noqa: F401
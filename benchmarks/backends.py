@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+import argparse
+
+from PTN.backends import available_backends, backend_classes, get_backend
+from PTN.parse import PTN
+
+from . import load_corpus, time_names, CORPUS_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the regex backends over a corpus.")
+    parser.add_argument("corpus", nargs="?", default=CORPUS_PATH)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    names = load_corpus(args.corpus)
+
+    available = available_backends()
+    missing = [name for name in backend_classes if name not in available]
+    if missing:
+        print(f"Not installed: {', '.join(missing)}")
+
+    reference = PTN(backend="re")
+    expected = [reference.parse(name, standardise=True) for name in names]
+    print(f"{len(names)} names")
+    print(f"{'backend':<10}{'us/name':>10}{'speedup':>9}{'fallbacks':>11}{'differences':>13}")
+    baseline = None
+    for name in available:
+        ptn = PTN(backend=name)
+        differences = sum(ptn.parse(torrent, standardise=True) != result for torrent, result in zip(names, expected))
+        elapsed = time_names(lambda torrent: ptn.parse(torrent, standardise=True), names, repeat=args.repeat)
+        baseline = baseline or elapsed
+        fallbacks = len(get_backend(name).fallbacks)
+        print(f"{name:<10}{elapsed / len(names) * 1e6:>10.1f}{baseline / elapsed:>8.2f}x{fallbacks:>11}{differences:>13}")
+
+    for name in available:
+        reasons = {}
+        for reason in get_backend(name).fallbacks.values():
+            reasons[reason] = reasons.get(reason, 0) + 1
+        if reasons:
+            print(f"{name} fell back to re for: " + ", ".join(f"{count} {reason}" for reason, count in sorted(reasons.items())))
+
+
+if __name__ == "__main__":
+    main()
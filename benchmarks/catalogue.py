@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+import argparse
+import random
+import time
+
+import PTN
+from PTN.catalogue import TitleIndex
+
+from . import CORPUS_PATH, load_corpus
+
+WORDS = (
+    "love night dark house last man city star river blood king world dead girl time game lost "
+    "secret road black summer red war family dream little moon fire story wild iron ghost heart"
+).split()
+
+
+def synthetic_titles(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    for _ in range(count):
+        words = rng.sample(WORDS, rng.randint(1, 4))
+        if rng.random() < 0.3:
+            words.insert(0, "The")
+        if rng.random() < 0.1:
+            words.append(rng.choice(["II", "III", "2", "Part 2"]))
+        yield " ".join(word.capitalize() for word in words), rng.randint(1950, 2024)
+
+
+def typo(title: str, rng: random.Random) -> str:
+    i = rng.randrange(len(title))
+    return title[:i] + title[i + 1:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure catalogue loading and title lookups.")
+    parser.add_argument("--size", type=int, default=200000, help="catalogue entries")
+    args = parser.parse_args()
+    results = [PTN.parse(name) for name in load_corpus(CORPUS_PATH)]
+    results = [result for result in results if result.get("title")]
+
+    start = time.perf_counter()
+    index = TitleIndex()
+    for i, result in enumerate(results):
+        index.add(result["title"], result.get("year"), i)
+    for title, year in synthetic_titles(args.size - len(results)):
+        index.add(title, year)
+    print(f"Built an index of {len(index)} titles in {time.perf_counter() - start:.1f}s")
+
+    rng = random.Random(1)
+    queries = {
+        "exact": results,
+        "typo": [{**result, "title": typo(result["title"], rng)} for result in results if len(result["title"]) > 8],
+    }
+    for label, batch in queries.items():
+        start = time.perf_counter()
+        matches = [index.best_match(result) for result in batch]
+        elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        index.best_matches(batch)
+        batch_elapsed = time.perf_counter() - start
+        found = sum(1 for match in matches if match is not None)
+        print(
+            f"{label:<6}{len(batch):>6} queries {elapsed / len(batch) * 1e6:>8.1f} us/lookup "
+            f"({batch_elapsed / len(batch) * 1e6:.1f} in batch), {found / len(batch):.1%} matched"
+        )
+
+
+if __name__ == "__main__":
+    main()
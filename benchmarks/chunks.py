@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+import argparse
+import random
+import re
+import time
+
+from PTN.batch import scan_chunk, separator_safe
+from PTN.parse import PTN
+
+WORDS = ["The", "Show", "Movie", "Night", "Blue", "City", "Last", "Dark", "Home", "Star", "Lost", "Road"]
+TAGS = ["720p", "1080p", "2160p", "HDTV", "WEB", "x264", "x265", "BluRay", "WEBRip", "AAC", "HEVC"]
+
+
+def short_names(count: int, seed: int = 0):
+    """
+    Short names: a title of one to three words, then a season and episode or a year, and
+    a tag or two.
+    """
+    rng = random.Random(seed)
+    for _ in range(count):
+        title = " ".join(rng.sample(WORDS, rng.randint(1, 3)))
+        number = rng.choice([f"S{rng.randint(1, 9):02d}E{rng.randint(1, 24):02d}", str(rng.randint(1950, 2024))])
+        yield " ".join([title, number] + rng.sample(TAGS, rng.randint(1, 2)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare searching for the options in each name with searching chunks of names at once.")
+    parser.add_argument("--names", type=int, default=1000000, help="short names to search")
+    parser.add_argument("--parse-names", type=int, default=20000, help="short names to parse with `parse_many`")
+    parser.add_argument("--chunk-size", type=int, default=256)
+    args = parser.parse_args()
+
+    ptn = PTN()
+    options = [
+        pattern for key in ptn.patterns_ordered for pattern, _, _ in ptn.compiled_patterns[key]
+        if isinstance(pattern, re.Pattern) and separator_safe(pattern.pattern, pattern.flags)
+    ]
+    total = sum(len(options) for options in ptn.compiled_patterns.values())
+    print(f"{len(options)} of {total} options can be searched for over chunks")
+
+    names = list(short_names(args.names))
+    start = time.perf_counter()
+    for name in names:
+        for pattern in options:
+            [{"match": (m.groups() if m.groups() else [m.group()]), "start": m.start(), "end": m.end()} for m in pattern.finditer(name)]
+    name_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for chunk_start in range(0, len(names), args.chunk_size):
+        scan_chunk(options, names[chunk_start:chunk_start + args.chunk_size])
+    chunk_time = time.perf_counter() - start
+    print(
+        f"searching {len(names)} names  each name {name_time / len(names) * 1e6:.1f} us/name  "
+        f"chunks of {args.chunk_size} {chunk_time / len(names) * 1e6:.1f} us/name  ({name_time / chunk_time:.1f}x)"
+    )
+
+    names = names[:args.parse_names]
+    results = ptn.parse_many(names, chunk_size=0)
+    assert ptn.parse_many(names, chunk_size=args.chunk_size) == results
+    start = time.perf_counter()
+    ptn.parse_many(names, chunk_size=0)
+    name_time = time.perf_counter() - start
+    start = time.perf_counter()
+    ptn.parse_many(names, chunk_size=args.chunk_size)
+    chunk_time = time.perf_counter() - start
+    print(
+        f"parse_many {len(names)} names  each name {name_time / len(names) * 1e6:.1f} us/name  "
+        f"chunks of {args.chunk_size} {chunk_time / len(names) * 1e6:.1f} us/name  ({name_time / chunk_time:.2f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+import argparse
+import random
+
+from PTN.parse import PTN
+
+from . import CORPUS_PATH, best_time, load_corpus
+
+SHOWS = ["The.Daily.Show", "Late.Night", "WWE.Raw", "Jeopardy", "The.Tonight.Show", "Real.Time"]
+
+
+def daily_names(count: int, seed: int = 0):
+    """
+    Names of daily shows, dated YYYY.MM.DD, some with a guest.
+    """
+    rng = random.Random(seed)
+    for _ in range(count):
+        date = f"{rng.randint(2000, 2023)}.{rng.randint(1, 12):02d}.{rng.randint(1, 28):02d}"
+        guest = rng.choice(["", ".Some.Guest", ".Another.Guest"])
+        yield f"{rng.choice(SHOWS)}.{date}{guest}.{rng.choice(['720p', '1080p'])}.WEB.h264-GRP"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare finding years and dates with one scan with matching the year, month and day regexes.")
+    parser.add_argument("--names", type=int, default=5000, help="daily show names to generate")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    ptn = PTN()
+    options = ptn.compiled_patterns["year"] + ptn.compiled_patterns["month"] + ptn.compiled_patterns["day"]
+    for label, names in (("corpus", load_corpus(CORPUS_PATH)), ("daily", list(daily_names(args.names)))):
+        clean_names = [name.strip().replace("_", " ") for name in names]
+
+        def run(scan):
+            for clean_name in clean_names:
+                for pattern, _, _ in options:
+                    list((pattern if scan else pattern.regex).finditer(clean_name))
+
+        regex_time = best_time(lambda: run(False), args.repeat)
+        scan_time = best_time(lambda: run(True), args.repeat)
+        print(
+            f"{label:<10}{len(names):>6} names  regex {regex_time / len(names) * 1e6:>6.1f} us/name  "
+            f"scan {scan_time / len(names) * 1e6:>6.1f} us/name  ({regex_time / scan_time:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+import argparse
+import random
+
+from PTN.parse import PTN
+
+from . import CORPUS_PATH, best_time, load_corpus
+
+FORMS = ["S{s:02d}E{e:02d}", "S{s:02d}E{e:02d}-E{f:02d}", "{s}x{e:02d}", "S{s:02d}", "S{s:02d}-S{f:02d}", "Season {s}", "Complete.S{s:02d}"]
+
+
+def episode_names(count: int, seed: int = 0):
+    """
+    TV names with the common forms of seasons and episodes, and a few movies.
+    """
+    rng = random.Random(seed)
+    for _ in range(count):
+        s, e = rng.randint(1, 12), rng.randint(1, 22)
+        if rng.random() < 0.2:
+            yield f"Some.Movie.{rng.randint(1980, 2023)}.1080p.BluRay.x264-GRP"
+            continue
+        form = rng.choice(FORMS).format(s=s, e=e, f=e + rng.randint(1, 3))
+        yield f"Some.Show.{form}.{rng.choice(['720p', '1080p'])}.{rng.choice(['WEB-DL', 'HDTV', 'WEBRip'])}.x264-GRP"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare finding seasons and episodes from the scanned forms with matching their regexes.")
+    parser.add_argument("--names", type=int, default=5000, help="TV names to generate")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    ptn = PTN()
+    options = ptn.compiled_patterns["seasons"] + ptn.compiled_patterns["episodes"]
+    scanner = options[0][0].scanner
+    for label, names in (("corpus", load_corpus(CORPUS_PATH)), ("tv", list(episode_names(args.names)))):
+        clean_names = [name.strip().replace("_", " ") for name in names]
+
+        def run(scan):
+            for clean_name in clean_names:
+                for pattern, _, _ in options:
+                    list((pattern if scan else pattern.regex).finditer(clean_name))
+
+        regex_time = best_time(lambda: run(False), args.repeat)
+        scan_time = best_time(lambda: run(True), args.repeat)
+        scanned = sum(scanner.matches(clean_name) is not None for clean_name in clean_names)
+        print(
+            f"{label:<10}{len(names):>6} names  regex {regex_time / len(names) * 1e6:>6.1f} us/name  "
+            f"scan {scan_time / len(names) * 1e6:>6.1f} us/name  ({regex_time / scan_time:.1f}x, {scanned / len(names):.0%} scanned)"
+        )
+
+
+if __name__ == "__main__":
+    main()
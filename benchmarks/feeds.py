@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape, quoteattr
+
+from PTN.feeds import parse_feeds, read_feed, read_item
+from PTN.tools.equivalence import synthetic_names
+
+try:
+    import feedparser
+except ImportError:
+    feedparser = None
+
+CATEGORIES = [2000, 2040, 2045, 5000, 5030, 5040, 5070]
+
+
+def write_feed(path: str, items: int, seed: int = 0) -> None:
+    """
+    Write a Torznab feed of `items` generated names, with the elements and attributes an
+    indexer's feed has.
+    """
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as feed_file:
+        feed_file.write('<?xml version="1.0" encoding="UTF-8"?>\n<rss version="2.0" xmlns:torznab="http://torznab.com/schemas/2015/feed">\n<channel>\n<title>Indexer</title>\n')
+        for index, name in enumerate(synthetic_names(items, seed)):
+            size, category = rng.randint(10 ** 8, 10 ** 10), rng.choice(CATEGORIES)
+            link = quoteattr(f"http://indexer.example/download/{seed}/{index}")
+            feed_file.write(
+                f"<item><title>{escape(name)}</title><guid>{seed}-{index}</guid><link>http://indexer.example/download/{seed}/{index}</link>"
+                f"<pubDate>Mon, 19 Oct 2026 06:00:00 +0000</pubDate><size>{size}</size><description>{escape(name)}</description>"
+                f'<category>{category}</category><enclosure url={link} length="{size}" type="application/x-bittorrent" />'
+                f'<torznab:attr name="category" value="{category}" /><torznab:attr name="seeders" value="{rng.randint(0, 5000)}" />'
+                f'<torznab:attr name="peers" value="{rng.randint(0, 9000)}" /><torznab:attr name="size" value="{size}" /></item>\n'
+            )
+        feed_file.write("</channel>\n</rss>\n")
+
+
+def whole_document(path: str) -> int:
+    return sum(1 for element in ElementTree.parse(path).getroot().iter("item") if read_item(element, path))
+
+
+def measure(read, path: str):
+    """
+    The time taken to read a feed, and the peak memory allocated while reading it (in a
+    separate run, as tracing slows it down).
+    """
+    start = time.perf_counter()
+    read(path)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    read(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare streaming the items of feeds with loading whole documents, and time parsing them.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="items per feed to read")
+    parser.add_argument("--feeds", type=int, default=20, help="feeds to parse")
+    parser.add_argument("--items", type=int, default=500, help="items per feed to parse")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    readers = {"streaming": lambda path: sum(1 for _ in read_feed(path)), "whole document": whole_document}
+    if feedparser is not None:
+        readers["feedparser"] = lambda path: len(feedparser.parse(path)["entries"])
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            path = os.path.join(directory, f"feed-{size}.xml")
+            write_feed(path, size)
+            results = [f"{size:>7} items ({os.path.getsize(path) / 2 ** 20:.1f} MiB)"]
+            for label, read in readers.items():
+                elapsed, peak = measure(read, path)
+                results.append(f"{label} {elapsed / size * 1e6:.1f} us/item, peak {peak / 2 ** 20:.1f} MiB")
+            print("  ".join(results))
+            os.remove(path)
+
+        for index in range(args.feeds):
+            write_feed(os.path.join(directory, f"feed-{index:04d}.xml"), args.items, seed=index)
+        items = args.feeds * args.items
+        for workers in sorted({1, args.workers}):
+            start = time.perf_counter()
+            count = sum(1 for _ in parse_feeds([directory], workers=workers))
+            elapsed = time.perf_counter() - start
+            assert count == items
+            print(f"parse_feeds {args.feeds} feeds of {args.items} items, {workers} workers: {items / elapsed:.0f} items/s ({elapsed / args.feeds * 1e3:.0f} ms/feed)")
+
+
+if __name__ == "__main__":
+    main()
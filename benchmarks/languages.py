@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+import argparse
+import random
+
+from PTN.languages import Ambiguous
+from PTN.parse import PTN
+
+from . import CORPUS_PATH, best_time, load_corpus
+
+LANGUAGES = ["ITA", "ENG", "French", "GER", "SPA", "RUS", "Hindi", "Tamil", "Telugu", "jap", "kor", "POR", "Dutch"]
+AUDIO = ["DD5.1", "AAC2.0", "AC3", "DTS", "Dub", "DDP5.1", "TrueHD"]
+
+
+def multi_language_names(count: int, seed: int = 0, delimiter: str = "."):
+    """
+    Names with long lists of languages, some with audio qualifiers and subtitles, delimited
+    by `delimiter`.
+    """
+    rng = random.Random(seed)
+    for i in range(count):
+        tags = []
+        for language in rng.sample(LANGUAGES, rng.randint(3, 10)):
+            tags.append(language + (delimiter + rng.choice(AUDIO) if rng.random() < 0.3 else ""))
+        subtitles = rng.choice(["", delimiter.join(["", "Subs"] + rng.sample(LANGUAGES, 3)), delimiter + "Multi" + delimiter + "Subs"])
+        yield f"Some.Movie.{2000 + i % 20}.{delimiter.join(tags)}{subtitles}.1080p.BluRay.x264-GRP"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare matching languages by walking the lists with matching them with their regexes.")
+    parser.add_argument("--names", type=int, default=2000, help="multi-language names to generate")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    ptn = PTN()
+    options = ptn.compiled_patterns["languages"]
+    cases = (
+        ("corpus", [name.strip().replace("_", " ") for name in load_corpus(CORPUS_PATH)]),
+        ("multi-language", list(multi_language_names(args.names))),
+        # Not cleaned as `parse` does, to time walking lists delimited by underscores.
+        ("underscores", list(multi_language_names(args.names, delimiter="_"))),
+    )
+    for label, clean_names in cases:
+        def run(walk):
+            for clean_name in clean_names:
+                for pattern, _, _ in options:
+                    list((pattern if walk else pattern.regex).finditer(clean_name))
+
+        def fallbacks():
+            # Names the walk hands to the regex, as it can't tell which of their matches it would pick.
+            count = 0
+            for clean_name in clean_names:
+                try:
+                    for pattern, _, _ in options:
+                        pattern.lists.walk(clean_name).matches(pattern.condition)
+                except Ambiguous:
+                    count += 1
+            return count
+
+        regex_time = best_time(lambda: run(False), args.repeat)
+        walk_time = best_time(lambda: run(True), args.repeat)
+        print(
+            f"{label:<16}{len(clean_names):>6} names  regex {regex_time / len(clean_names) * 1e6:>7.1f} us/name  "
+            f"walk {walk_time / len(clean_names) * 1e6:>7.1f} us/name  ({regex_time / walk_time:.1f}x, {fallbacks()} to the regex)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+import argparse
+import random
+
+from PTN.parse import PTN
+
+from . import CORPUS_PATH, best_time, load_corpus
+
+NETWORKS = ["AMZN", "NF", "ATVP", "DSNP", "HMAX", "HULU", "PCOK", "iT", "CRAV", "STAN", "iP", "RED", "CR", "BBC", "Hallmark"]
+QUALITIES = ["WEB-DL", "WEBRip", "WEB", "HDTV", "BluRay"]
+
+
+def streaming_names(count: int, seed: int = 0):
+    """
+    Names with a streaming service tag, mostly just before the quality.
+    """
+    rng = random.Random(seed)
+    for i in range(count):
+        network, quality = rng.choice(NETWORKS), rng.choice(QUALITIES)
+        episode = f"S{rng.randint(1, 12):02d}E{rng.randint(1, 24):02d}"
+        tags = rng.choice([f"{network}.{quality}", f"{network} {quality}", f"{quality}.{network}", f"{network}{quality}"])
+        yield f"Some.Show.{episode}.It.Was.{rng.choice(['Red', 'Stan', 'Nick'])}.{rng.choice(['720p', '1080p', '2160p'])}.{tags}.DDP5.1.H.264-GRP"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare matching the networks where one starts with searching for them with their regexes.")
+    parser.add_argument("--names", type=int, default=2000, help="names with streaming service tags to generate")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    ptn = PTN()
+    options = ptn.compiled_patterns["network"]
+    for label, names in (("corpus", load_corpus(CORPUS_PATH)), ("streaming", list(streaming_names(args.names)))):
+        clean_names = [name.strip().replace("_", " ") for name in names]
+
+        def run(starts):
+            for clean_name in clean_names:
+                for pattern, _, _ in options:
+                    list((pattern if starts else pattern.regex).finditer(clean_name))
+
+        regex_time = best_time(lambda: run(False), args.repeat)
+        starts_time = best_time(lambda: run(True), args.repeat)
+        print(
+            f"{label:<16}{len(names):>6} names  regex {regex_time / len(names) * 1e6:>7.1f} us/name  "
+            f"starts {starts_time / len(names) * 1e6:>7.1f} us/name  ({regex_time / starts_time:.1f}x)"
+        )
+    parsed = best_time(lambda: [ptn.parse(name) for name in names], args.repeat)
+    print(f"\nparse on the streaming names: {parsed / len(names) * 1e6:.1f} us/name")
+
+
+if __name__ == "__main__":
+    main()
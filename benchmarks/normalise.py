@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+import argparse
+import re
+
+from PTN.normalise import clean_string
+from PTN.parse import PTN
+
+from . import CORPUS_PATH, best_time, load_corpus
+
+
+def regex_clean_string(string: str) -> str:
+    """
+    Cleaning a string with the regex substitutions `clean_string` replaces.
+    """
+    def clean_dots(string):
+        if " " not in string and "." in string:
+            string = re.sub(r"\.{4,}", "... ", string)
+            string = re.sub(r"(?<!\.)\.\.(?!\.)", " ", string)
+            string = re.sub(r"(?<!\.)\.(?!\.\.)", " ", string)
+        return string
+
+    clean = re.sub(r"^( -|\(|\[)", "", string)
+    clean = clean_dots(clean)
+    clean = re.sub(r"_", " ", clean)
+    clean = re.sub(r"([\[)_\]]|- )$", "", clean).strip()
+    clean = clean.strip(" _-")
+    return clean_dots(clean).strip()
+
+
+class RecordingPTN(PTN):
+    """
+    Keeps every string it cleans.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.cleaned = []
+
+    def _clean_string(self, string):
+        self.cleaned.append(string)
+        return super()._clean_string(string)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare cleaning titles and segments with string methods with the regex substitutions.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    recording = RecordingPTN()
+    for name in load_corpus(CORPUS_PATH):
+        recording.parse(name)
+    strings = recording.cleaned
+    assert [clean_string(string) for string in strings] == [regex_clean_string(string) for string in strings]
+
+    regex_time = best_time(lambda: [regex_clean_string(string) for string in strings], args.repeat)
+    string_time = best_time(lambda: [clean_string(string) for string in strings], args.repeat)
+    print(
+        f"{len(strings)} strings cleaned parsing the corpus  regex {regex_time / len(strings) * 1e6:.2f} us/string  "
+        f"string methods {string_time / len(strings) * 1e6:.2f} us/string  ({regex_time / string_time:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
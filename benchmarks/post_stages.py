@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+import argparse
+import time
+from collections import defaultdict
+from functools import wraps
+
+from PTN.parse import PTN
+from PTN.post import post_processing_stages
+
+from . import load_corpus, time_names, CORPUS_PATH
+
+
+def timed(stage, totals):
+    @wraps(stage)
+    def wrapper(*args):
+        start = time.perf_counter()
+        try:
+            return stage(*args)
+        finally:
+            totals[stage.__name__] += time.perf_counter() - start
+    return wrapper
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time each post-processing stage over a corpus.")
+    parser.add_argument("corpus", nargs="?", default=CORPUS_PATH)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    names = load_corpus(args.corpus)
+
+    totals = defaultdict(float)
+    ptn = PTN()
+    ptn.post_processing_before_excess = [timed(f, totals) for f in ptn.post_processing_before_excess]
+    ptn.post_processing_after_excess = [timed(f, totals) for f in ptn.post_processing_after_excess]
+    # The stage times and the total are both those of the best run.
+    total, stage_totals = float("inf"), {}
+    for _ in range(args.repeat):
+        totals.clear()
+        run_total = time_names(ptn.parse, names, repeat=1)
+        if run_total < total:
+            total, stage_totals = run_total, dict(totals)
+    print(f"{len(names)} names, {total / len(names) * 1e6:.1f} us/name overall")
+    print(f"{'stage':<32}{'us/name':>10}{'share':>8}")
+    for name in post_processing_stages:
+        stage_total = stage_totals.get(name, 0.0)
+        print(f"{name:<32}{stage_total / len(names) * 1e6:>10.2f}{stage_total / total:>8.1%}")
+
+    for name in ("try_episode_name",):
+        without = time_names(PTN(disabled_stages=[name]).parse, names, repeat=args.repeat)
+        print(f"disabled_stages=[{name!r}]: {without / len(names) * 1e6:.1f} us/name")
+
+
+if __name__ == "__main__":
+    main()
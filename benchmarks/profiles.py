@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+import argparse
+import json
+import os
+
+from PTN.parse import PTN
+from PTN.profiles import profiles
+
+from . import CORPUS_PATH, load_corpus, time_names
+
+FILES = os.path.dirname(CORPUS_PATH)
+
+
+def expected_results():
+    """
+    The full standardised results expected for the test corpus: output_standard.json only
+    holds the fields that differ from output_raw.json.
+    """
+    with open(os.path.join(FILES, "output_raw.json")) as raw_file, open(os.path.join(FILES, "output_standard.json")) as standard_file:
+        return [{**raw, **standard} for raw, standard in zip(json.load(raw_file), json.load(standard_file))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the speed and accuracy of each parse profile on the test corpus.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    names = load_corpus(CORPUS_PATH)
+    expected = expected_results()
+
+    print(f"{len(names)} names, accuracy against tests/files/output_standard.json")
+    print(f"{'profile':<10}{'us/name':>10}{'speedup':>9}{'fields':>9}{'kept':>9}{'titles':>9}")
+    baseline = None
+    for profile in profiles:
+        ptn = PTN(profile=profile)
+        elapsed = time_names(lambda name: ptn.parse(name, standardise=True), names, repeat=args.repeat)
+        baseline = baseline or elapsed
+        fields = correct = kept = kept_correct = titles = 0
+        for name, expected_result in zip(names, expected):
+            result = ptn.parse(name, standardise=True)
+            titles += result.get("title") == expected_result.get("title")
+            for key, value in expected_result.items():
+                fields += 1
+                correct += result.get(key) == value
+                # Accuracy over just the keys this profile still looks for.
+                if key not in profiles[profile]["skip_keys"]:
+                    kept += 1
+                    kept_correct += result.get(key) == value
+        print(
+            f"{profile:<10}{elapsed / len(names) * 1e6:>10.1f}{baseline / elapsed:>8.2f}x"
+            f"{correct / fields:>9.1%}{kept_correct / kept:>9.1%}{titles / len(names):>9.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
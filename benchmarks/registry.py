@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+import argparse
+import time
+
+from PTN.parse import PTN
+from PTN.patterns import patterns, patterns_ordered
+from PTN.registry import PatternRegistry
+
+
+# Changes to the patterns, each applied to a fresh registry and then either caught up with
+# by a parser (recompiling what changed) or compiled into a new parser.
+CHANGES = {
+    "new key": lambda registry: registry.add("tag", r"MYTAG", after="network"),
+    "network option": lambda registry: registry.add("network", (r"RTL", "RTL")),
+    "quality option": lambda registry: registry.add("quality", (r"VHSRip", "VHSRip")),
+    "year options": lambda registry: registry.replace("year", r"(?:19|20)[0-9]{2}|2100"),
+    "move key": lambda registry: registry.move("genres", before="year"),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare catching up with a change to the patterns with building a new parser.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for change_name, change in CHANGES.items():
+        def incremental():
+            registry = PatternRegistry(dict(patterns), list(patterns_ordered))
+            ptn = PTN(backend="re", registry=registry)
+            change(registry)
+            start = time.perf_counter()
+            ptn._update()
+            return time.perf_counter() - start
+
+        def rebuild():
+            registry = PatternRegistry(dict(patterns), list(patterns_ordered))
+            change(registry)
+            start = time.perf_counter()
+            PTN(backend="re", registry=registry)
+            return time.perf_counter() - start
+
+        update_time = min(incremental() for _ in range(args.repeat))
+        rebuild_time = min(rebuild() for _ in range(args.repeat))
+        print(f"{change_name:15}  new parser {rebuild_time * 1e3:.2f} ms  update {update_time * 1e3:.2f} ms  ({rebuild_time / update_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
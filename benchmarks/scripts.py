@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+import argparse
+
+from PTN.parse import PTN
+from PTN.scripts import ALL_SCRIPTS, classify
+
+from . import CORPUS_PATH, best_time, load_corpus, time_names
+
+# Script-specific titles added to ASCII corpus names, to have enough names of each script.
+SAMPLES = {
+    "latin": "Amélie Poulain",
+    "cyrillic": "Амели / Amelie",
+    "cjk": "千と千尋の神隠し",
+    "arabic": "فيلم / Film",
+}
+
+
+class RecordingPTN(PTN):
+    """
+    Records the raw titles passed to `clean_title`, with the scripts of their names.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.titles = []
+
+    def clean_title(self, raw_title, scripts=None):
+        self.titles.append((raw_title, scripts))
+        return super().clean_title(raw_title, scripts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare title cleaning and parse times by script, with and without skipping script-specific cleaning.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    names = load_corpus(CORPUS_PATH)
+
+    by_script = {}
+    for name in names:
+        by_script.setdefault("+".join(sorted(classify(name))), []).append(name)
+    ascii_names = by_script["ascii"]
+    for script, sample in SAMPLES.items():
+        by_script.setdefault(script, []).extend(f"{sample} {name}" for name in ascii_names[:100])
+
+    ptn = PTN()
+    print(f"{'scripts':<18}{'names':>7}{'parse us':>10}{'clean_title us':>16}{'all regexes':>13}")
+    for script, script_names in sorted(by_script.items(), key=lambda item: len(item[1]), reverse=True):
+        recording = RecordingPTN()
+        for name in script_names:
+            recording.parse(name)
+        titles = recording.titles
+
+        def clean(scripts_override):
+            for raw_title, scripts in titles:
+                ptn.clean_title(raw_title, scripts_override or scripts)
+
+        parse_time = time_names(lambda name: ptn.parse(name, standardise=True), script_names, args.repeat)
+        routed = best_time(lambda: clean(None), args.repeat * 4)
+        unrouted = best_time(lambda: clean(ALL_SCRIPTS), args.repeat * 4)
+        print(
+            f"{script:<18}{len(script_names):>7}{parse_time / len(script_names) * 1e6:>10.1f}"
+            f"{routed / len(titles) * 1e6:>16.2f}{unrouted / len(titles) * 1e6:>13.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+import argparse
+import random
+import time
+
+from PTN.parse import PTN
+from PTN.shapes import ShapeCache
+
+from . import CORPUS_PATH, load_corpus
+
+RESOLUTIONS = ["720p", "1080p", "2160p"]
+SOURCES = ["WEB-DL", "WEBRip", "HDTV", "BluRay", "AMZN.WEB-DL", "NF.WEBRip"]
+CODECS = ["x264", "x265", "H.264", "HEVC"]
+GROUPS = ["NTb", "FLUX", "GRP", "EDITH", "SuccessfulCrab", "ION10", "MiNX"]
+FORMS = [
+    "{title}.S{season:02d}E{episode:02d}.{resolution}.{source}.{codec}-{group}",
+    "{title} S{season:02d}E{episode:02d} {resolution} {source} DDP5.1 {codec}-{group}",
+    "{title}.S{season:02d}E{episode:02d}E{next:02d}.{resolution}.{source}.{codec}-{group}",
+    "{title}.S{season:02d}.{resolution}.{source}.{codec}-{group}",
+    "{title}.{year}.{month:02d}.{day:02d}.{resolution}.WEB.h264-{group}",
+    "[{group}] {title} - {episode:02d} [{resolution}]",
+]
+
+
+def stream_names(titles, count: int, seed: int = 0, releases: int = 3):
+    """
+    A stream of names of episodes, season packs and daily shows. Each show is released in a
+    few ways (a form, resolution, source, codec and group), and its names only differ by
+    their numbers.
+    """
+    rng = random.Random(seed)
+    shows = [
+        (title.replace(" ", rng.choice([".", " "])), rng.choice(FORMS), rng.choice(RESOLUTIONS), rng.choice(SOURCES), rng.choice(CODECS), rng.choice(GROUPS))
+        for title in titles
+        for _ in range(releases)
+    ]
+    for _ in range(count):
+        title, form, resolution, source, codec, group = rng.choice(shows)
+        episode = rng.randint(1, 23)
+        yield form.format(
+            title=title,
+            season=rng.randint(1, 12),
+            episode=episode,
+            next=episode + 1,
+            resolution=resolution,
+            source=source,
+            codec=codec,
+            group=group,
+            year=rng.randint(2015, 2024),
+            month=rng.randint(1, 12),
+            day=rng.randint(1, 28),
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare parsing a stream of names through a shape cache with parsing each of them.")
+    parser.add_argument("--names", type=int, default=10000, help="names to generate")
+    parser.add_argument("--titles", type=int, default=100, help="shows to generate names of")
+    parser.add_argument("--top", type=int, default=10, help="shapes to show the hit rates of")
+    args = parser.parse_args()
+
+    ptn = PTN()
+    corpus = load_corpus(CORPUS_PATH)
+    titles = sorted({ptn.parse(name)["title"] for name in corpus if "seasons" in ptn.parse(name)} - {""})
+    titles = random.Random(0).sample(titles, min(args.titles, len(titles)))
+    for label, names in (("corpus", corpus), ("stream", list(stream_names(titles, args.names)))):
+        start = time.perf_counter()
+        expected = [ptn.parse(name, standardise=True) for name in names]
+        parse_time = time.perf_counter() - start
+        cache = ShapeCache(ptn)
+        start = time.perf_counter()
+        results = cache.parse_many(names)
+        cache_time = time.perf_counter() - start
+        wrong = sum(result != expected_result for result, expected_result in zip(results, expected))
+        print(
+            f"{label:<8}{len(names):>7} names {len(cache.shapes):>6} shapes  hit rate {cache.hits / len(names):>6.1%}  "
+            f"parse {parse_time / len(names) * 1e6:>6.1f} us/name  shape cache {cache_time / len(names) * 1e6:>6.1f} us/name  "
+            f"({parse_time / cache_time:.1f}x)  {wrong} wrong"
+        )
+    print()
+    for shape in cache.stats(args.top):
+        print(f"{shape['hit_rate']:>6.1%} of {shape['hits'] + shape['parses']:>5}  {shape['state']:<9}  {shape['shape']}")
+
+
+if __name__ == "__main__":
+    main()
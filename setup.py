@@ -18,7 +18,7 @@ setup(
     description="Extract media information from torrent-like filename",
     long_description=description,
     long_description_content_type="text/markdown",
-    packages=["PTN"],
+    packages=["PTN", "PTN.tools"],
     keywords=(
         "parse parser torrent torrents name names proper rename "
         "movie movies tv show shows series extract find quality "
@@ -0,0 +1,9 @@
+#!/usr/bin/env python
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("equivalence", "check a parser configuration against the reference (see PTN/tools/equivalence.py)")
+    group.addoption("--equivalence", metavar="JSON", help='candidate parser configuration, e.g. \'{"backend": "regex"}\'')
+    group.addoption("--equivalence-synthetic", type=int, default=10000, help="generated names to check")
+    group.addoption("--equivalence-mutations", type=int, default=2, help="mutations of each name to check")
+    group.addoption("--equivalence-workers", type=int, default=None)
@@ -65,8 +65,9 @@ def add_titles(titles):
             if title in seen:
                 continue
         print(title)
-        raw_parsed = PTN.parse(title, standardise=False)
-        standard_parsed = PTN.parse(title, standardise=True)
+        views = PTN.parse_views(title)
+        raw_parsed = views.raw
+        standard_parsed = views.standardised
         difference_parsed = dict()
         standard_filtered = dict()
         standard_filtered["title"] = raw_parsed["title"]
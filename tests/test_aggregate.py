@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+
+import pickle
+import random
+
+import pytest
+
+import PTN
+from PTN.aggregate import ReleaseAggregator, TopCounter
+
+NAMES = [
+    "The.Show.S01E01.1080p.WEB-DL.DDP5.1.x264-GRP",
+    "The Show S01E01 720p HDTV x264-OTHER",
+    "the.show.s01e01.1080p.web-dl.h264-GRP",
+    "The.Show.S01E02.1080p.WEB-DL.DDP5.1.x264-GRP",
+    "The.Show.S02E01.2160p.WEB-DL.x265-GRP",
+    "Movie Title 2019 1080p BluRay x264-GRP",
+]
+
+
+def test_top_counter():
+    counter = TopCounter(capacity=3)
+    values = ["a"] * 50 + ["b"] * 30 + ["c"] * 10 + [str(i) for i in range(20)]
+    random.Random(0).shuffle(values)
+    for value in values:
+        counter.add(value)
+    top = dict(counter.top())
+    assert len(top) == 3 and counter.total == len(values)
+    # Counts are over-estimated by at most total / capacity.
+    assert 50 <= top["a"] <= 50 + len(values) / 3 and 30 <= top["b"] <= 30 + len(values) / 3
+
+
+@pytest.mark.parametrize("level,groups", [("episode", 4), ("season", 3), ("show", 2)])
+def test_levels(level, groups):
+    aggregator = ReleaseAggregator(level=level).update(PTN.parse(name) for name in NAMES)
+    assert len(aggregator) == groups
+
+
+def test_aggregate_and_merge():
+    results = [PTN.parse(name) for name in NAMES]
+    whole = ReleaseAggregator().update(results)
+    largest = next(iter(whole))
+    assert (largest.title, largest.count) == ("The Show", 3)
+    assert largest.top("resolution") == [("1080p", 2), ("720p", 1)]
+    assert largest.top() == [(("1080p", "WEB-DL", "H.264", "GRP"), 2), (("720p", "HDTV", "H.264", "OTHER"), 1)]
+    summary = whole.summary()[0]
+    assert summary["seasons"] == (1,) and summary["episodes"] == (1,)
+
+    # Partial aggregates from workers (e.g. pickled back from processes) merge to the same groups.
+    first = pickle.loads(pickle.dumps(ReleaseAggregator().update(results[::2])))
+    merged = first.merge(ReleaseAggregator().update(results[1::2]))
+    assert merged.summary() == whole.summary()
+    with pytest.raises(ValueError):
+        merged.merge(ReleaseAggregator(level="show"))
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+
+import json
+
+import pytest
+
+import PTN
+from PTN.catalogue import TitleIndex, title_key
+
+
+@pytest.mark.parametrize(
+    "title,key",
+    [
+        ("The Lord of the Rings: The Two Towers", "lord of the rings the two towers"),
+        ("Matrix, The", "matrix"),
+        ("Rocky V", "rocky v"),
+        ("Malcolm X", "malcolm x"),
+        ("Harry Potter and the Deathly Hallows Part II", "harry potter and the deathly hallows part 2"),
+        ("Star Wars Episode IV A New Hope", "star wars episode 4 a new hope"),
+        ("I, Robot", "i robot"),
+        ("Fast & Furious", "fast and furious"),
+        ("Grey's Anatomy", "greys anatomy"),
+        ("Amélie", "amelie"),
+        ("Лунтик", "лунтик"),
+    ],
+)
+def test_title_key(title, key):
+    assert title_key(title) == key
+
+
+@pytest.fixture
+def index(tmp_path):
+    path = tmp_path / "catalogue.tsv"
+    path.write_text(
+        "The Matrix\t1999\ttt0133093\nThe Matrix Reloaded\t2003\ttt0234215\nRocky V\t1990\ttt0100507\n"
+        "The Office\t2001\ttt0290978\nThe Office\t2005\ttt0386676\nFast & Furious\t2009\n"
+        "Malcolm X\t1992\ttt0104797\nRocky 2\t1979\ttt0079817\n",
+        encoding="utf-8",
+    )
+    return TitleIndex.load(str(path))
+
+
+def test_best_match(index):
+    assert len(index) == 8
+    match = index.best_match(PTN.parse("Rocky.5.1990.DVDRip.x264"))
+    assert (match.title, match.id, match.score) == ("Rocky V", "tt0100507", 1.0)
+    assert index.best_match(PTN.parse("Fast.and.Furious.2009.1080p")).title == "Fast & Furious"
+    assert index.best_match(PTN.parse("The.Office.2005.S01E01.720p")).id == "tt0386676"
+    assert index.best_match(PTN.parse("The.Office.2001.S01E01.720p")).id == "tt0290978"
+    assert index.best_match(PTN.parse("The.Matrx.1999.1080p")).id == "tt0133093"
+    assert index.best_match(PTN.parse("Completely.Different.2010.720p")) is None
+
+
+def test_best_match_roman_numerals(index):
+    match = index.best_match(PTN.parse("Malcolm.X.1992.1080p.BluRay.x264"))
+    assert (match.title, match.score) == ("Malcolm X", 1.0)
+    assert index.best_match(PTN.parse("Rocky.II.1979.720p")).id == "tt0079817"
+    assert index.lookup("Rocky V", 1990).id == "tt0100507"
+
+
+def test_best_match_coherent_types(index):
+    for name, id in [("The.Office.2005.S01E01.720p", "tt0386676"), ("The.Office.2001.S01E01.720p", "tt0290978")]:
+        result = PTN.parse(name, coherent_types=True)
+        assert result["year"] == [int(name.split(".")[2])]
+        assert index.best_match(result).id == id
+        assert index.best_matches([result])[0].id == id
+
+
+def test_best_matches(index, tmp_path):
+    results = [PTN.parse(name) for name in ["The.Matrix.1999.1080p", "Unknown.2000", "The.Matrix.1999.720p"]]
+    assert index.best_matches(results) == [index.best_match(result) for result in results]
+
+    path = tmp_path / "catalogue.jsonl"
+    path.write_text(json.dumps({"title": "The Matrix", "year": 1999, "id": 1}) + "\n", encoding="utf-8")
+    assert TitleIndex.load(str(path)).best_matches(results)[0].id == 1
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+
+import json
+
+import pytest
+
+from PTN.parse import PTN
+from PTN.tools import equivalence
+
+
+class BrokenPTN(PTN):
+    """
+    Gets the resolution of 720p names wrong, to check that the harness notices.
+    """
+
+    def parse(self, name, standardise=False, coherent_types=False):
+        result = super().parse(name, standardise, coherent_types)
+        if "720p" in name:
+            result["resolution"] = "wrong"
+        return result
+
+
+def test_generated_names():
+    synthetic = list(equivalence.synthetic_names(50, seed=1))
+    assert len(synthetic) == 50 and synthetic == list(equivalence.synthetic_names(50, seed=1))
+    mutated = list(equivalence.mutated_names(synthetic[:10], 3))
+    assert len(mutated) == 30 and mutated != synthetic[:10] * 3
+
+
+def test_harness_finds_and_minimises_mismatches():
+    names = ["The.Show.S01E01.720p.WEB-DL.x264-GRP", "Movie.2019.1080p.BluRay"]
+    assert equivalence.compare({}, names, workers=1) == []
+    mismatches = equivalence.compare({"class": "test_equivalence:BrokenPTN"}, names, workers=1)
+    assert [mismatch["name"] for mismatch in mismatches] == names[:1]
+    assert mismatches[0]["fields"] == ["resolution"]
+    assert mismatches[0]["minimised"] == "720p"
+    assert "resolution: '720p' -> 'wrong'" in equivalence.format_mismatches(mismatches, len(names))
+
+
+def test_equivalence(request):
+    """
+    Only runs with `--equivalence CANDIDATE_JSON`, checking the candidate over the test corpus,
+    generated names and mutations of both.
+    """
+    candidate = request.config.getoption("--equivalence")
+    if candidate is None:
+        pytest.skip("pass --equivalence '<candidate parser configuration JSON>' to run")
+    names = equivalence.build_names(
+        request.config.getoption("--equivalence-synthetic"), request.config.getoption("--equivalence-mutations")
+    )
+    mismatches = equivalence.compare(json.loads(candidate), names, workers=request.config.getoption("--equivalence-workers"))
+    assert not mismatches, equivalence.format_mismatches(mismatches, len(names))
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+
+import io
+from xml.etree import ElementTree
+
+import pytest
+
+from PTN.feeds import parse_feeds, read_feed
+from PTN.parse import PTN
+
+FEED = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:torznab="http://torznab.com/schemas/2015/feed">
+  <channel>
+    <title>Indexer</title>
+    <item>
+      <title>The.Show.S01E02.1080p.WEB-DL.DDP5.1.x264-GRP</title>
+      <link>http://indexer.example/download/1</link>
+      <size>1000</size>
+      <category>5000</category>
+      <torznab:attr name="category" value="5040" />
+      <torznab:attr name="category" value="5000" />
+      <torznab:attr name="seeders" value="12" />
+      <torznab:attr name="size" value="1234567" />
+    </item>
+    <item>
+      <title> Movie Title 2019 720p BluRay x264 </title>
+      <enclosure url="http://indexer.example/download/2" length="2000" type="application/x-bittorrent" />
+      <category>Movies</category>
+      <category>2040</category>
+    </item>
+    <item>
+      <link>http://indexer.example/download/3</link>
+    </item>
+    <item>
+      <title>Ünïcode Tïtle 2020 HDTV</title>
+      <torznab:attr name="seeders" value="many" />
+    </item>
+  </channel>
+</rss>
+"""
+
+
+def test_read_feed():
+    items = list(read_feed(io.BytesIO(FEED.encode("utf-8"))))
+    assert [(item.title, item.link, item.size, item.seeders, item.categories) for item in items] == [
+        ("The.Show.S01E02.1080p.WEB-DL.DDP5.1.x264-GRP", "http://indexer.example/download/1", 1234567, 12, [5040, 5000]),
+        ("Movie Title 2019 720p BluRay x264", "http://indexer.example/download/2", 2000, None, [2040]),
+        ("Ünïcode Tïtle 2020 HDTV", None, None, None, []),
+    ]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parse_feeds(tmp_path, workers):
+    for index in range(3):
+        (tmp_path / f"feed{index}.xml").write_text(FEED, encoding="utf-8")
+    (tmp_path / "notes.txt").write_text("not a feed", encoding="utf-8")
+    items = list(parse_feeds([str(tmp_path), io.BytesIO(FEED.encode("utf-8"))], workers=workers, batch_size=2))
+    assert [item.source for item in items] == [str(tmp_path / f"feed{index}.xml") for index in range(3) for _ in range(3)] + [None] * 3
+    assert [item.result for item in items] == [PTN().parse(item.title, standardise=True) for item in items]
+    assert items[0].as_dict()["result"]["seasons"] == [1]
+
+
+def test_parse_feeds_invalid(tmp_path):
+    (tmp_path / "broken.xml").write_text(FEED[:FEED.index("<item>", FEED.index("</item>"))], encoding="utf-8")
+    with pytest.raises(ElementTree.ParseError):
+        list(parse_feeds([str(tmp_path)]))
+    assert len(list(parse_feeds([str(tmp_path)], skip_invalid=True, batch_size=1))) == 1
+    with pytest.raises(ValueError):
+        list(parse_feeds([], ptn=PTN(), workers=2))
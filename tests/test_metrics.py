@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+
+import threading
+
+import PTN
+from PTN.metrics import Metrics
+from PTN.parse import PTN as Parser
+from PTN.torrent import FileParser
+
+NAMES = [
+    "The.Show.S01E01.1080p.WEB-DL.DDP5.1.x264-GRP",
+    "Movie Title 2019 720p BluRay x264 some leftover words",
+    "2019",
+]
+
+
+def test_metrics_snapshot():
+    metrics = Metrics(buckets=(0.001, 10))
+    parser = Parser(metrics=metrics)
+    results = [parser.parse(name, standardise=True) for name in NAMES]
+    snapshot = metrics.snapshot()
+    assert snapshot["parses"] == snapshot["latency"]["count"] == len(NAMES)
+    assert snapshot["latency"]["buckets"][10] == snapshot["latency"]["buckets"][float("inf")] == len(NAMES)
+    assert snapshot["fields"]["resolution"] == 2
+    assert snapshot["fields"]["title"] == sum(1 for result in results if result.get("title"))
+    assert snapshot["empty_title"] == len(NAMES) - snapshot["fields"]["title"]
+    assert snapshot["excess_tokens"] == sum(len(result.get("excess", [])) for result in results)
+
+    text = metrics.prometheus()
+    assert 'ptn_parse_seconds_bucket{le="+Inf"} 3' in text
+    assert 'ptn_field_present_total{field="resolution"} 2' in text
+
+    metrics.reset()
+    assert metrics.snapshot()["parses"] == 0
+
+
+def test_metrics_threads_and_caches():
+    metrics = Metrics()
+    file_parser = FileParser(Parser(metrics=metrics))
+    for episode in range(1, 6):
+        file_parser.parse(f"The.Show.S01E{episode:02d}.1080p.WEB-DL.x264-GRP.mkv")
+    assert metrics.snapshot()["caches"]["file_templates"] == {"hits": 4, "misses": 1, "hit_rate": 0.8}
+
+    def work():
+        parser = Parser(metrics=metrics)
+        for name in NAMES * 10:
+            parser.parse(name)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert metrics.snapshot()["parses"] == 1 + 4 * len(NAMES) * 10
+
+
+def test_enable_metrics():
+    metrics = PTN.enable_metrics()
+    try:
+        PTN.parse(NAMES[0])
+        assert metrics.snapshot()["parses"] == 1
+    finally:
+        PTN.disable_metrics()
+    PTN.parse(NAMES[0])
+    assert metrics.snapshot()["parses"] == 1
@@ -2,8 +2,19 @@
 
 import json
 import os
+import re
 import PTN
 import pytest
+from PTN import batch
+from PTN.backends import available_backends
+from PTN.dates import DatePattern
+from PTN.episodes import ScannedPattern
+from PTN.languages import LanguageListPattern
+from PTN.networks import NetworkPattern
+from PTN.normalise import clean_string
+from PTN.patterns import patterns, patterns_ordered
+from PTN.registry import PatternRegistry
+from PTN.scripts import ALL_SCRIPTS, SCRIPT_CHARS, classify
 
 
 def load_json_file(file_name):
@@ -67,5 +78,360 @@ class TestTorrentParser:
             assert not unexpected_keys, f"Unexpected keys found in result for \n{torrent}: {unexpected_keys}"
 
 
+def test_disabled_stages():
+    name = "Deadliest.Catch.S00E66.No.Safe.Passage.720p.AMZN.WEB-DL.DDP2.0.H.264-NTb[TGx]"
+    assert PTN.parse(name)["episodeName"] == "No Safe Passage"
+    result = PTN.PTN(disabled_stages=["try_episode_name"]).parse(name, standardise=True)
+    assert "episodeName" not in result
+    assert result["title"] == "Deadliest Catch"
+    with pytest.raises(ValueError):
+        PTN.PTN(disabled_stages=["not_a_stage"])
+
+
+@pytest.mark.parametrize("torrent", get_test_data("files/input.json", "files/output_raw.json")[::20])
+def test_parse_views(torrent):
+    torrent = torrent[0]
+    views = PTN.parse_views(torrent)
+    for standardise in (False, True):
+        for coherent_types in (False, True):
+            expected = PTN.parse(torrent, standardise=standardise, coherent_types=coherent_types)
+            assert views.get(standardise, coherent_types) == expected
+    assert views.raw == PTN.parse(torrent, standardise=False)
+    assert views.coherent == PTN.parse(torrent, standardise=True, coherent_types=True)
+
+
+@pytest.mark.parametrize("backend", [name for name in available_backends() if name != "re"])
+def test_backends_match_re(backend):
+    parser = PTN.PTN(backend=backend)
+    for torrent, expected_result in get_test_data("files/input.json", "files/output_standard.json")[::10]:
+        assert parser.parse(torrent, standardise=True) == PTN.parse(torrent, standardise=True), torrent
+
+
+def test_profiles():
+    name = "The Walking Dead S05E03 720p HDTV x264-ASAP[ettv]"
+    result = PTN.PTN(profile="fast").parse(name, standardise=True)
+    assert result["title"] == "The Walking Dead"
+    assert result["seasons"] == [5]
+    assert result["episodes"] == [3]
+    assert "excess" not in result and "encoder" not in result
+    assert "audio" not in PTN.PTN(profile="minimal").parse("Movie.2019.1080p.BluRay.DTS-HD.MA.5.1.x264-GRP")
+    with pytest.raises(ValueError):
+        PTN.PTN(profile="not_a_profile")
+
+
+class AllScriptsPTN(PTN.PTN):
+    """
+    Runs every title cleaning pattern, whatever the scripts of the name.
+    """
+
+    def clean_title(self, raw_title, scripts=None):
+        return super().clean_title(raw_title, ALL_SCRIPTS)
+
+
+def test_scripts():
+    assert "".join(SCRIPT_CHARS.values()) == patterns["NON_ENGLISH_CHARS"]
+    assert classify("The.Show.S01E01") == {"ascii"}
+    assert classify("Amélie / Амели (2001)") == {"latin", "cyrillic"}
+    assert classify("千と千尋の神隠し 2001 1080p") == {"cjk"}
+
+    # Names in other scripts, and ASCII names with other scripts added to them.
+    names = [torrent for torrent, _ in get_test_data("files/input.json", "files/output_raw.json")]
+    mixed = [name for name in names if not name.isascii()]
+    mixed += [f"{name} / Фильм" for name in names[::10]] + [f"【字幕】{name}" for name in names[::10]]
+    assert len(mixed) > 50
+    parser, all_scripts = PTN.PTN(), AllScriptsPTN()
+    for name in names + mixed:
+        assert parser.parse(name, standardise=True) == all_scripts.parse(name, standardise=True), name
+
+
+def test_parse_many():
+    names = [torrent for torrent, _ in get_test_data("files/input.json", "files/output_raw.json")]
+    names += ["No Digits Here HDTV", "Show.2021.03.04.Title.٢٠٢٠", f"Show{batch.SEPARATOR}S01E02 720p"]
+    parser = PTN.PTN()
+    for standardise in (False, True):
+        expected = [parser.parse(name, standardise) for name in names]
+        assert parser.parse_many(names, standardise) == expected
+        assert parser.parse_many(names, standardise, chunk_size=0) == expected
+        assert parser.parse_many(names, standardise, chunk_size=16) == expected
+
+
+def test_parse_many_resets_chunk_matches():
+    class FailingMetrics(PTN.Metrics):
+        def observe(self, seconds, result):
+            raise RuntimeError("observer failed")
+
+    parser = PTN.PTN(metrics=FailingMetrics())
+    with pytest.raises(RuntimeError):
+        parser.parse_many(["The Show S01E02 720p HDTV x264", "Movie 2019 1080p BluRay"])
+    assert (parser.scanned, parser.chunk_matches) == (frozenset(), {})
+    parser.metrics = None
+    assert parser.parse("Another Film 2020 2160p WEB-DL") == PTN.PTN().parse("Another Film 2020 2160p WEB-DL")
+
+
+@pytest.mark.parametrize(
+    "pattern,safe",
+    [
+        (r"\b(?:S([0-9]{1,2})[\.\s\-]*E([0-9]{2}))\b", True),
+        (r"(?<=complete)s(?<![a-z])[^\W_]", True),
+        (r"^(www\.[\w-]+)\s+-", False),
+        (r"(iso)$", False),
+        (r"7.1", False),
+        (r"\[([^\]]+)\]", False),
+        (r"\bx\B[\S]", False),
+    ],
+)
+def test_separator_safe(pattern, safe):
+    assert batch.separator_safe(pattern) == safe
+
+
+def delimiter_variants(names):
+    """
+    The names with their words delimited by spaces, and by underscores.
+    """
+    for name in names:
+        yield name.replace(".", " ")
+        yield name.replace(" ", ".").replace(".", "_")
+
+
+class RegexPTN(PTN.PTN):
+    """
+    Matches the options wrapped in `wrapper` with their regexes, rather than with the work
+    the wrappers share.
+    """
+
+    wrapper = None
+
+    def _compile_patterns(self):
+        compiled_patterns = super()._compile_patterns()
+        for key, options in compiled_patterns.items():
+            compiled_patterns[key] = [
+                (pattern.regex if isinstance(pattern, self.wrapper) else pattern, replace, transforms)
+                for pattern, replace, transforms in options
+            ]
+        return compiled_patterns
+
+
+WRAPPED_NAMES = {
+    LanguageListPattern: [
+        "Movie.2020.French.DD5.1.English.AAC2.0.Subs.ITA.ENG.720p",
+        "Film ita eng spa fre ger DDP5.1 multi subs",
+        "Show.S01E01.rus.eng.ukr.Dub.AC3.Sub.rus.eng",
+        "FRENCH.ENGLISH.SPANISH.ITALIAN.GERMAN.RUSSIAN.HINDI.TAMIL.DD5.1.AAC2.0.DTS.x264",
+        "Show zh-hans eng.",
+        "ita-eng DD 5.1 sub ita",
+    ],
+    NetworkPattern: [
+        "Show.S01E01.It.Was.Red.1080p.AMZN.WEB-DL.DDP5.1.H.264-GRP",
+        "Show S02E03 720p NFWEBRip x264",
+        "Movie.2021.1080p.WEB-DL.DSNP.DSNY.HMAX",
+        "Show.S01.iT.iP.CR.WEBRip.Hallmark.Sony LIV",
+        "Stan.and.Nick.2019.STAN.WEB.AS.HDTV",
+    ],
+    ScannedPattern: [
+        "Show.S01E02.720p.HDTV.x264-GRP",
+        "Show.Complete.S01E01-E03.1080p.WEB",
+        "Show S01E01E02 (2019)",
+        "Show.S01E02-GRP",
+        "Show (S01E02)",
+        "Show.S01E02-03.720p",
+        "Show.1x02.Episode.Name",
+        "Show.Complete.S01.1080p",
+        "Show S01 - 05 [720p]",
+        "Show.S01-S03.Complete.720p",
+        "Show - Complete S01 - S03",
+        "Show.Complete.Season.2.720p",
+        "Show Season 1 Part 2",
+        "Show Season 1, 2 & 3",
+        "Show 2nd Season 1",
+        "Show.Complete.Series.1080p",
+    ],
+    DatePattern: [
+        "The.Daily.Show.2021.03.15.Guest.Name.720p.WEB.h264-GRP",
+        "Late Show 2020-12-31 1080p",
+        "News.2019.2020.01.02.2021",
+        "Show 2021.13.01 2021.12.32 2022.01.31",
+        "1999.Movie.2020.06.07",
+    ],
+}
+
+
+@pytest.mark.parametrize("wrapper", list(WRAPPED_NAMES), ids=lambda wrapper: wrapper.__name__)
+def test_wrapped_patterns(wrapper):
+    parser = PTN.PTN()
+    regex_parser = type(f"Regex{wrapper.__name__}PTN", (RegexPTN,), {"wrapper": wrapper})()
+    assert any(isinstance(pattern, wrapper) for options in parser.compiled_patterns.values() for pattern, _, _ in options)
+    names = [torrent for torrent, _ in get_test_data("files/input.json", "files/output_raw.json")]
+    for name in names + list(delimiter_variants(names)) + WRAPPED_NAMES[wrapper]:
+        for standardise in (False, True):
+            assert parser.parse(name, standardise) == regex_parser.parse(name, standardise), name
+
+
+@pytest.mark.parametrize(
+    "name, languages, subtitles",
+    [
+        # Several audio options end where the walk can't tell which the regex picks.
+        ("The Hunt (2020) BluRay 1080p.H264 Ita Eng AC3 5.1 Sub Ita Eng MIRCrew", ["Italian", "English"], ["Italian", "English"]),
+        ("Diabolique (1996).720p.H264.ita.eng.Ac3-5.1.sub.ita.eng-MIRCrew", ["Italian", "English"], ["Italian", "English"]),
+        ("Show.S01E01.rus.eng.ukr.Dub.AC3.Sub.rus.eng", ["Russian", "English", "Ukrainian"], ["Russian", "English"]),
+        ("ita-eng DD 5.1 sub ita", ["Italian", "English"], ["Italian"]),
+    ],
+)
+def test_language_lists(name, languages, subtitles):
+    result = PTN.PTN().parse(name, standardise=True)
+    assert (result.get("languages"), result.get("subtitles")) == (languages, subtitles)
+
+
+@pytest.mark.parametrize(
+    "string",
+    [
+        "Community.s02e20.rus_eng.720p_Kybik.v.Kybe",
+        "Movie_(1976)_720p_H264_ita_eng_Ac3_sub.ita_eng-MIRCrew",
+        "Kavacham (2018) [Tamil_+_Telugu +_Hindi]_-_750MB - ESub",
+        "Joker(2019)_English HC_720p_HDRip x264 [ Hindi -_Eng Multi_Subs]",
+        "Show_ita_eng",
+    ],
+)
+def test_language_lists_underscores(string):
+    # Lists delimited by underscores, which `parse` replaces before matching.
+    for pattern, _, _ in PTN.PTN().compiled_patterns["languages"]:
+        assert [(match.span(), match.group(1)) for match in pattern.finditer(string)] == [
+            (match.span(), match.group(1)) for match in pattern.regex.finditer(string)
+        ]
+
+
+@pytest.mark.parametrize(
+    "name, network",
+    [
+        ("Show.S01E01.It.Was.Red.1080p.AMZN.WEB-DL.DDP5.1.H.264-GRP", "AMZN"),
+        # A network at the start of a word, and one inside the title.
+        ("Show S02E03 720p NFWEBRip x264", "NF"),
+        ("Stan.and.Nick.2019.STAN.WEB.AS.HDTV", "AS"),
+        ("Show.S01E01.1080p.iP.WEB-DL.AAC2.0", "iP"),
+        ("Showtime.S01E01.720p.WEB", None),
+    ],
+)
+def test_network_starts(name, network):
+    assert PTN.PTN().parse(name).get("network") == network
+
+
+@pytest.mark.parametrize(
+    "name, seasons, episodes",
+    [
+        ("Show.Complete.S01E01-E03.1080p.WEB", [1], [1, 2, 3]),
+        ("Show S01E01E02 (2019)", [1], [1, 2]),
+        ("Show.S01E02-03.720p", [1], [2, 3]),
+        ("Show.1x02.Episode.Name", [1], [2]),
+        ("Show S01 - 05 [720p]", [1], [5]),
+        ("Show - Complete S01 - S03", [1, 2, 3], None),
+        ("Show Season 1, 2 & 3", [1, 2, 3], None),
+        ("Show 2nd Season 1", [2], None),
+    ],
+)
+def test_season_episode_forms(name, seasons, episodes):
+    result = PTN.PTN().parse(name)
+    assert (result.get("seasons"), result.get("episodes")) == (seasons, episodes)
+
+
+@pytest.mark.parametrize(
+    "name, date",
+    [
+        ("The.Daily.Show.2021.03.15.Guest.Name.720p.WEB.h264-GRP", (2021, 3, 15)),
+        ("Late Show 2020-12-31 1080p", (2020, 12, 31)),
+        ("News.2019.2020.01.02.2021", (2021, 1, 2)),
+        # Not dates: a month of 13, a day of 32.
+        ("Show 2021.13.01 2021.12.32 2022.01.31", (2022, 1, 31)),
+        ("1999.Movie.2020.06.07", (2020, 6, 7)),
+    ],
+)
+def test_dates(name, date):
+    result = PTN.PTN().parse(name)
+    assert (result.get("year"), result.get("month"), result.get("day")) == date
+
+
+def test_registry():
+    names = [torrent for torrent, _ in get_test_data("files/input.json", "files/output_raw.json")][::5]
+    registry = PatternRegistry(dict(patterns), list(patterns_ordered))
+    parser = PTN.PTN(registry=registry)
+    compiled = dict(parser.compiled_patterns)
+
+    # The `network` patterns embed the qualities, and keep the options added to them.
+    registry.add("network", (r"RTL", "RTL"))
+    registry.add("quality", (r"VHSRip", "VHSRip"))
+    registry.add("tag", r"MYTAG", after="network")
+    assert parser.snapshot.version == 0
+    result = parser.parse("Show.S01E02.NF.VHSRip.RTL.MYTAG.x264-GRP", standardise=True)
+    assert parser.snapshot.version == registry.version == 3
+    assert (result["quality"], result["network"], result["tag"]) == ("VHSRip", "Netflix", "MYTAG")
+    assert registry.options("network")[-1] == (r"RTL", "RTL")
+    assert parser.patterns_ordered.index("tag") == parser.patterns_ordered.index("network") + 1
+    # Only the keys that changed, and the composites embedding them, were recompiled.
+    changed = {key for key in compiled if parser.compiled_patterns[key] is not compiled[key]}
+    assert changed == {"network", "quality"}
+
+    registry.replace("year", r"(?:19|20)[0-9]{2}|2100")
+    registry.move("tag", before="resolution")
+    registry.remove("quality", (r"VHSRip", "VHSRip"))
+    assert "VHSRip" not in registry.options("network")[0]
+    fresh = PTN.PTN(registry=registry)
+    for name in names:
+        assert parser.parse(name, standardise=True) == fresh.parse(name, standardise=True), name
+    assert parser.post_title_pattern == fresh.post_title_pattern
+    assert parser.literal_regexes == fresh.literal_regexes
+    assert parser.patterns_ordered == fresh.patterns_ordered
+
+    # The episode name is looked for after the episodes, including the options added.
+    registry.add("episodes", r"folge[ .]?([0-9]{1,3})")
+    result = parser.parse("Show.Folge.12.Der.Name.720p.HDTV.x264-GRP")
+    assert (result["episodes"], result["episodeName"]) == ([12], "Der Name")
+
+    registry.remove("tag")
+    assert "tag" not in parser.parse("Show.MYTAG.720p")
+    for change in (
+        lambda: registry.remove("quality"),
+        lambda: registry.replace("not_a_key", r"x"),
+        lambda: registry.move("year", after="not_a_key"),
+        lambda: registry.add("tag", r"MYTAG", before="resolution", after="year"),
+    ):
+        with pytest.raises(ValueError):
+            change()
+    assert "tag" not in registry.patterns
+
+
+def regex_clean_string(string):
+    """
+    Cleaning a string with the regex substitutions `normalise.clean_string` replaces.
+    """
+    def clean_dots(string):
+        if " " not in string and "." in string:
+            string = re.sub(r"\.{4,}", "... ", string)
+            string = re.sub(r"(?<!\.)\.\.(?!\.)", " ", string)
+            string = re.sub(r"(?<!\.)\.(?!\.\.)", " ", string)
+        return string
+
+    clean = re.sub(r"^( -|\(|\[)", "", string)
+    clean = clean_dots(clean)
+    clean = re.sub(r"_", " ", clean)
+    clean = re.sub(r"([\[)_\]]|- )$", "", clean).strip()
+    clean = clean.strip(" _-")
+    return clean_dots(clean).strip()
+
+
+def test_clean_string():
+    names = [torrent for torrent, _ in get_test_data("files/input.json", "files/output_raw.json")]
+    strings = set(names) | set(delimiter_variants(names))
+    for name in names:
+        # The name cut at every delimiter, from either end.
+        for i, character in enumerate(name):
+            if not character.isalnum():
+                strings.update((name[:i], name[i:], name[:i + 1], name[i + 1:]))
+    strings.update([
+        "", ".", "..", "...", "....", "a.b", "a..b", "a...b", "a....b", "a.....b.c",
+        " -Title-", "(Title)", "[Title]", "Title- ", "Title_", "Title]\n", "Title- \n", "Title.\n",
+        "_ Title _", " a.b", "Title...Name.ext", "\u00a0Title\u3000", "Ти.тл",
+    ])
+    for string in strings:
+        assert clean_string(string) == regex_clean_string(string), repr(string)
+
+
 if __name__ == "__main__":
     pytest.main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+
+import pytest
+
+from PTN.parse import PTN
+from PTN.shapes import ShapeCache
+
+EPISODES = [f"The.Show.S{season:02d}E{episode:02d}.1080p.WEB-DL.x264-GRP" for season in (1, 2) for episode in range(1, 13)]
+
+
+@pytest.mark.parametrize("standardise,coherent_types", [(True, False), (False, False), (True, True)])
+def test_shape_cache(standardise, coherent_types):
+    ptn = PTN()
+    cache = ShapeCache(ptn, standardise, coherent_types)
+    names = EPISODES + [
+        "The.Show.S01E01-E03.1080p.WEB-DL.x264-GRP",
+        "The.Show.S03E04-E09.1080p.WEB-DL.x264-GRP",
+        "The.Show.S01E02-E04.1080p.WEB-DL.x264-GRP",
+        "The.Show.S01E05-E12.1080p.WEB-DL.x264-GRP",
+        # Not all numbers are years, and the numbers of the title have to stay the same.
+        "Movie 1999 1080p BluRay",
+        "Movie 2004 1080p BluRay",
+        "Movie 2012 1080p BluRay",
+        "Movie 8979 1080p BluRay",
+        "Movie 2015 1080p BluRay",
+        "Show 24 2019 720p",
+        "Show 25 2019 720p",
+        "Show 24 2018 720p",
+        "Show 24 2017 720p",
+    ]
+    results = cache.parse_many(names)
+    assert results == [ptn.parse(name, standardise, coherent_types) for name in names]
+    assert cache.hits == 23 and cache.parses == len(names) - cache.hits
+    stats = {shape["shape"]: shape for shape in cache.stats()}
+    assert stats["The.Show.S##E##.####p.WEB-DL.x###-GRP"] == {
+        "shape": "The.Show.S##E##.####p.WEB-DL.x###-GRP", "hits": 21, "parses": 3, "hit_rate": 21 / 24, "state": "verified",
+        "fields": {"seasons": "list", "episodes": "list"},
+    }
+    assert (stats["Movie #### ####p BluRay"]["hits"], stats["Show ## #### ###p"]["hits"]) == (1, 0)
+
+
+def test_shape_cache_retires_and_evicts():
+    cache = ShapeCache(verify=1, max_shapes=2)
+    cache.parse(EPISODES[0])
+    next(iter(cache.shapes.values())).result["title"] = "Something Else"
+    assert cache.parse(EPISODES[1])["title"] == "The Show"
+    assert cache.parse(EPISODES[2])["title"] == "The Show"
+    assert cache.stats()[0]["state"] == "retired" and cache.hits == 0
+
+    cache.parse("Movie 1999 1080p BluRay")
+    cache.parse(EPISODES[3])
+    cache.parse("Show 24 2019 720p")
+    assert [shape["shape"] for shape in cache.stats()] == ["The.Show.S##E##.####p.WEB-DL.x###-GRP", "Show ## #### ###p"]
+    assert cache.evicted == 1
+    with pytest.raises(ValueError):
+        ShapeCache(max_shapes=0)
+
+
+def test_shape_cache_numbers_of_other_keys():
+    # "7K" is a season of the complete series, "4K" a resolution, matched before seasons.
+    ptn = PTN()
+    cache = ShapeCache(ptn)
+    names = [f"Show.Complete.Series.{number}K.WEB-DL.x265-GRP" for number in (7, 3, 9, 4, 5, 8, 6, 2)]
+    assert cache.parse_many(names) == [ptn.parse(name, standardise=True) for name in names]
+    assert cache.parse(names[3])["resolution"] == "4K"
+    assert cache.stats()[0]["state"] == "verified" and cache.hits == 1
+
+
+def test_shape_cache_ranges():
+    # Two episodes are a range, read from their two numbers: not a list of both of them.
+    ptn = PTN()
+    cache = ShapeCache(ptn, verify=0, audit_every=0)
+    names = [f"Show.S02E{first:02d}-E{last:02d}.720p.WEB-DL.x264-GRP" for first, last in ((10, 11), (1, 9), (36, 11), (5, 5))]
+    assert cache.parse_many(names) == [ptn.parse(name, standardise=True) for name in names]
+    assert cache.parse(names[1])["episodes"] == list(range(1, 10)) and cache.hits == 4
+    assert cache.stats()[0]["fields"] == {"seasons": "list", "episodes": "range"}
+
+
+def test_shape_cache_numbers_of_later_keys():
+    # Audio's "2.0" matches "240", and audio is matched after episodes.
+    ptn = PTN()
+    cache = ShapeCache(ptn, verify=0, audit_every=0)
+    names = [f"[Judas] One Piece - {episode} (1080p)(HEVC x265 10bit)(Multi-Subs)" for episode in (231, 232, 240, 233)]
+    assert cache.parse_many(names) == [ptn.parse(name, standardise=True) for name in names]
+    assert cache.parse(names[2])["audio"] == "Dual" and cache.hits == 2
+
+
+def test_shape_cache_repeated_numbers():
+    # The episode of "1x01" could be read from either number, so both have to stay the same.
+    ptn = PTN()
+    cache = ShapeCache(ptn, verify=0, audit_every=0)
+    names = ["The Missing 1x01 Pilot HDTV x264-FoV", "The Missing 9x01 Pilot HDTV x264-FoV", "The Missing 1x01 Pilot HDTV x264-FoV"]
+    assert cache.parse_many(names) == [ptn.parse(name, standardise=True) for name in names]
+    assert cache.hits == 1
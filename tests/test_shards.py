@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+
+import json
+import os
+
+import pytest
+
+import PTN
+from PTN import shards
+from PTN.shards import read_shard, shard_ranges
+
+NAMES = [
+    "The.Show.S01E{:02d}.1080p.WEB-DL.DDP5.1.x264-GRP".format(episode) for episode in range(1, 30)
+] + ["Movie Title 2019 720p BluRay x264", "", "Ünïcode Tïtle 2020 HDTV\r"]
+
+
+@pytest.fixture
+def names_file(tmp_path):
+    path = tmp_path / "names.txt"
+    path.write_bytes("\n".join(NAMES).encode("utf-8"))
+    return str(path)
+
+
+def test_shard_ranges(names_file):
+    ranges = shard_ranges(names_file, shard_size=100)
+    assert len(ranges) > 1
+    assert ranges[0][0] == 0 and all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+    names = [name for start, end in ranges for name in read_shard(names_file, start, end)]
+    assert names == [name.rstrip("\r") for name in NAMES]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parse_file(names_file, tmp_path, workers):
+    output = str(tmp_path / "results.ndjson")
+    calls = []
+    total = PTN.parse_file(names_file, output, workers=workers, shard_size=200, progress=lambda *args: calls.append(args))
+    assert total == len(NAMES)
+    with open(output, encoding="utf-8") as output_file:
+        results = [json.loads(line) for line in output_file]
+    assert results == [PTN.parse(name.rstrip("\r")) for name in NAMES]
+    assert calls[-1][0] == calls[-1][1] and calls[-1][2] == len(NAMES)
+
+
+def test_parse_file_columnar(names_file, tmp_path):
+    output = tmp_path / "columns"
+    PTN.parse_file(names_file, str(output), workers=1, shard_size=200, output_format="columnar")
+    results = [PTN.parse(name.rstrip("\r")) for name in NAMES]
+    for field in {field for result in results for field in result}:
+        with open(output / f"{field}.jsonl", encoding="utf-8") as column_file:
+            assert [json.loads(line) for line in column_file] == [result.get(field) for result in results]
+
+
+def test_parse_file_resumes(names_file, tmp_path, monkeypatch):
+    output = str(tmp_path / "results.ndjson")
+    shard_dir = output + ".shards"
+    expected = [PTN.parse(name.rstrip("\r")) for name in NAMES]
+
+    # Interrupt a run after its shards are parsed, then drop all but the first shard.
+    def interrupt(*args):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(shards, "_merge_ndjson", interrupt)
+    with pytest.raises(KeyboardInterrupt):
+        PTN.parse_file(names_file, output, workers=1, shard_size=200)
+    monkeypatch.undo()
+    for index in range(1, len(shard_ranges(names_file, 200))):
+        os.remove(shards._shard_path(shard_dir, index))
+    with open(shards._shard_path(shard_dir, 0), encoding="utf-8") as shard_file:
+        first_shard = [json.loads(line) for line in shard_file]
+
+    calls = []
+    PTN.parse_file(names_file, output, workers=1, shard_size=200, progress=lambda *args: calls.append(args))
+    assert calls[0][0] == 1
+    assert calls[-1][2] == len(NAMES) - len(first_shard)
+    with open(output, encoding="utf-8") as output_file:
+        assert [json.loads(line) for line in output_file] == expected
+    assert not os.path.exists(shard_dir)
+
+    # A shard directory from a run with other options isn't reused.
+    monkeypatch.setattr(shards, "_merge_ndjson", interrupt)
+    with pytest.raises(KeyboardInterrupt):
+        PTN.parse_file(names_file, output, workers=1, shard_size=200, standardise=False)
+    monkeypatch.undo()
+    calls = []
+    PTN.parse_file(names_file, output, workers=1, shard_size=200, progress=lambda *args: calls.append(args))
+    assert calls[0][0] == 1 and calls[-1][2] == len(NAMES)
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+
+import json
+import os
+import re
+import shutil
+
+import pytest
+
+from PTN.parse import PTN
+from PTN.tools import CORPUS_PATH, analyse, impact, plan, reparse
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+NAMES = [
+    "The Walking Dead S05E03 720p HDTV x264-ASAP[ettv]",
+    "Insecure.S04.COMPLETE.720p.AMZN.WEBRip.x264-GalaxyTV",
+]
+
+
+def test_impact_report_same_patterns():
+    report = impact.impact_report(REPO_ROOT, REPO_ROOT, NAMES, repeat=1)
+    assert report["names"] == len(NAMES)
+    assert report["output_changes"] == {}
+    assert all(option["old"] is not None and option["new"] is not None for option in report["options"])
+    assert "Throughput" in impact.format_report(report)
+
+
+@pytest.mark.parametrize(
+    "pattern,literals",
+    [
+        (r"\b(?:WEB[ -\.]?DL(?:Rip|Mux)?|HDRip)\b", ["hdrip", "web"]),
+        (r"\b(?:(AMZN|Amazon))\b", ["mazon", "mzn"]),
+        (r"\b(?:HDR(?:10)?)\b", ["hdr"]),
+        (r"\b(?:[0-9]{3,4}p)\b", ["p"]),
+        (r"\b(?:\d{3,4})\b", None),
+        (r"(?:Amélie)", None),
+    ],
+)
+def test_required_literals(pattern, literals):
+    assert plan.required_literals(pattern) == literals
+    if literals:
+        for name in ["The.Web-DL.Show", "An HDRip", "AMZN", "Amazon", "HDR10"]:
+            if re.search(pattern, name, re.IGNORECASE):
+                assert any(literal in name.lower() for literal in literals)
+
+
+def test_plan(tmp_path):
+    built = plan.build_plan(NAMES)
+    quality = {option["pattern"]: option for option in built["options"]["quality"]}
+    hdtv = quality[r"\b(?:HDTV(?:Rip)?)\b"]
+    assert (hdtv["hits"], hdtv["wins"], hdtv["skip_rate"], hdtv["guard"]) == (1, 1, 0.5, ["hdtv"])
+    assert quality[r"\b(?:WEB[ -]?Cap)\b"]["dead"]
+    assert "Dead" in plan.format_plan(built)
+
+    with open(CORPUS_PATH, encoding="utf-8") as corpus_file:
+        names = json.load(corpus_file)
+    assert plan.verify_plan(built, names + ["Ünïcode HDTV Name 720p"]) == []
+
+    path = tmp_path / "plan.json"
+    built["options"]["quality"][0]["pattern"] = "changed"
+    path.write_text(json.dumps(built), encoding="utf-8")
+    with pytest.warns(UserWarning):
+        planned = PTN(plan=str(path))
+    assert planned.parse(NAMES[0]) == PTN().parse(NAMES[0])
+
+
+@pytest.mark.parametrize(
+    "regex,alternatives",
+    [
+        (r"PDTV|DVBRip", ["PDTV", "DVBRip"]),
+        (r"(?:a|b)", ["a", "b"]),
+        (r"(a|b)c|d", ["(a|b)c", "d"]),
+        (r"[|]x|\|y", ["[|]x", r"\|y"]),
+    ],
+)
+def test_split_alternatives(regex, alternatives):
+    assert analyse.split_alternatives(regex) == alternatives
+
+
+def test_analyse():
+    assert analyse.matched_strings(r"p[ua]n(?:jabi)?") == {"pun", "pan", "punjabi", "panjabi"}
+    assert analyse.matched_strings(r"\d+") is None
+    # What anchors and lookarounds match depends on what's around the string.
+    assert analyse.matched_strings(r"\.?(iso)$") is None and analyse.matched_strings(r"(?<![a-z])HD\b") is None
+    assert analyse.quantifier_risk(r"(?:s\d{1,2}[.+\s]*){2,}") == 2
+
+    report = analyse.analyse(NAMES)
+    shadowed = {(f["key"], f["alternative"]) for f in report["shadowed"]}
+    assert ("quality", "DVBRip") in shadowed and ("resolution", "(qHD)") in shadowed
+    parsed = PTN().parse("Show S01E01 DVBRip qHD", standardise=True)
+    assert (parsed["quality"], parsed["resolution"]) == ("PDTV", "1440p")
+    assert {"key": "extras.langs", "value": "Punjabi", "options": [20, 40]} in report["duplicate_values"]
+    assert any(product["key"] == "network" for product in report["cross_products"])
+    assert all(option["cost_us"] is not None for option in report["options"])
+    assert "Shadowed" in analyse.format_analysis(report)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_reparse(tmp_path, workers):
+    new_path = tmp_path / "new"
+    shutil.copytree(os.path.join(REPO_ROOT, "PTN"), new_path / "PTN", ignore=shutil.ignore_patterns("__pycache__"))
+    with open(new_path / "PTN" / "patterns.py", "a", encoding="utf-8") as patterns_file:
+        patterns_file.write('\npatterns["remux"] = [patterns["remux"], r"REMUXED"]\n')
+    names = NAMES + ["Movie Title 2019 1080p REMUXED x264", "Another Movie 2020 1080p REMUX"] * 5
+    names_path, results_path, output = tmp_path / "names.txt", tmp_path / "results.ndjson", tmp_path / "updated.ndjson"
+    names_path.write_text("\n".join(names), encoding="utf-8")
+    results_path.write_text("".join(json.dumps(PTN().parse(name, standardise=True)) + "\n" for name in names), encoding="utf-8")
+
+    report = reparse.reparse(REPO_ROOT, str(new_path), str(names_path), str(results_path), str(output), workers=workers, shard_size=64)
+    assert report["pattern_changes"] == [{"key": "remux", "change": "added", "option": r"\b(?:REMUXED)\b"}]
+    assert (report["names"], report["candidates"], report["changed"]) == (len(names), 5, 5)
+    assert report["fields"]["remux"] == 5
+    new_parser = impact.Version(str(new_path), "_ptn_test_reparse").parser_class()
+    with open(output, encoding="utf-8") as output_file:
+        assert [json.loads(line) for line in output_file] == [new_parser.parse(name, standardise=True) for name in names]
+    assert "Changed: 5 names" in reparse.format_report(report)
+
+    report = reparse.reparse(REPO_ROOT, REPO_ROOT, str(names_path), str(results_path), str(output), workers=workers, sample=1)
+    assert (report["pattern_changes"], report["candidates"], report["sampled"], report["changed"]) == ([], 0, len(names), 0)
+
+
+@pytest.mark.parametrize(
+    "module, edit, change, all_candidates",
+    [
+        # Used on every title: all the names are re-parsed.
+        ("patterns", 'patterns["RELEASE_GROUP_REGEX_START"] = r"^\\[.*\\][ .]?(.+)"', "patterns.RELEASE_GROUP_REGEX_START", True),
+        # Only the names the languages and subtitles options match.
+        ("extras", 'langs[-1] = (langs[-1][0], "Anglais")', "extras.langs", False),
+    ],
+    ids=["title pattern", "standardised values"],
+)
+def test_reparse_tables(tmp_path, module, edit, change, all_candidates):
+    new_path = tmp_path / "new"
+    shutil.copytree(os.path.join(REPO_ROOT, "PTN"), new_path / "PTN", ignore=shutil.ignore_patterns("__pycache__"))
+    with open(new_path / "PTN" / f"{module}.py", "a", encoding="utf-8") as module_file:
+        module_file.write(f"\n{edit}\n")
+    names = NAMES + ["【GRP】 Movie Title 2019 1080p", "Movie.2020.French.English.1080p.BluRay", "Show.S01E01.ENG.SUBS.720p"]
+    names_path, results_path, output = tmp_path / "names.txt", tmp_path / "results.ndjson", tmp_path / "updated.ndjson"
+    names_path.write_text("\n".join(names), encoding="utf-8")
+    results_path.write_text("".join(json.dumps(PTN().parse(name, standardise=True)) + "\n" for name in names), encoding="utf-8")
+
+    report = reparse.reparse(REPO_ROOT, str(new_path), str(names_path), str(results_path), str(output), workers=1)
+    assert {"key": change, "change": "table", "option": None} in report["pattern_changes"]
+    assert (report["candidates"] == len(names)) == all_candidates
+    new_parser = impact.Version(str(new_path), "_ptn_test_reparse_tables").parser_class()
+    with open(output, encoding="utf-8") as output_file:
+        assert [json.loads(line) for line in output_file] == [new_parser.parse(name, standardise=True) for name in names]
+    assert report["changed"] > 0
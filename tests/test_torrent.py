@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+
+import hashlib
+
+import pytest
+
+from PTN.parse import PTN
+from PTN.torrent import BencodeError, FileParser, decode_bencode, encode_bencode, parse_torrents, read_torrent
+
+SEASON_PACK = {
+    "announce": "http://tracker.example/announce",
+    "info": {
+        "name": "The.Show.S01.1080p.WEB-DL.DDP5.1.x264-GRP",
+        "piece length": 262144,
+        "pieces": b"\x00" * 20 * 100,
+        "files": [
+            {"path": ["The.Show.S01E{:02d}.1080p.WEB-DL.x264-GRP.mkv".format(episode)], "length": 1000}
+            for episode in range(1, 11)
+        ] + [{"path": ["Subs", "English.srt"], "length": 10}],
+    },
+}
+
+
+def test_bencode_round_trip():
+    data = encode_bencode(SEASON_PACK)
+    decoded, spans = decode_bencode(data, skip_keys=())
+    assert decoded[b"info"][b"name"] == SEASON_PACK["info"]["name"].encode()
+    assert decoded[b"info"][b"pieces"] == SEASON_PACK["info"]["pieces"]
+    assert data[slice(*spans[b"info"])] == encode_bencode(SEASON_PACK["info"])
+    assert b"pieces" not in decode_bencode(data)[0][b"info"]
+    with pytest.raises(BencodeError):
+        decode_bencode(data[:-5])
+
+
+@pytest.mark.parametrize("data", [b"l" * 100000, b"d4:info" + b"l" * 100000, b"d6:pieces" + b"l" * 100000])
+def test_bencode_too_deep(data):
+    with pytest.raises(BencodeError):
+        decode_bencode(data)
+    assert decode_bencode(b"l" * 500 + b"e" * 500)[0] is not None
+
+
+def test_parse_torrents(tmp_path):
+    (tmp_path / "pack.torrent").write_bytes(encode_bencode(SEASON_PACK))
+    (tmp_path / "broken.torrent").write_bytes(b"d4:info")
+    (tmp_path / "nested.torrent").write_bytes(b"d4:info" + b"l" * 100000)
+    torrent = read_torrent(str(tmp_path / "pack.torrent"))
+    assert torrent.infohash == hashlib.sha1(encode_bencode(SEASON_PACK["info"])).hexdigest()
+    assert len(torrent.files) == 11
+
+    with pytest.raises(BencodeError):
+        list(parse_torrents([str(tmp_path)]))
+    results = list(parse_torrents([str(tmp_path)], skip_invalid=True))
+    assert len(results) == 11
+    torrent, file_path, result = results[4]
+    assert file_path == "The.Show.S01E05.1080p.WEB-DL.x264-GRP.mkv"
+    assert result["episodes"] == [5]
+    assert result["title"] == "The Show"
+    # Inherited from the torrent's name.
+    assert result["audio"] == "Dolby Digital Plus 5.1"
+    assert torrent.result["seasons"] == [1]
+
+
+def test_file_parser_reuses_season_pack_parses():
+    ptn = PTN()
+    file_parser = FileParser(ptn)
+    names = [entry["path"][-1] for entry in SEASON_PACK["info"]["files"][:10]]
+    results = [file_parser.parse(name) for name in names]
+    assert file_parser.parses == 1
+    assert results == [ptn.parse(name, standardise=True) for name in names]